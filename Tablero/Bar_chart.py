@@ -2,10 +2,18 @@ import dash
 from dash import dcc  # dash core components
 from dash import html  # dash html components
 import plotly.express as px
-import pandas as pd
 
-# Leer el archivo CSV
-datab = pd.read_csv(r"C:\Users\USER\OneDrive - Universidad de los andes\Analitica comp\Proyecto\SeoulBikeData_utf8.csv")
+import datos
+from agregados import CuboDemanda
+
+# Leer los datos desde su copia columnar (sólo las columnas que usa la gráfica)
+datab = datos.cargar("data/SeoulBikeData_utf8.csv", columnas=['Date', 'Hour', 'Seasons', 'Rented Bike Count'],
+                     formato_fecha='%d/%m/%Y')
+print(datos.reporte_memoria(datab, 'datab'), flush=True)
+
+# Demanda total por estación, calculada una sola vez desde el cubo de agregados
+demanda_estacion = CuboDemanda(datab).resumen(por=['Seasons'])
+demanda_estacion['Seasons'] = demanda_estacion['Seasons'].map(datos.NOMBRES_ESTACION)
 
 # Estilos externos
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
@@ -17,7 +25,8 @@ server = app.server
 color_map = { "Spring": "hotpink",  "Summer": "palegreen",  "Autumn": "darkorange",  "Winter": "lightskyblue" }
 
 # Crear la gráfica
-fig = px.histogram(datab, x='Seasons', y='Rented Bike Count', color='Seasons', color_discrete_map=color_map).update_layout(
+fig = px.bar(demanda_estacion, x='Seasons', y='sum', color='Seasons', color_discrete_map=color_map,
+             labels={'sum': 'Rented Bike Count'}).update_layout(
                                 plot_bgcolor='rgba(0, 0, 0, 0)',
                             )
 
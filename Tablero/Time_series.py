@@ -1,19 +1,34 @@
+import os
 import dash
 from dash import dcc  # dash core components
 from dash import html  # dash html components
 import plotly.express as px
-import pandas as pd
 from dash.dependencies import Input, Output
 from datetime import date
 
-# Leer el archivo CSV
-datab = pd.read_csv(r"C:\Users\USER\OneDrive - Universidad de los andes\Analitica comp\Proyecto\SeoulBikeData_utf8.csv")
+import datos
+from cache_figuras import CacheFiguras
+import demanda_cliente
+from indice_fechas import IndiceFechas
 
-# Convertir la columna 'Date' a formato de fecha
-datab['Date'] = pd.to_datetime(datab['Date'], format='%d/%m/%Y')
+# Leer los datos desde su copia columnar (sólo las columnas que usa la gráfica;
+# fechas ya convertidas y filas ordenadas por fecha y hora)
+RUTA_DATOS = "data/SeoulBikeData_utf8.csv"
+datab = datos.cargar(RUTA_DATOS, columnas=['Date', 'Hour', 'Rented Bike Count'],
+                     formato_fecha='%d/%m/%Y')
+print(datos.reporte_memoria(datab, 'datab'), flush=True)
 
-# Añadir columna con el día de la semana
-datab['Día de la Semana'] = datab['Date'].dt.day_name()
+# Caché de figuras: mismas entradas y misma versión de los datos -> misma figura.
+# Con TABLERO_CACHE_FIGURAS se comparte además en disco entre procesos.
+cache_figuras = CacheFiguras(version=lambda: datos.version(RUTA_DATOS), max_entradas=512,
+                             directorio=os.environ.get('TABLERO_CACHE_FIGURAS'))
+
+# Indexar los bloques de cada día
+indice_fechas = IndiceFechas(datab)
+
+# Si caben, los datos por hora de todos los días se envían al navegador una sola
+# vez y el cambio de fecha se resuelve allí, sin ir al servidor
+precargar_demanda = demanda_cliente.precargar(indice_fechas)
 
 
 # Estilos externos
@@ -39,6 +54,10 @@ app.layout = html.Div(children=[
         date=datab['Date'].min().date(),
         display_format='YYYY-MM-DD'
     ),
+    dcc.Store(
+        id='demanda-por-dia',
+        data=demanda_cliente.payload_demanda(indice_fechas) if precargar_demanda else None
+    ),
 
     dcc.Graph(
         id='graph-rented-bikes'
@@ -46,16 +65,15 @@ app.layout = html.Div(children=[
 ])
 
 # Callback para actualizar el gráfico basado en la fecha seleccionada
-@app.callback(
-    Output('graph-rented-bikes', 'figure'),
-    [Input('date-picker-single', 'date')]
-)
+@cache_figuras.memorizar()
 def update_graph(selected_date):
     if selected_date is None:
         selected_date = datab['Date'].min().date()
     
     # Filtrar datos por la fecha seleccionada
-    filtered_data = datab[datab['Date'].dt.date == pd.to_datetime(selected_date).date()]
+    filtered_data = indice_fechas.dia(selected_date)
+    # El día de la semana se calcula sólo para las filas del día (no se guarda en datab)
+    filtered_data = filtered_data.assign(**{'Día de la Semana': filtered_data['Date'].dt.day_name()})
     
     # Crear el gráfico
     fig = px.line(filtered_data, 
@@ -84,6 +102,13 @@ def update_graph(selected_date):
     
     return fig
 
+# Con los datos precargados la gráfica se actualiza en el navegador; si no, en el servidor
+if precargar_demanda:
+    demanda_cliente.registrar_grafica_horaria(app, 'date-picker-single', 'graph-rented-bikes', 'demanda-por-dia')
+else:
+    app.callback(Output('graph-rented-bikes', 'figure'),
+                 [Input('date-picker-single', 'date')])(update_graph)
+
 # Ejecutar la app
 if __name__ == '__main__':
     app.run_server(debug=True)
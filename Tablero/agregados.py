@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+from datos import CODIGOS_ESTACION
+
+# Dimensiones del cubo y número de valores posibles de cada una
+DIMENSIONES = {
+    'Seasons': 4,
+    'Hour': 24,
+    'Día': 7,     # día de la semana (0 = lunes)
+    'Mes': 12,    # mes (0 = enero)
+}
+
+# Histograma por celda para aproximar cuantiles: intervalos de 25 bicicletas
+ANCHO_INTERVALO = 25
+N_INTERVALOS = 200   # el último intervalo acumula todo lo que supere 5000
+
+
+class CuboDemanda:
+    """Agregados de 'Rented Bike Count' por estación × hora × día de la semana × mes.
+
+    El cubo guarda, para cada celda, la suma, la suma de cuadrados y el
+    conteo (unos 190 KB); con ``histograma=True`` guarda además un histograma
+    de valores por celda para los cuantiles, que ocupa 6,5 MB (unas 30 veces
+    el conjunto de datos original), así que sólo se crea si se pide. Todo se
+    calcula en una sola pasada y se
+    actualiza con filas nuevas sumando sólo en las celdas que tocan
+    (``np.add.at``), así que ingerir k filas cuesta O(k) y las gráficas de
+    resumen leen tablas de unos pocos miles de celdas sin importar cuántas
+    filas tenga el conjunto de datos.
+    """
+
+    def __init__(self, datos=None, histograma=False):
+        self.forma = tuple(DIMENSIONES.values())
+        n_celdas = int(np.prod(self.forma))
+        self.suma = np.zeros(n_celdas)
+        self.suma_cuadrados = np.zeros(n_celdas)
+        self.conteo = np.zeros(n_celdas, dtype=np.int64)
+        # int32: una celda no llega a 2**31 filas
+        self.histograma = np.zeros((n_celdas, N_INTERVALOS), dtype=np.int32) if histograma else None
+        if datos is not None:
+            self.agregar(datos)
+
+    @staticmethod
+    def _celdas(datos):
+        estaciones = datos['Seasons']
+        if not pd.api.types.is_integer_dtype(estaciones):
+            estaciones = estaciones.map(CODIGOS_ESTACION)
+        fechas = datos['Date'].dt
+        codigos = [
+            estaciones.to_numpy(dtype=np.int64),
+            datos['Hour'].to_numpy(dtype=np.int64),
+            fechas.dayofweek.to_numpy(dtype=np.int64),
+            fechas.month.to_numpy(dtype=np.int64) - 1,
+        ]
+        return np.ravel_multi_index(codigos, tuple(DIMENSIONES.values()))
+
+    def agregar(self, datos):
+        """Suma las filas de ``datos`` al cubo (construcción inicial o filas nuevas)."""
+        if len(datos) == 0:
+            return self
+        celdas = self._celdas(datos)
+        valores = datos['Rented Bike Count'].to_numpy(dtype=np.float64)
+
+        # Sin arreglos temporales del tamaño del cubo: sólo se escriben las celdas de las filas
+        np.add.at(self.suma, celdas, valores)
+        np.add.at(self.suma_cuadrados, celdas, valores * valores)
+        np.add.at(self.conteo, celdas, 1)
+
+        if self.histograma is not None:
+            intervalos = np.clip((valores // ANCHO_INTERVALO).astype(np.int64), 0, N_INTERVALOS - 1)
+            np.add.at(self.histograma.reshape(-1), celdas * N_INTERVALOS + intervalos, 1)
+        return self
+
+    def _marginal(self, arreglo, ejes):
+        # Suma las dimensiones que no están en ``ejes``
+        forma = self.forma + arreglo.shape[1:]
+        otras = tuple(i for i, d in enumerate(DIMENSIONES) if d not in ejes)
+        return arreglo.reshape(forma).sum(axis=otras)
+
+    def resumen(self, por=('Seasons',), cuantiles=()):
+        """Tabla con suma, media, desviación, conteo y cuantiles agrupados por ``por``.
+
+        Los cuantiles se aproximan interpolando dentro de los intervalos del
+        histograma (error máximo: ``ANCHO_INTERVALO``); necesitan un cubo
+        creado con ``histograma=True``.
+        """
+        if cuantiles and self.histograma is None:
+            raise ValueError('Los cuantiles necesitan un cubo creado con histograma=True')
+        por = [d for d in DIMENSIONES if d in por]
+        suma = self._marginal(self.suma, por)
+        suma_cuadrados = self._marginal(self.suma_cuadrados, por)
+        conteo = self._marginal(self.conteo, por)
+
+        indice = pd.MultiIndex.from_product([range(DIMENSIONES[d]) for d in por], names=por)
+        conteo = conteo.ravel()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            media = suma.ravel() / conteo
+            varianza = suma_cuadrados.ravel() / conteo - media * media
+        tabla = pd.DataFrame({
+            'sum': suma.ravel(),
+            'mean': media,
+            'std': np.sqrt(np.clip(varianza, 0, None)),
+            'count': conteo,
+        }, index=indice)
+
+        if cuantiles:
+            histograma = self._marginal(self.histograma, por)
+            acumulado = histograma.reshape(len(tabla), N_INTERVALOS).cumsum(axis=1)
+            for q in cuantiles:
+                tabla[f'q{int(round(q * 100)):02d}'] = _cuantil_histograma(acumulado, q)
+
+        tabla = tabla[tabla['count'] > 0]
+        return tabla.reset_index()
+
+
+def _cuantil_histograma(acumulado, q):
+    total = acumulado[:, -1]
+    objetivo = q * total
+    k = np.minimum((acumulado < objetivo[:, None]).sum(axis=1), N_INTERVALOS - 1)
+    filas = np.arange(len(acumulado))
+    antes = np.where(k > 0, acumulado[filas, np.maximum(k - 1, 0)], 0)
+    en_intervalo = acumulado[filas, k] - antes
+    with np.errstate(invalid='ignore', divide='ignore'):
+        fraccion = np.where(en_intervalo > 0, (objetivo - antes) / en_intervalo, 0.0)
+    valor = (k + fraccion) * ANCHO_INTERVALO
+    return np.where(total > 0, valor, np.nan)
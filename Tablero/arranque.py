@@ -0,0 +1,40 @@
+"""Reporte de tiempos del arranque de un tablero.
+
+Se crea un ``Arranque`` con el instante anterior a las importaciones pesadas
+(``time.perf_counter()`` al inicio del archivo) y se marca el fin
+de cada etapa; ``reporte()`` muestra cuánto tardó cada una y qué módulos
+pesados ya están cargados. Para el detalle por módulo de las importaciones:
+    python -X importtime "Tablero/Tablero completo.py" 2> importaciones.txt
+"""
+import sys
+import time
+
+# Módulos pesados que sólo deberían cargarse cuando se usan
+MODULOS_PESADOS = ['numpy', 'pandas', 'plotly.express', 'dash', 'scipy', 'statsmodels']
+
+
+class Arranque:
+    def __init__(self, inicio=None):
+        self.inicio = time.perf_counter() if inicio is None else inicio
+        self._ultima = self.inicio
+        self.etapas = []
+        self.cargados = []
+
+    def marcar(self, etapa):
+        """Cierra ``etapa``: su duración es el tiempo desde la marca anterior."""
+        ahora = time.perf_counter()
+        self.etapas.append((etapa, ahora - self._ultima))
+        self._ultima = ahora
+
+    def total(self):
+        return self._ultima - self.inicio
+
+    def reporte(self):
+        lineas = [f'Arranque: {self.total():.2f} s']
+        for etapa, segundos in self.etapas:
+            lineas.append(f'  {etapa:>24} {segundos:8.3f} s')
+        # Se guardan: los hilos que se lancen después pueden cargar más módulos
+        self.cargados = cargados = [m for m in MODULOS_PESADOS if m in sys.modules]
+        pendientes = [m for m in MODULOS_PESADOS if m not in sys.modules]
+        lineas.append(f'  cargados: {", ".join(cargados) or "-"}; sin cargar: {", ".join(pendientes) or "-"}')
+        return '\n'.join(lineas)
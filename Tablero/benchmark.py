@@ -0,0 +1,326 @@
+"""Benchmark del tablero completo con datos escalados.
+
+Genera versiones más grandes de SeoulBikeData_limpio.csv (más años, una
+sola serie horaria como la original) y, para cada escala, mide en un
+proceso nuevo:
+    - arranque: importar el tablero hasta la primera respuesta (con la caché
+      vacía y con la caché ya construida)
+    - cada callback (update_graph_hour, update_calendario, update_correlaciones,
+      update_graph_climate, update_forecast_graph) a través del cliente de prueba de Flask/Dash,
+      la primera vez y repetido
+    - los bytes de las figuras de dispersión y pronóstico antes y después de
+      compactarlas y comprimidas con gzip y brotli (ver respuestas.py)
+    - el ajuste del ARIMA
+    - la memoria máxima (RSS) del proceso
+
+Los resultados se escriben en JSON para comparar corridas.
+
+Límites de los datos escalados:
+    - A lo sumo 200× (200 años a partir de 2017). Varias partes del tablero
+      pasan las fechas a enteros en ns (ingesta._instantes, las claves de
+      reduccion.PiramideSerie y el paso de pronostico_lotes), y pandas < 3
+      las lee del CSV en ns: en ns no hay fechas después de 2262. Para 1000×
+      habría que pasar esas conversiones a µs y exigir pandas 3.
+    - Una sola estación: el tablero y el ARIMA suponen una fila por
+      (Date, Hour), así que se escala sólo en el tiempo y no se agregan
+      estaciones.
+
+Uso (desde la raíz del repositorio):
+    python Tablero/benchmark.py --escalas 1 10 100 --salida bench.json
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+RUTA_TABLERO = os.path.join(DIRECTORIO, 'Tablero completo.py')
+RUTA_BASE = 'data/SeoulBikeData_limpio.csv'
+
+# Factores de escala (años de datos; ver los límites en la descripción del módulo)
+ESCALAS = (1, 10, 100, 200)
+
+X_OPCIONES = ['Temperature(C)', 'Humidity(%)', 'Wind speed (m/s)', 'Visibility (10m)', 'Solar Radiation (MJ/m2)']
+
+
+def escalar_datos(base, anios, semilla=0):
+    """Replica ``base`` en ``anios`` períodos consecutivos, uno a continuación del otro.
+
+    Cada período dura lo que abarcan las fechas de ``base`` (un año), así que
+    sigue habiendo una sola fila por (Date, Hour). Cada copia tiene su propio
+    ruido: la demanda se multiplica por un factor log-normal por año y por
+    fila, y las variables climáticas reciben un ruido pequeño acotado a su
+    rango. El resultado queda ordenado por (Date, Hour).
+    """
+    rng = np.random.default_rng(semilla)
+    n = len(base)
+    fechas = base['Date'].to_numpy()
+    periodo = fechas.max() - fechas.min() + np.timedelta64(1, 'D')
+    anio = np.repeat(np.arange(anios), n)
+
+    tabla = {columna: np.tile(base[columna].to_numpy(), anios) for columna in base.columns}
+    tabla['Date'] = np.tile(fechas, anios) + anio * periodo
+
+    total = n * anios
+    factor_anio = rng.lognormal(0.0, 0.3, size=anios)[anio]
+    demanda = tabla['Rented Bike Count'] * factor_anio * rng.lognormal(0.0, 0.1, size=total)
+    tabla['Rented Bike Count'] = np.rint(demanda).astype(np.int64)
+
+    ruido = {
+        'Temperature(C)': (1.0, -30, 45),
+        'Humidity(%)': (3.0, 0, 100),
+        'Wind speed (m/s)': (0.3, 0, None),
+        'Solar Radiation (MJ/m2)': (0.05, 0, None),
+    }
+    for columna, (escala, minimo, maximo) in ruido.items():
+        if columna in tabla:
+            valores = tabla[columna] + rng.normal(0.0, escala, size=total)
+            tabla[columna] = np.round(np.clip(valores, minimo, maximo), 2)
+    if 'Humidity(%)' in tabla:
+        tabla['Humidity(%)'] = tabla['Humidity(%)'].astype(np.int64)
+
+    return pd.DataFrame(tabla)[list(base.columns)]
+
+
+def generar(escala, directorio, ruta_base=RUTA_BASE):
+    """Escribe (si no existe) el CSV escalado y devuelve su ruta."""
+    ruta = os.path.join(directorio, f'SeoulBikeData_{escala}_anios.csv')
+    if not os.path.exists(ruta):
+        base = pd.read_csv(ruta_base, parse_dates=['Date'])
+        base = base.sort_values(by=['Date', 'Hour'], kind='stable', ignore_index=True)
+        escalar_datos(base, escala).to_csv(ruta, index=False, date_format='%Y-%m-%d')
+    return ruta
+
+
+def _llamar_callback(cliente, salida, salidas, entradas, estado=(), disparador=None, codificacion=None):
+    cuerpo = {
+        'output': salida,
+        'outputs': salidas,
+        'inputs': [{'id': i, 'property': p, 'value': v} for i, p, v in entradas],
+        # Por defecto, la primera entrada es la que dispara el callback
+        'changedPropIds': [disparador or '{}.{}'.format(*entradas[0][:2])],
+        'state': [{'id': i, 'property': p, 'value': v} for i, p, v in estado],
+    }
+    inicio = time.perf_counter()
+    respuesta = cliente.post('/_dash-update-component', json=cuerpo,
+                             headers={'Accept-Encoding': codificacion or 'identity'})
+    segundos = time.perf_counter() - inicio
+    if respuesta.status_code not in (200, 204):
+        raise RuntimeError(f'{salida}: HTTP {respuesta.status_code}')
+    if codificacion is not None:
+        # Bytes antes de compactar (cabecera de respuestas.py) y bytes que salen comprimidos
+        return int(respuesta.headers.get('X-Carga-Original', 0)), len(respuesta.get_data())
+    return segundos, len(respuesta.get_data())
+
+
+def _bytes_carga(cliente, salida, salidas, entradas, estado=()):
+    """Bytes de una respuesta en cada paso: JSON original, compactado, gzip y brotli."""
+    original, compactado = _llamar_callback(cliente, salida, salidas, entradas, estado, codificacion='identity')
+    bytes_carga = {'original': original, 'compactado': compactado}
+    for codificacion in ('gzip', 'br'):
+        bytes_carga[codificacion] = _llamar_callback(cliente, salida, salidas, entradas, estado,
+                                                     codificacion=codificacion)[1]
+    return bytes_carga
+
+
+def _resumen(tiempos):
+    return {
+        'n': len(tiempos),
+        'mediana_s': statistics.median(tiempos),
+        'max_s': max(tiempos),
+    }
+
+
+def medir(espera_arima):
+    """Mide el tablero en este proceso (se llama en un subproceso por escala)."""
+    sys.path.insert(0, DIRECTORIO)
+    resultado = {}
+
+    inicio = time.perf_counter()
+    spec = importlib.util.spec_from_file_location('tablero_completo', RUTA_TABLERO)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    tablero = modulo.tablero
+    resultado['importacion_s'] = time.perf_counter() - inicio
+    resultado['etapas_arranque_s'] = dict(tablero.arranque.etapas)
+    # Según el reporte del arranque: después el hilo del pronóstico ya puede estar importándolo
+    resultado['statsmodels_al_importar'] = 'statsmodels' in tablero.arranque.cargados
+
+    cliente = tablero.app.server.test_client()
+    cliente.get('/')
+    resultado['arranque_s'] = time.perf_counter() - inicio
+    resultado['filas'] = len(tablero.datab)
+
+    # Gráfica por hora: fechas distintas (primera vez) y la misma fecha repetida
+    fechas = pd.to_datetime(tablero.datab['Date'].iloc[[0, len(tablero.datab) // 3, -1]]).dt.strftime('%Y-%m-%d')
+    primera, repetida, bytes_hora = [], [], 0
+    for fecha in fechas:
+        segundos, bytes_hora = _llamar_callback(
+            cliente, 'graph-rented-bikes-hour.figure', {'id': 'graph-rented-bikes-hour', 'property': 'figure'},
+            [('date-picker-single', 'date', fecha), ('datos-version', 'data', 0)])
+        primera.append(segundos)
+        for _ in range(3):
+            repetida.append(_llamar_callback(
+                cliente, 'graph-rented-bikes-hour.figure', {'id': 'graph-rented-bikes-hour', 'property': 'figure'},
+                [('date-picker-single', 'date', fecha), ('datos-version', 'data', 0)])[0])
+    resultado['update_graph_hour'] = {'primera': _resumen(primera), 'repetida': _resumen(repetida),
+                                      'bytes': bytes_hora}
+
+    # Calendario: cada faceta, la primera vez y repetida
+    primera, repetida, bytes_calendario = [], [], {}
+    for faceta in ('ninguna', 'dia', 'estacion'):
+        entradas = [('faceta-calendario', 'value', faceta), ('datos-version', 'data', 0)]
+        salida = {'id': 'graph-calendario', 'property': 'figure'}
+        segundos, bytes_calendario[faceta] = _llamar_callback(cliente, 'graph-calendario.figure', salida, entradas)
+        primera.append(segundos)
+        repetida.append(_llamar_callback(cliente, 'graph-calendario.figure', salida, entradas)[0])
+    resultado['update_calendario'] = {'primera': _resumen(primera), 'repetida': _resumen(repetida),
+                                      'bytes': bytes_calendario}
+
+    # Panel de correlaciones y calidad de datos (desde las estadísticas ya calculadas)
+    for componente, nombre in (('graph-correlaciones', 'update_correlaciones'), ('graph-calidad', 'update_calidad')):
+        salida = {'id': componente, 'property': 'figure'}
+        entradas = [('datos-version', 'data', 0)]
+        segundos, bytes_panel = _llamar_callback(cliente, f'{componente}.figure', salida, entradas)
+        resultado[nombre] = {'primera': _resumen([segundos]), 'bytes': bytes_panel}
+
+    # Dispersión: cada variable climática en modo automático
+    primera, repetida, bytes_clima = [], [], {}
+    for x in X_OPCIONES:
+        entradas = [('xaxis-column', 'value', x), ('modo-dispersion', 'value', 'auto'), ('datos-version', 'data', 0)]
+        segundos, bytes_clima[x] = _llamar_callback(
+            cliente, 'indicator-graphic.figure', {'id': 'indicator-graphic', 'property': 'figure'}, entradas)
+        primera.append(segundos)
+        repetida.append(_llamar_callback(
+            cliente, 'indicator-graphic.figure', {'id': 'indicator-graphic', 'property': 'figure'}, entradas)[0])
+    resultado['update_graph_climate'] = {'primera': _resumen(primera), 'repetida': _resumen(repetida),
+                                         'bytes': bytes_clima,
+                                         'carga': _bytes_carga(cliente, 'indicator-graphic.figure',
+                                                               {'id': 'indicator-graphic', 'property': 'figure'},
+                                                               entradas)}
+
+    # Pronóstico: se espera el ajuste de fondo y se mide el callback
+    listo = tablero.servicio_pronostico.esperar(espera_arima)
+    if listo:
+        resultado['ajuste_arima_s'] = tablero.servicio_pronostico.ultimo()['duracion']
+        salida = '..forecast-graph.figure...forecast-interval.interval...forecast-version.data..'
+        salidas = [{'id': 'forecast-graph', 'property': 'figure'},
+                   {'id': 'forecast-interval', 'property': 'interval'},
+                   {'id': 'forecast-version', 'property': 'data'}]
+        tiempos, bytes_pronostico = [], 0
+        for _ in range(3):
+            segundos, bytes_pronostico = _llamar_callback(
+                cliente, salida, salidas,
+                [('forecast-interval', 'n_intervals', 0), ('forecast-graph', 'relayoutData', None)],
+                [('forecast-version', 'data', None)])
+            tiempos.append(segundos)
+        # Zoom a los últimos 30 días de la historia
+        fin = pd.Timestamp(tablero.datab['Date'].iloc[-1])
+        zoom = {'xaxis.range[0]': str(fin - pd.Timedelta(days=30)), 'xaxis.range[1]': str(fin)}
+        segundos_zoom, bytes_zoom = _llamar_callback(
+            cliente, salida, salidas,
+            [('forecast-interval', 'n_intervals', 0), ('forecast-graph', 'relayoutData', zoom)],
+            [('forecast-version', 'data', None)], disparador='forecast-graph.relayoutData')
+        carga_pronostico = _bytes_carga(
+            cliente, salida, salidas,
+            [('forecast-interval', 'n_intervals', 0), ('forecast-graph', 'relayoutData', None)],
+            [('forecast-version', 'data', None)])
+        resultado['update_forecast_graph'] = {'primera': _resumen(tiempos[:1]), 'repetida': _resumen(tiempos[1:]),
+                                              'bytes': bytes_pronostico,
+                                              'zoom_s': segundos_zoom, 'bytes_zoom': bytes_zoom,
+                                              'carga': carga_pronostico}
+    else:
+        resultado['ajuste_arima_s'] = None
+        resultado['update_forecast_graph'] = None
+
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    resultado['rss_max_mb'] = rss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+    return resultado
+
+
+def _medir_en_subproceso(ruta_datos, cache, espera_arima):
+    entorno = dict(os.environ,
+                   TABLERO_DATOS=os.path.abspath(ruta_datos),
+                   TABLERO_CACHE=cache,
+                   TABLERO_CONFIG_MODELO=os.path.join(cache, 'modelo_arima.json'),
+                   TABLERO_MODELO_OLS=os.path.join(cache, 'modelo_ols.json'),
+                   # Se fuerza la gráfica por hora en el servidor para poder medirla
+                   TABLERO_MAX_DIAS_PRECARGA='0')
+    entorno.pop('TABLERO_CACHE_FIGURAS', None)
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+        salida = f.name
+    try:
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--medir', salida,
+                        '--espera-arima', str(espera_arima)],
+                       env=entorno, check=True)
+        with open(salida, encoding='utf-8') as f:
+            return json.load(f)
+    finally:
+        os.remove(salida)
+
+
+def correr(escalas, directorio, espera_arima):
+    os.makedirs(directorio, exist_ok=True)
+    resultados = []
+    for escala in escalas:
+        ruta = generar(escala, directorio)
+        with tempfile.TemporaryDirectory() as cache:
+            # Primera corrida con la caché vacía (conversión de datos y ajuste incluidos),
+            # segunda con la caché ya construida
+            frio = _medir_en_subproceso(ruta, cache, espera_arima)
+            caliente = _medir_en_subproceso(ruta, cache, espera_arima)
+        resultados.append({
+            'escala': escala,
+            'archivo_mb': os.path.getsize(ruta) / 2 ** 20,
+            'cache_vacia': frio,
+            'cache_construida': caliente,
+        })
+        print(f"x{escala}: {frio['filas']} filas, arranque {frio['arranque_s']:.2f}s "
+              f"(con caché {caliente['arranque_s']:.2f}s), RSS {frio['rss_max_mb']:.0f} MB", file=sys.stderr)
+    return {
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'resultados': resultados,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark del tablero con datos escalados.')
+    parser.add_argument('--escalas', nargs='+', type=int, default=[1, 10, 100], choices=ESCALAS)
+    parser.add_argument('--directorio', default=os.path.join('cache', 'benchmark'),
+                        help='dónde guardar los CSV escalados')
+    parser.add_argument('--espera-arima', type=float, default=900,
+                        help='segundos máximos de espera del ajuste del ARIMA por escala')
+    parser.add_argument('--salida', help='archivo JSON de resultados (por defecto, la salida estándar)')
+    parser.add_argument('--medir', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.medir:
+        with open(args.medir, 'w', encoding='utf-8') as f:
+            json.dump(medir(args.espera_arima), f)
+        return
+
+    informe = correr(args.escalas, args.directorio, args.espera_arima)
+    texto = json.dumps(informe, indent=1)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            f.write(texto)
+    else:
+        print(texto)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import plotly.io as pio
+
+from respuestas import cargar_json
+
+
+class CacheFiguras:
+    """Caché LRU de figuras ya serializadas a JSON.
+
+    La clave es (nombre del callback, entradas, versión de los datos), así que
+    un cambio en los datos invalida todas las figuras sin borrar nada: las
+    entradas viejas simplemente dejan de pedirse y salen por LRU.
+
+    Si se da ``directorio``, las figuras también se guardan en disco para que
+    los demás procesos (workers) las aprovechen. Allí no hay LRU, pero cada
+    escritura borra las figuras vencidas por ``ttl`` y, si quedan más de
+    ``max_disco``, las más viejas (por fecha de modificación): como la versión
+    de los datos cambia con cada ingesta, sin eso el directorio crecería
+    sin límite.
+    """
+
+    def __init__(self, version=None, max_entradas=256, ttl=None, directorio=None, max_disco=2048):
+        self.version = version or (lambda: None)
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.directorio = directorio
+        self.max_disco = max_disco
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+
+        self._entradas = OrderedDict()
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+
+    def estadisticas(self):
+        with self._candado:
+            total = self.aciertos + self.aciertos_disco + self.fallos
+            return {
+                'entradas': len(self._entradas),
+                'aciertos': self.aciertos,
+                'aciertos_disco': self.aciertos_disco,
+                'fallos': self.fallos,
+                'tasa_aciertos': (self.aciertos + self.aciertos_disco) / total if total else 0.0,
+            }
+
+    def limpiar(self):
+        with self._candado:
+            self._entradas.clear()
+
+    def _clave(self, nombre, entradas):
+        texto = json.dumps([nombre, entradas, self.version()], sort_keys=True, default=str)
+        return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+    def _vigente(self, creada):
+        return self.ttl is None or time.time() - creada < self.ttl
+
+    def _leer_memoria(self, clave):
+        with self._candado:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+            creada, texto = entrada
+            if not self._vigente(creada):
+                del self._entradas[clave]
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return texto
+
+    def _guardar_memoria(self, clave, texto, creada):
+        with self._candado:
+            self._entradas[clave] = (creada, texto)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, f'{clave}.json')
+
+    def _leer_disco(self, clave):
+        if not self.directorio:
+            return None
+        ruta = self._ruta(clave)
+        try:
+            creada = os.path.getmtime(ruta)
+            if not self._vigente(creada):
+                os.remove(ruta)
+                return None
+            with open(ruta, encoding='utf-8') as f:
+                texto = f.read()
+        except OSError:
+            return None
+        self._guardar_memoria(clave, texto, creada)
+        with self._candado:
+            self.aciertos_disco += 1
+        return texto
+
+    def _guardar_disco(self, clave, texto):
+        if not self.directorio:
+            return
+        ruta = self._ruta(clave)
+        temporal = f'{ruta}.{os.getpid()}.tmp'
+        try:
+            with open(temporal, 'w', encoding='utf-8') as f:
+                f.write(texto)
+            os.replace(temporal, ruta)
+        except OSError:
+            return
+        self._podar_disco()
+
+    def _podar_disco(self):
+        # Otros procesos pueden estar escribiendo o borrando a la vez: los errores se ignoran
+        figuras = []
+        try:
+            with os.scandir(self.directorio) as entradas:
+                for entrada in entradas:
+                    if entrada.name.endswith('.json'):
+                        try:
+                            figuras.append((entrada.stat().st_mtime, entrada.path))
+                        except OSError:
+                            pass
+        except OSError:
+            return
+        figuras.sort()
+        vencidas = [ruta for creada, ruta in figuras if not self._vigente(creada)]
+        sobrantes = [ruta for _, ruta in figuras[len(vencidas):max(len(figuras) - self.max_disco, 0)]]
+        for ruta in vencidas + sobrantes:
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+
+    def obtener(self, nombre, entradas, construir):
+        """Devuelve la figura de (nombre, entradas); si no está, la construye y la guarda."""
+        clave = self._clave(nombre, entradas)
+        texto = self._leer_memoria(clave) or self._leer_disco(clave)
+        if texto is not None:
+            return cargar_json(texto)
+
+        with self._candado:
+            self.fallos += 1
+        figura = construir()
+        # Con el motor JSON de Plotly (orjson si la app llamó a respuestas.configurar_json)
+        texto = pio.to_json(figura, validate=False)
+        self._guardar_memoria(clave, texto, time.time())
+        self._guardar_disco(clave, texto)
+        return figura
+
+    def memorizar(self, nombre=None):
+        """Decorador para callbacks de Dash que devuelven una sola figura."""
+        def decorador(funcion):
+            nombre_callback = nombre or funcion.__name__
+
+            @functools.wraps(funcion)
+            def envoltura(*args):
+                return self.obtener(nombre_callback, list(args), lambda: funcion(*args))
+            return envoltura
+        return decorador
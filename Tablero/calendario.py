@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+from plotly.subplots import make_subplots
+
+facetas_options = {
+    'ninguna': 'Todos los días',
+    'dia': 'Por día de la semana',
+    'estacion': 'Por estación',
+}
+
+NOMBRES_DIA = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+
+# Estación de cada mes (la misma división que la columna 'Seasons' de los datos)
+ESTACION_MES = {12: 'Winter', 1: 'Winter', 2: 'Winter', 3: 'Spring', 4: 'Spring', 5: 'Spring',
+                6: 'Summer', 7: 'Summer', 8: 'Summer', 9: 'Autumn', 10: 'Autumn', 11: 'Autumn'}
+ORDEN_ESTACIONES = ['Spring', 'Summer', 'Autumn', 'Winter']
+
+ESCALA_CALENDARIO = 'YlOrRd'
+COLOR_SIN_DATOS = 'lightgrey'
+
+
+def _tramos(mascara):
+    """Pares (inicio, fin) de las posiciones consecutivas donde ``mascara`` es verdadera."""
+    bordes = np.diff(np.concatenate([[0], mascara.astype(np.int8), [0]]))
+    return list(zip(np.flatnonzero(bordes == 1), np.flatnonzero(bordes == -1) - 1))
+
+
+def _grupos(dias, faceta):
+    if faceta == 'dia':
+        # El 1970-01-01 fue jueves: (días desde esa fecha + 3) % 7 da lunes = 0
+        dia_semana = (dias.astype(np.int64) + 3) % 7
+        return [(nombre, np.flatnonzero(dia_semana == i)) for i, nombre in enumerate(NOMBRES_DIA)]
+    if faceta == 'estacion':
+        estaciones = pd.DatetimeIndex(dias).month.map(ESTACION_MES).to_numpy()
+        return [(nombre, np.flatnonzero(estaciones == nombre)) for nombre in ORDEN_ESTACIONES]
+    return [('', np.arange(len(dias)))]
+
+
+def figura_calendario(indice, faceta='ninguna', columna='Rented Bike Count'):
+    """Mapa de calor (horas × días) de ``columna`` desde la matriz compartida del ``indice``.
+
+    Los días sin ningún registro (los días sin servicio que elimina la
+    limpieza) se marcan explícitamente en gris; las horas faltantes sueltas
+    quedan en blanco. Con ``faceta`` 'dia' o 'estacion' se dibuja un panel
+    por día de la semana o por estación, con la misma escala de color.
+    """
+    matriz = indice.matriz(columna)
+    dias = indice.primer_dia + np.arange(len(indice))
+    sin_datos = np.diff(indice.inicios) == 0
+    grupos = [(nombre, posiciones) for nombre, posiciones in _grupos(dias, faceta) if len(posiciones)]
+
+    titulos = [nombre for nombre, _ in grupos] if faceta != 'ninguna' else None
+    fig = make_subplots(rows=len(grupos), cols=1, subplot_titles=titulos, vertical_spacing=0.3 / len(grupos))
+    for fila, (nombre, posiciones) in enumerate(grupos, start=1):
+        fechas = np.datetime_as_string(dias[posiciones], unit='D')
+        fig.add_trace(go.Heatmap(
+            x=fechas, y=np.arange(matriz.shape[1]), z=matriz[posiciones].T,
+            coloraxis='coloraxis', hoverongaps=False,
+            hovertemplate='Fecha %{x}<br>Hora %{y}<br>Demanda %{z}<extra></extra>',
+        ), row=fila, col=1)
+
+        for inicio, fin in _tramos(sin_datos[posiciones]):
+            if faceta == 'ninguna':
+                x0 = str(pd.Timestamp(dias[posiciones[inicio]]) - pd.Timedelta(hours=12))
+                x1 = str(pd.Timestamp(dias[posiciones[fin]]) + pd.Timedelta(hours=12))
+            else:
+                # En un eje por categorías las posiciones son los índices de los días
+                x0, x1 = inicio - 0.5, fin + 0.5
+            fig.add_vrect(x0=x0, x1=x1, fillcolor=COLOR_SIN_DATOS, opacity=0.8, line_width=0, layer='below',
+                          row=fila, col=1)
+
+        if faceta != 'ninguna':
+            # Con facetas los días de cada panel van seguidos (eje por categorías),
+            # con una marca al comienzo de cada mes
+            primeros = fechas[np.char.endswith(fechas, '-01')]
+            fig.update_xaxes(type='category', tickvals=primeros, ticktext=[f[:7] for f in primeros],
+                             row=fila, col=1)
+        fig.update_yaxes(title_text='Hora', dtick=6, autorange='reversed', row=fila, col=1)
+
+    maximo = np.nanmax(matriz) if np.isfinite(matriz).any() else 1
+    fig.update_layout(
+        title=f'Demanda por hora de cada día ({int(sin_datos.sum())} días sin servicio en gris)',
+        coloraxis=dict(colorscale=ESCALA_CALENDARIO, cmin=0, cmax=float(maximo),
+                       colorbar=dict(title='Demanda')),
+        plot_bgcolor='rgba(0, 0, 0, 0)',
+        height=250 + 180 * len(grupos),
+        margin=dict(t=80),
+    )
+    return fig
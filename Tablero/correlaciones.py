@@ -0,0 +1,61 @@
+import numpy as np
+import plotly.graph_objs as go
+from plotly.subplots import make_subplots
+
+ESCALA_CORRELACION = 'RdBu'
+COLOR_POSITIVA = '#2166ac'
+COLOR_NEGATIVA = '#b2182b'
+
+
+def figura_correlaciones(estadisticas, objetivo='Rented Bike Count'):
+    """Matriz de correlación y correlación de cada variable con ``objetivo``.
+
+    Sale de los co-momentos de ``estadisticas`` (un ``EstadisticasFlujo``):
+    no recorre los datos, así que cuesta lo mismo con cualquier cantidad de filas.
+    """
+    correlacion = estadisticas.correlacion()
+    con_objetivo = estadisticas.correlacion_con(objetivo).sort_values()
+
+    fig = make_subplots(rows=1, cols=2, column_widths=[0.6, 0.4], horizontal_spacing=0.25,
+                        subplot_titles=('Matriz de correlación', f'Correlación con {objetivo}'))
+    fig.add_trace(go.Heatmap(
+        z=correlacion.to_numpy().round(2), x=list(correlacion.columns), y=list(correlacion.index),
+        zmin=-1, zmax=1, colorscale=ESCALA_CORRELACION, texttemplate='%{z:.2f}',
+        colorbar=dict(title='r', x=0.45),
+        hovertemplate='%{y} / %{x}<br>r = %{z:.2f}<extra></extra>',
+    ), row=1, col=1)
+    fig.add_trace(go.Bar(
+        x=con_objetivo.to_numpy().round(3), y=list(con_objetivo.index), orientation='h',
+        marker_color=np.where(con_objetivo.to_numpy() >= 0, COLOR_POSITIVA, COLOR_NEGATIVA).tolist(),
+        hovertemplate='%{y}<br>r = %{x:.3f}<extra></extra>', showlegend=False,
+    ), row=1, col=2)
+    fig.update_yaxes(autorange='reversed', row=1, col=1)
+    fig.update_xaxes(range=[-1, 1], gridcolor='lightgrey', row=1, col=2)
+    fig.update_layout(
+        title=f'Correlaciones ({estadisticas.filas} registros)',
+        plot_bgcolor='rgba(0, 0, 0, 0)',
+        height=500,
+    )
+    return fig
+
+
+def figura_calidad(estadisticas):
+    """Tabla de calidad de datos por variable: conteo, nulos, media, desviación, rango y tasa de ceros."""
+    resumen = estadisticas.resumen()
+    columnas = ['Variable', 'Registros', 'Nulos', 'Media', 'Desv. estándar', 'Mínimo', 'Máximo', '% ceros']
+    valores = [
+        list(resumen.index),
+        resumen['count'].astype(int).tolist(),
+        resumen['nulos'].astype(int).tolist(),
+        resumen['mean'].round(2).tolist(),
+        resumen['std'].round(2).tolist(),
+        resumen['min'].round(2).tolist(),
+        resumen['max'].round(2).tolist(),
+        (100 * resumen['tasa_ceros']).round(1).tolist(),
+    ]
+    fig = go.Figure(go.Table(
+        header=dict(values=columnas, fill_color='lightgrey', align='left'),
+        cells=dict(values=valores, align='left'),
+    ))
+    fig.update_layout(title='Calidad de los datos', height=120 + 30 * len(resumen), margin=dict(t=60, b=10))
+    return fig
@@ -0,0 +1,206 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Carpeta para los archivos derivados (columnas binarias, modelos ajustados...).
+# Se puede cambiar con la variable de entorno TABLERO_CACHE.
+DIRECTORIO_CACHE = os.environ.get('TABLERO_CACHE', 'cache')
+
+VERSION_FORMATO = 2
+
+# Codificación fija de las estaciones (la misma que produjo el LabelEncoder de la limpieza)
+CODIGOS_ESTACION = {'Autumn': 0, 'Spring': 1, 'Summer': 2, 'Winter': 3}
+NOMBRES_ESTACION = {codigo: nombre for nombre, codigo in CODIGOS_ESTACION.items()}
+
+# Tipos compactos por columna. Los enteros sólo se reducen si todos los
+# valores caben; las columnas de texto se guardan como categorías.
+ESQUEMA = {
+    'Rented Bike Count': 'int32',
+    'Hour': 'int8',
+    'Temperature(C)': 'float32',
+    'Humidity(%)': 'int8',
+    'Wind speed (m/s)': 'float32',
+    'Visibility (10m)': 'int16',
+    'Dew point temperature(C)': 'float32',
+    'Solar Radiation (MJ/m2)': 'float32',
+    'Rainfall(mm)': 'float32',
+    'Snowfall (cm)': 'float32',
+    'Seasons': 'int8',
+    'Holiday': 'int8',
+    'Functioning Day': 'int8',
+    'Station': 'int16',
+}
+
+
+def directorio_columnas(ruta_csv, directorio=DIRECTORIO_CACHE):
+    nombre = os.path.splitext(os.path.basename(ruta_csv))[0]
+    return os.path.join(directorio, 'columnas', nombre)
+
+
+def _huella(ruta):
+    # Tamaño y fecha de modificación: basta para saber si el CSV cambió sin leerlo
+    st = os.stat(ruta)
+    return {'tamano': st.st_size, 'modificado': st.st_mtime_ns}
+
+
+def version(ruta_csv):
+    """Identificador de la versión de los datos; cambia cuando cambia el CSV."""
+    huella = _huella(ruta_csv)
+    return f"{huella['tamano']}-{huella['modificado']}"
+
+
+def _escribir_atomico(ruta, escribir, modo='wb'):
+    temporal = f'{ruta}.{os.getpid()}.tmp'
+    with open(temporal, modo) as f:
+        escribir(f)
+    os.replace(temporal, ruta)
+
+
+def _leer_meta(destino):
+    try:
+        with open(os.path.join(destino, 'meta.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def compactar(nombre, valores):
+    """Convierte ``valores`` al tipo de ``ESQUEMA`` si no se pierde información."""
+    tipo = ESQUEMA.get(nombre)
+    if tipo is None or valores.dtype.kind not in 'iuf' or len(valores) == 0:
+        return valores
+    tipo = np.dtype(tipo)
+    if tipo.kind in 'iu':
+        if valores.dtype.kind == 'f' and not np.all(np.mod(valores, 1) == 0):
+            return valores
+        limites = np.iinfo(tipo)
+        if valores.min() < limites.min or valores.max() > limites.max:
+            return valores
+    return valores.astype(tipo)
+
+
+def serie(tabla, columna='Rented Bike Count', columna_fecha='Date'):
+    """``columna`` indexada por fecha y hora (si ``tabla`` tiene 'Hour'), como vista sobre sus valores."""
+    indice = pd.DatetimeIndex(tabla[columna_fecha].to_numpy())
+    if 'Hour' in tabla:
+        indice = indice + pd.to_timedelta(tabla['Hour'].to_numpy(dtype=np.int64), unit='h')
+    return pd.Series(tabla[columna].to_numpy(), index=indice, name=columna, copy=False)
+
+
+def memoria(tabla):
+    """Bytes por columna de ``tabla`` (con su tipo) y el total, de mayor a menor."""
+    bytes_columna = tabla.memory_usage(index=True, deep=True)
+    reporte = pd.DataFrame({
+        'tipo': [str(tabla.index.dtype)] + [str(t) for t in tabla.dtypes],
+        'bytes': bytes_columna.to_numpy(),
+    }, index=bytes_columna.index)
+    return reporte.sort_values(by='bytes', ascending=False)
+
+
+def reporte_memoria(tabla, nombre='datos'):
+    """Texto con la memoria por columna de ``tabla``, para mostrar al arrancar."""
+    reporte = memoria(tabla)
+    lineas = [f'Memoria de {nombre}: {len(tabla)} filas, {reporte["bytes"].sum() / 2 ** 20:.2f} MB']
+    for columna, fila in reporte.iterrows():
+        lineas.append(f'  {str(columna):>28} {fila["tipo"]:>15} {fila["bytes"] / 1024:10.1f} KB')
+    return '\n'.join(lineas)
+
+
+def convertir(ruta_csv, formato_fecha=None, directorio=DIRECTORIO_CACHE):
+    """Convierte el CSV a un arreglo ``.npy`` por columna.
+
+    Las fechas quedan ya convertidas a ``datetime64``, las columnas numéricas
+    con los tipos de ``ESQUEMA``, el texto como categorías (códigos en el
+    ``.npy`` y nombres en ``meta.json``) y las filas ordenadas por
+    (Date, Hour). El archivo ``meta.json`` se escribe al final, de modo
+    que una conversión interrumpida nunca se toma por válida.
+    """
+    datos = pd.read_csv(ruta_csv)
+    datos['Date'] = pd.to_datetime(datos['Date'], format=formato_fecha)
+    datos = datos.sort_values(by=['Date', 'Hour'], kind='stable', ignore_index=True)
+
+    destino = directorio_columnas(ruta_csv, directorio)
+    os.makedirs(destino, exist_ok=True)
+
+    columnas = []
+    for i, nombre in enumerate(datos.columns):
+        valores = datos[nombre].to_numpy()
+        categorias = None
+        if valores.dtype == object:
+            categorico = pd.Categorical(valores.astype(str))
+            valores = categorico.codes  # int8 mientras haya menos de 128 categorías
+            categorias = [str(c) for c in categorico.categories]
+        else:
+            valores = compactar(nombre, valores)
+        archivo = f'col_{i:02d}.npy'
+        _escribir_atomico(os.path.join(destino, archivo), lambda f: np.save(f, valores))
+        columna = {'nombre': nombre, 'archivo': archivo, 'dtype': str(valores.dtype)}
+        if categorias is not None:
+            columna['categorias'] = categorias
+        columnas.append(columna)
+
+    meta = {
+        'version': VERSION_FORMATO,
+        'origen': os.path.abspath(ruta_csv),
+        'huella': _huella(ruta_csv),
+        'formato_fecha': formato_fecha,
+        'filas': len(datos),
+        'columnas': columnas,
+    }
+    _escribir_atomico(os.path.join(destino, 'meta.json'),
+                      lambda f: json.dump(meta, f, ensure_ascii=False, indent=1),
+                      modo='w')
+    return meta
+
+
+def _vigente(meta, ruta_csv, formato_fecha):
+    return (meta is not None
+            and meta.get('version') == VERSION_FORMATO
+            and meta.get('origen') == os.path.abspath(ruta_csv)
+            and meta.get('huella') == _huella(ruta_csv)
+            and meta.get('formato_fecha') == formato_fecha)
+
+
+def _abrir(destino, meta, columnas):
+    por_nombre = {c['nombre']: c for c in meta['columnas']}
+    if columnas is None:
+        columnas = list(por_nombre)
+    faltantes = [c for c in columnas if c not in por_nombre]
+    if faltantes:
+        raise KeyError(f'Columnas inexistentes: {faltantes}')
+    arreglos = {}
+    for c in columnas:
+        valores = np.load(os.path.join(destino, por_nombre[c]['archivo']), mmap_mode='r')
+        if 'categorias' in por_nombre[c]:
+            valores = pd.Categorical.from_codes(valores, categories=por_nombre[c]['categorias'])
+        arreglos[c] = valores
+    return pd.DataFrame(arreglos, copy=False)
+
+
+def abrir(destino, columnas=None):
+    """Abre un directorio de columnas ``.npy`` con su ``meta.json`` (p. ej. la salida de limpieza.py)."""
+    meta = _leer_meta(destino)
+    if meta is None:
+        raise FileNotFoundError(f'No hay columnas válidas en {destino}')
+    return _abrir(destino, meta, columnas)
+
+
+def cargar(ruta_csv, columnas=None, formato_fecha=None, directorio=DIRECTORIO_CACHE):
+    """Carga los datos de ``ruta_csv`` desde su copia columnar (la crea si hace falta).
+
+    Sólo se leen las columnas pedidas, mapeadas en memoria. El resultado viene
+    con 'Date' como fecha y ordenado por (Date, Hour). Si el CSV cambió desde
+    la última conversión, se vuelve a convertir.
+    """
+    destino = directorio_columnas(ruta_csv, directorio)
+    meta = _leer_meta(destino)
+    if not _vigente(meta, ruta_csv, formato_fecha):
+        meta = convertir(ruta_csv, formato_fecha, directorio)
+    try:
+        return _abrir(destino, meta, columnas)
+    except (OSError, ValueError):
+        # Algún arreglo está dañado: se regenera la copia una vez
+        meta = convertir(ruta_csv, formato_fecha, directorio)
+        return _abrir(destino, meta, columnas)
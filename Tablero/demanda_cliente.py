@@ -0,0 +1,88 @@
+import base64
+import os
+
+import numpy as np
+from dash.dependencies import Input, Output
+
+# Máximo de días que se envían al navegador de una vez (24 float32 por día).
+# Con más días la gráfica por hora se sigue calculando en el servidor.
+MAX_DIAS_PRECARGA = int(os.environ.get('TABLERO_MAX_DIAS_PRECARGA', 3660))
+
+
+def precargar(indice):
+    return len(indice) <= MAX_DIAS_PRECARGA
+
+
+def payload_demanda(indice, columna='Rented Bike Count'):
+    """Matriz (días × 24) de demanda como float32 little-endian en base64.
+
+    Un año ocupa unos 47 KB; los días sin registro van como NaN.
+    """
+    matriz = indice.matriz(columna)
+    return {
+        'inicio': str(indice.primer_dia),
+        'dias': int(matriz.shape[0]),
+        'horas': int(matriz.shape[1]),
+        'valores': base64.b64encode(np.ascontiguousarray(matriz, dtype='<f4').tobytes()).decode('ascii'),
+    }
+
+
+# Construye la misma figura que el callback del servidor (px.line por hora),
+# leyendo el día directamente de la matriz decodificada en el navegador.
+GRAFICA_HORARIA_JS = """
+function(fecha, payload) {
+    if (!payload) {
+        return window.dash_clientside.no_update;
+    }
+    var clave = payload.inicio + ':' + payload.dias + ':' + payload.valores.length;
+    var cache = window._demandaPorDia;
+    if (!cache || cache.clave !== clave) {
+        var binario = atob(payload.valores);
+        var bytes = new Uint8Array(binario.length);
+        for (var i = 0; i < binario.length; i++) {
+            bytes[i] = binario.charCodeAt(i);
+        }
+        cache = window._demandaPorDia = {clave: clave, valores: new Float32Array(bytes.buffer)};
+    }
+
+    fecha = (fecha || payload.inicio).slice(0, 10);
+    var dia = Math.round((Date.parse(fecha) - Date.parse(payload.inicio)) / 86400000);
+    var x = [], y = [];
+    if (dia >= 0 && dia < payload.dias) {
+        for (var h = 0; h < payload.horas; h++) {
+            var valor = cache.valores[dia * payload.horas + h];
+            if (!isNaN(valor)) {
+                x.push(h);
+                y.push(valor);
+            }
+        }
+    }
+    var nombres = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday'];
+    var nombre = nombres[new Date(fecha + 'T00:00:00Z').getUTCDay()];
+    var ejes = {mirror: true, ticks: 'outside', gridcolor: 'lightgrey'};
+
+    return {
+        data: [{x: x, y: y, type: 'scatter', mode: 'lines+markers', name: nombre, showlegend: true}],
+        layout: {
+            title: {text: 'Bicicletas Rentadas por Hora en ' + fecha},
+            xaxis: Object.assign({title: {text: 'Hora'}}, ejes),
+            yaxis: Object.assign({title: {text: 'Demanda de Bicicletas'}}, ejes),
+            legend: {title: {text: 'Día de la Semana'}},
+            plot_bgcolor: 'rgba(0, 0, 0, 0)'
+        }
+    };
+}
+"""
+
+
+def registrar_grafica_horaria(app, id_fecha, id_grafica, id_payload):
+    """Registra el callback del lado del cliente que actualiza la gráfica por hora.
+
+    También se dispara cuando cambian los datos precargados (p. ej. por la ingesta).
+    """
+    app.clientside_callback(
+        GRAFICA_HORARIA_JS,
+        Output(id_grafica, 'figure'),
+        [Input(id_fecha, 'date'),
+         Input(id_payload, 'data')]
+    )
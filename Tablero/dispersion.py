@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objs as go
+
+# Hasta UMBRAL_WEBGL filas se dibujan los puntos como SVG (con la fecha en el hover);
+# hasta UMBRAL_DENSIDAD se dibujan con WebGL; por encima se envía sólo la rejilla 2D.
+UMBRAL_WEBGL = int(os.environ.get('TABLERO_UMBRAL_WEBGL', 10000))
+UMBRAL_DENSIDAD = int(os.environ.get('TABLERO_UMBRAL_DENSIDAD', 100000))
+
+# Número de intervalos de la rejilla de densidad (eje x, eje y)
+BINS_DENSIDAD = (80, 60)
+
+COLOR_PUNTOS = '#ba69cf'
+ESCALA_DENSIDAD = [[0, '#f3e5f7'], [0.5, '#ba69cf'], [1, '#4a148c']]
+
+modo_options = {
+    'auto': 'Automático',
+    'puntos': 'Puntos',
+    'densidad': 'Densidad',
+}
+
+
+def elegir_modo(n_filas, modo='auto'):
+    """Modo de dibujo efectivo: 'svg', 'webgl' o 'densidad'."""
+    if modo == 'densidad':
+        return 'densidad'
+    if modo == 'puntos':
+        return 'svg' if n_filas <= UMBRAL_WEBGL else 'webgl'
+    if n_filas > UMBRAL_DENSIDAD:
+        return 'densidad'
+    if n_filas > UMBRAL_WEBGL:
+        return 'webgl'
+    return 'svg'
+
+
+def rejilla_densidad(x, y, bins=BINS_DENSIDAD):
+    """Histograma 2D vectorizado de (x, y); devuelve centros de x, centros de y y conteos.
+
+    Los conteos se devuelven con forma (len(centros_y), len(centros_x)), como
+    los espera ``go.Heatmap``, y las celdas vacías como NaN para que queden
+    transparentes.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    validos = np.isfinite(x) & np.isfinite(y)
+    conteos, bordes_x, bordes_y = np.histogram2d(x[validos], y[validos], bins=bins)
+    conteos = conteos.T
+    conteos[conteos == 0] = np.nan
+    centros_x = (bordes_x[:-1] + bordes_x[1:]) / 2
+    centros_y = (bordes_y[:-1] + bordes_y[1:]) / 2
+    return centros_x, centros_y, conteos
+
+
+def figura_dispersion(datos, x, y='Rented Bike Count', modo='auto', columna_fecha='Date'):
+    """Gráfico de ``y`` contra ``x`` con el modo de dibujo adecuado al tamaño de los datos."""
+    modo = elegir_modo(len(datos), modo)
+
+    if modo == 'densidad':
+        centros_x, centros_y, conteos = rejilla_densidad(datos[x].values, datos[y].values)
+        return go.Figure(go.Heatmap(
+            x=centros_x,
+            y=centros_y,
+            z=conteos,
+            colorscale=ESCALA_DENSIDAD,
+            colorbar=dict(title='Registros'),
+            hoverongaps=False,
+            hovertemplate='x: %{x:.2f}<br>y: %{y:.0f}<br>Registros: %{z}<extra></extra>'
+        ))
+
+    return px.scatter(datos, x=x, y=y, hover_name=datos[columna_fecha],
+                      color_discrete_sequence=[COLOR_PUNTOS],
+                      render_mode='webgl' if modo == 'webgl' else 'svg')
@@ -0,0 +1,157 @@
+"""Estadísticas de una pasada y combinables (las del cuaderno "Limpieza de datos").
+
+``EstadisticasFlujo`` guarda, por columna, el conteo, la media, la suma de
+cuadrados centrada (M2), el mínimo, el máximo, los ceros y los nulos; y, sobre
+las filas completas, el vector de medias y la matriz de co-momentos. Con eso
+salen ``describe()``, ``cov()``, ``corr()``, ``corrwith()``, la tasa de ceros y
+los nulos sin volver a leer los datos.
+
+Dos resultados parciales (de bloques distintos o de procesos distintos) se
+combinan con ``combinar`` usando las fórmulas de Chan et al. para medias y
+co-momentos, así que el resultado es el mismo que con toda la tabla en
+memoria, y ``agregar`` incorpora filas nuevas en O(filas nuevas).
+"""
+import numpy as np
+import pandas as pd
+
+# Filas que se convierten a float64 de una vez (acota la memoria temporal)
+TAM_BLOQUE = 1_000_000
+
+
+def _momentos(X):
+    """Momentos de un bloque ``X`` (filas × columnas, float64 con NaN como nulo)."""
+    validos = ~np.isnan(X)
+    conteo = validos.sum(axis=0)
+    media = np.divide(np.where(validos, X, 0).sum(axis=0), conteo,
+                      out=np.zeros(X.shape[1]), where=conteo > 0)
+    centrados = np.where(validos, X - media, 0)
+    completas = X[validos.all(axis=1)]
+    media_completa = completas.mean(axis=0) if len(completas) else np.zeros(X.shape[1])
+    desvios = completas - media_completa
+    return {
+        'filas': len(X),
+        'conteo': conteo,
+        'media': media,
+        'm2': (centrados ** 2).sum(axis=0),
+        'minimo': np.where(conteo > 0, np.where(validos, X, np.inf).min(axis=0, initial=np.inf), np.nan),
+        'maximo': np.where(conteo > 0, np.where(validos, X, -np.inf).max(axis=0, initial=-np.inf), np.nan),
+        'ceros': (X == 0).sum(axis=0),
+        'completas': len(completas),
+        'media_completa': media_completa,
+        'comomento': desvios.T @ desvios,
+    }
+
+
+def _combinar_medias(n_a, media_a, n_b, media_b):
+    """Media combinada, diferencia de medias y peso n_a·n_b/n (Chan et al.)."""
+    n_a, n_b = np.asarray(n_a, dtype=np.float64), np.asarray(n_b, dtype=np.float64)
+    n = n_a + n_b
+    hay = n > 0
+    factor = np.divide(n_b, n, out=np.zeros(n.shape), where=hay)
+    peso = np.divide(n_a * n_b, n, out=np.zeros(n.shape), where=hay)
+    delta = media_b - media_a
+    return media_a + delta * factor, delta, peso
+
+
+def _combinar(a, b):
+    media, delta, peso = _combinar_medias(a['conteo'], a['media'], b['conteo'], b['media'])
+    media_completa, delta_c, peso_c = _combinar_medias(a['completas'], a['media_completa'],
+                                                        b['completas'], b['media_completa'])
+    return {
+        'filas': a['filas'] + b['filas'],
+        'conteo': a['conteo'] + b['conteo'],
+        'media': media,
+        'm2': a['m2'] + b['m2'] + delta ** 2 * peso,
+        'minimo': np.fmin(a['minimo'], b['minimo']),
+        'maximo': np.fmax(a['maximo'], b['maximo']),
+        'ceros': a['ceros'] + b['ceros'],
+        'completas': a['completas'] + b['completas'],
+        'media_completa': media_completa,
+        'comomento': a['comomento'] + b['comomento'] + np.outer(delta_c, delta_c) * peso_c,
+    }
+
+
+class EstadisticasFlujo:
+    """Estadísticas combinables de ``columnas`` (numéricas) de una tabla.
+
+    La covarianza y la correlación se calculan sobre las filas sin nulos en
+    ninguna de las columnas (con datos sin nulos, igual que pandas).
+    Cada ``agregar`` reemplaza el estado de una vez, así que quien lee desde
+    otro hilo nunca ve una actualización a medias.
+    """
+
+    def __init__(self, columnas):
+        self.columnas = list(columnas)
+        self._m = _momentos(np.empty((0, len(self.columnas))))
+
+    @classmethod
+    def de_tabla(cls, datos, columnas=None, tam_bloque=TAM_BLOQUE):
+        if columnas is None:
+            columnas = [c for c in datos.columns if pd.api.types.is_numeric_dtype(datos[c])]
+        return cls(columnas).agregar(datos, tam_bloque)
+
+    @property
+    def filas(self):
+        return self._m['filas']
+
+    def agregar(self, datos, tam_bloque=TAM_BLOQUE):
+        """Incorpora las filas de ``datos`` (por bloques de ``tam_bloque``); devuelve ``self``."""
+        m = self._m
+        for inicio in range(0, len(datos), tam_bloque):
+            bloque = datos.iloc[inicio:inicio + tam_bloque][self.columnas]
+            m = _combinar(m, _momentos(bloque.to_numpy(dtype=np.float64, na_value=np.nan)))
+        self._m = m
+        return self
+
+    def combinar(self, otra):
+        """Estadísticas de la unión de los datos de ``self`` y ``otra`` (no modifica ninguna)."""
+        if otra.columnas != self.columnas:
+            raise ValueError('Sólo se pueden combinar estadísticas de las mismas columnas')
+        resultado = EstadisticasFlujo(self.columnas)
+        resultado._m = _combinar(self._m, otra._m)
+        return resultado
+
+    def resumen(self):
+        """Tabla por columna: conteo, nulos, media, desviación (ddof=1), mínimo, máximo y tasa de ceros."""
+        m = self._m
+        conteo = m['conteo']
+        varianza = np.divide(m['m2'], conteo - 1, out=np.full(len(conteo), np.nan), where=conteo > 1)
+        return pd.DataFrame({
+            'count': conteo,
+            'nulos': m['filas'] - conteo,
+            'mean': np.where(conteo > 0, m['media'], np.nan),
+            'std': np.sqrt(varianza),
+            'min': m['minimo'],
+            'max': m['maximo'],
+            'tasa_ceros': np.divide(m['ceros'], conteo, out=np.full(len(conteo), np.nan), where=conteo > 0),
+        }, index=self.columnas)
+
+    def covarianza(self, ddof=1):
+        m = self._m
+        n = m['completas'] - ddof
+        valores = m['comomento'] / n if n > 0 else np.full_like(m['comomento'], np.nan)
+        return pd.DataFrame(valores, index=self.columnas, columns=self.columnas)
+
+    def correlacion(self):
+        comomento = self._m['comomento']
+        escala = np.sqrt(np.diag(comomento))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            valores = comomento / np.outer(escala, escala)
+        return pd.DataFrame(valores, index=self.columnas, columns=self.columnas)
+
+    def correlacion_con(self, columna):
+        """Como ``corrwith(columna)``: correlación de cada otra columna con ``columna``."""
+        return self.correlacion()[columna].drop(columna)
+
+    def a_dict(self):
+        """Estado serializable en JSON (para guardar o enviar resultados parciales)."""
+        estado = {clave: valor.tolist() if isinstance(valor, np.ndarray) else int(valor)
+                  for clave, valor in self._m.items()}
+        return {'columnas': self.columnas, 'estado': estado}
+
+    @classmethod
+    def de_dict(cls, contenido):
+        resultado = cls(contenido['columnas'])
+        resultado._m = {clave: np.asarray(valor) if isinstance(valor, list) else valor
+                        for clave, valor in contenido['estado'].items()}
+        return resultado
@@ -0,0 +1,133 @@
+"""Gráfico del pronóstico ARIMA: historia observada, pronóstico e intervalo de confianza.
+
+Lo comparten el tablero completo (tablero_app.py) y Forecasting.py:
+``componentes_pronostico()`` va en el layout y ``registrar_pronostico``
+agrega el callback que dibuja el último resultado de un ``ServicioPronostico``.
+"""
+import dash
+from dash import dcc
+from dash.dependencies import Input, Output, State
+import plotly.graph_objs as go
+import numpy as np
+
+from reduccion import PiramideSerie, rango_x
+
+TITULO = 'Pronóstico de Demanda de Bicicletas con ARIMA'
+
+
+def componentes_pronostico():
+    """Gráfico del pronóstico y el intervalo y la versión con que se consulta."""
+    return [
+        dcc.Graph(id='forecast-graph'),
+        # Mientras se calcula el pronóstico se consulta cada 2 s; después, cada minuto
+        dcc.Interval(id='forecast-interval', interval=2000),
+        dcc.Store(id='forecast-version'),
+    ]
+
+
+def figura_pronostico(resultado, piramide, rango=None, titulo=TITULO):
+    """Figura de ``resultado`` con la historia de ``piramide`` (un ``PiramideSerie``).
+
+    De la serie observada se envían a lo sumo PUNTOS_SERIE puntos del rango
+    visible: toda la historia a baja resolución o, con zoom, la ventana a
+    resolución completa.
+    """
+    x_actual, y_actual, _ = piramide.ventana(*(rango or (None, None)))
+    forecast_index = resultado['forecast_index']
+    forecast_mean = resultado['forecast_mean']
+    forecast_ci = resultado['forecast_ci']
+
+    # Gráfico con Plotly
+    trace_actual = go.Scatter(x=x_actual, y=y_actual, mode='lines', name='Valor Actual')
+    trace_forecast = go.Scatter(x=forecast_index, y=forecast_mean, mode='lines', name='Pronóstico', line=dict(color='red'))
+    trace_ci = go.Scatter(
+        x=np.concatenate([forecast_index, forecast_index[::-1]]),
+        y=np.concatenate([forecast_ci.iloc[:, 0], forecast_ci.iloc[:, 1][::-1]]),
+        fill='toself',
+        fillcolor='rgba(255, 182, 193, 0.3)',  # Color rosa semitransparente
+        line=dict(color='rgba(255,255,255,0)'),
+        hoverinfo="skip",
+        showlegend=False
+    )
+
+    layout = go.Layout(
+        title=titulo,
+        xaxis=dict(title='Fecha', range=list(rango) if rango else None),
+        yaxis=dict(title='Demanda'),
+        plot_bgcolor='rgba(0, 0, 0, 0)',
+        hovermode='x',
+        # Conserva el zoom del usuario cuando llega una figura nueva
+        uirevision='pronostico'
+    )
+
+    return {
+        'data': [trace_actual, trace_forecast, trace_ci],
+        'layout': layout
+    }
+
+
+def _figura_aviso(mensaje):
+    return {
+        'data': [],
+        'layout': go.Layout(
+            xaxis=dict(visible=False),
+            yaxis=dict(visible=False),
+            plot_bgcolor='rgba(0, 0, 0, 0)',
+            annotations=[dict(text=mensaje, showarrow=False, font=dict(size=18))]
+        )
+    }
+
+
+def registrar_pronostico(app, servicio_pronostico, cache_figuras, titulo=TITULO):
+    """Registra en ``app`` el callback del gráfico de ``componentes_pronostico()``.
+
+    El callback nunca espera al ajuste: mientras no hay pronóstico muestra un
+    aviso. Cada figura (modelo publicado y rango visible) se construye una
+    sola vez y queda en ``cache_figuras``.
+    """
+    # Pirámide de resoluciones de la historia del último pronóstico publicado
+    piramides = {}
+
+    def piramide_historia(resultado):
+        piramide = piramides.get(resultado['version'])
+        if piramide is None:
+            serie = resultado['serie']
+            piramide = PiramideSerie(serie.index, serie.to_numpy())
+            piramides.clear()
+            piramides[resultado['version']] = piramide
+        return piramide
+
+    @app.callback(
+        [Output('forecast-graph', 'figure'),
+         Output('forecast-interval', 'interval'),
+         Output('forecast-version', 'data')],
+        [Input('forecast-interval', 'n_intervals'),
+         Input('forecast-graph', 'relayoutData')],
+        [State('forecast-version', 'data')]
+    )
+    def update_forecast_graph(_, relayout, version_mostrada):
+        resultado = servicio_pronostico.ultimo()
+        if resultado is None:
+            # Todavía no hay pronóstico: se muestra un aviso y se vuelve a consultar pronto
+            estado = servicio_pronostico.estado()
+            mensaje = 'Error al calcular el pronóstico' if estado['estado'] == 'error' else 'Calculando pronóstico...'
+            return _figura_aviso(mensaje), 2000, None
+
+        # Rango visible del eje x (None: toda la serie)
+        rango = rango_x(relayout)
+        disparadores = [t['prop_id'] for t in dash.callback_context.triggered]
+        if 'forecast-graph.relayoutData' in disparadores:
+            # Zoom o desplazamiento: se vuelve a pedir la historia del rango visible
+            if rango is False:
+                return dash.no_update, dash.no_update, dash.no_update
+        elif resultado['version'] == version_mostrada:
+            # El cliente ya muestra la última versión publicada
+            return dash.no_update, 60000, version_mostrada
+        rango = rango or None
+
+        figura = cache_figuras.obtener('update_forecast_graph', [resultado['clave'], rango],
+                                       lambda: figura_pronostico(resultado, piramide_historia(resultado),
+                                                                 rango, titulo))
+        return figura, 60000, resultado['version']
+
+    return update_forecast_graph
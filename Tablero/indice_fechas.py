@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+
+class IndiceFechas:
+    """Índice fecha -> bloque de horas sobre un DataFrame ordenado por (Date, Hour).
+
+    Se construye una sola vez al cargar los datos y ``extender`` lo actualiza
+    cuando llegan filas nuevas al final. Cada consulta por fecha es una resta
+    de enteros más una lectura de arreglo, sin recorrer la tabla.
+    """
+
+    def __init__(self, datos, columna_fecha='Date'):
+        fechas = datos[columna_fecha].values.astype('datetime64[D]')
+        if len(fechas) == 0:
+            raise ValueError('No se puede indexar un DataFrame vacío')
+        if np.any(fechas[1:] < fechas[:-1]):
+            raise ValueError('Los datos deben estar ordenados por fecha y hora')
+
+        self.datos = datos
+        self.columna_fecha = columna_fecha
+        self._matrices = {}
+        self.primer_dia = fechas[0]
+        self.ultimo_dia = fechas[-1]
+
+        # Ordinal del día de cada fila respecto al primer día
+        ordinales = (fechas - self.primer_dia).astype(np.int64)
+        n_dias = int(ordinales[-1]) + 1
+
+        # inicios[k]:inicios[k + 1] son las filas del día k (vacío si el día no existe)
+        self.inicios = np.searchsorted(ordinales, np.arange(n_dias + 1), side='left')
+
+    def __len__(self):
+        return len(self.inicios) - 1
+
+    def posiciones(self, fecha):
+        """Devuelve (inicio, fin) de las filas de ``fecha``; (0, 0) si no hay datos."""
+        dia = np.datetime64(pd.Timestamp(fecha).date(), 'D')
+        k = int((dia - self.primer_dia).astype(np.int64))
+        if k < 0 or k >= len(self):
+            return 0, 0
+        return int(self.inicios[k]), int(self.inicios[k + 1])
+
+    def dia(self, fecha):
+        """Filas (vista por posición) del día ``fecha``."""
+        inicio, fin = self.posiciones(fecha)
+        return self.datos.iloc[inicio:fin]
+
+    def matriz(self, columna='Rented Bike Count', columna_hora='Hour', horas=24):
+        """Matriz (días × horas) de ``columna``, con NaN donde no hay registro.
+
+        Se construye una vez por columna con una sola asignación vectorizada y
+        se comparte entre todas las vistas que la pidan.
+        """
+        clave = (columna, columna_hora, horas)
+        if clave not in self._matrices:
+            fechas = self.datos[self.columna_fecha].values.astype('datetime64[D]')
+            ordinales = (fechas - self.primer_dia).astype(np.int64)
+            horas_fila = self.datos[columna_hora].to_numpy(dtype=np.int64)
+            matriz = np.full((len(self), horas), np.nan, dtype=np.float32)
+            matriz[ordinales, horas_fila] = self.datos[columna].to_numpy(dtype=np.float32)
+            self._matrices[clave] = matriz
+        return self._matrices[clave]
+
+    def extender(self, datos):
+        """Actualiza el índice a ``datos``: los datos indexados más filas nuevas al final.
+
+        Sólo se recorren las filas nuevas; los días anteriores no cambian y las
+        matrices ya construidas se completan en lugar de rehacerse.
+        """
+        n = len(self.datos)
+        fechas = datos[self.columna_fecha].values[n:].astype('datetime64[D]')
+        if len(fechas) and (fechas[0] < self.ultimo_dia or np.any(fechas[1:] < fechas[:-1])):
+            raise ValueError('Las filas nuevas deben ser posteriores y estar ordenadas por fecha y hora')
+        self.datos = datos
+        if len(fechas) == 0:
+            return
+
+        ordinales = (fechas - self.primer_dia).astype(np.int64)
+        ultimo = len(self) - 1
+        n_dias = int(ordinales[-1]) + 1
+        # El último día puede recibir más horas; los días siguientes empiezan en las filas nuevas
+        self.inicios = np.concatenate([
+            self.inicios[:ultimo + 1],
+            n + np.searchsorted(ordinales, np.arange(ultimo + 1, n_dias + 1), side='left'),
+        ])
+        self.ultimo_dia = fechas[-1]
+
+        for (columna, columna_hora, horas), matriz in list(self._matrices.items()):
+            if len(matriz) < len(self):
+                matriz = np.vstack([matriz, np.full((len(self) - len(matriz), horas), np.nan, dtype=np.float32)])
+            horas_fila = datos[columna_hora].to_numpy(dtype=np.int64)[n:]
+            matriz[ordinales, horas_fila] = datos[columna].to_numpy(dtype=np.float32)[n:]
+            self._matrices[(columna, columna_hora, horas)] = matriz
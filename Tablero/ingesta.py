@@ -0,0 +1,359 @@
+"""Ingesta en vivo de filas horarias nuevas.
+
+Las filas nuevas se agregan al final de un CSV de sólo-agregar
+(``RUTA_INGESTA``, con las mismas columnas que SeoulBikeData_limpio.csv).
+Cada proceso del tablero lee lo agregado desde su última revisión, a lo
+sumo cada ``INTERVALO_REVISION`` segundos y durante las solicitudes, así
+que todos los workers de gunicorn ven los mismos datos sin hilos propios.
+
+``POST /api/ingesta`` valida las filas y las escribe en ese archivo:
+    {"columnas": [...], "filas": [[...], ...]}
+    [{"Date": "2018-12-01", "Hour": 0, ...}, ...]
+Responde con las filas agregadas y la versión de los datos. Exige la clave
+compartida TABLERO_TOKEN_INGESTA en la cabecera ``Authorization: Bearer
+<clave>`` (o ``X-Token-Ingesta``); sin esa variable la ruta responde 403.
+"""
+import hmac
+import io
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from flask import jsonify, request
+
+from datos import CODIGOS_ESTACION, DIRECTORIO_CACHE
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+logger = logging.getLogger('tablero.ingesta')
+
+RUTA_INGESTA = os.environ.get('TABLERO_INGESTA', os.path.join(DIRECTORIO_CACHE, 'ingesta.csv'))
+INTERVALO_REVISION = float(os.environ.get('TABLERO_INTERVALO_INGESTA', 1.0))
+TOKEN_INGESTA = os.environ.get('TABLERO_TOKEN_INGESTA')
+
+# Máximo de filas por solicitud
+MAX_FILAS = int(os.environ.get('TABLERO_MAX_FILAS_INGESTA', 100_000))
+
+# Rangos válidos de las columnas conocidas
+RANGOS = {
+    'Hour': (0, 23),
+    'Seasons': (0, 3),
+    'Rented Bike Count': (0, None),
+    'Humidity(%)': (0, 100),
+    'Wind speed (m/s)': (0, None),
+    'Visibility (10m)': (0, None),
+    'Solar Radiation (MJ/m2)': (0, None),
+}
+
+
+def _instantes(tabla):
+    # Fecha + hora como un entero (ns), para comparar el orden de las filas
+    instantes = tabla['Date'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    if 'Hour' in tabla:
+        instantes = instantes + tabla['Hour'].to_numpy(dtype=np.int64) * 3_600_000_000_000
+    return instantes
+
+
+def validar(filas, referencia, omitir_anteriores=False):
+    """Normaliza ``filas`` a las columnas y tipos de ``referencia`` y revisa que sean válidas.
+
+    Las filas deben venir ordenadas por (Date, Hour), sin repetirse y después
+    de la última fila de ``referencia``; con ``omitir_anteriores`` las que no
+    lo estén se descartan (releer un archivo ya leído no es un error).
+    Lanza ``ValueError`` con el motivo si algo no es válido.
+    """
+    if not isinstance(filas, pd.DataFrame):
+        filas = pd.DataFrame(filas)
+    faltantes = [c for c in referencia.columns if c not in filas.columns]
+    if faltantes:
+        raise ValueError(f'Faltan columnas: {faltantes}')
+    sobrantes = [c for c in filas.columns if c not in referencia.columns]
+    if sobrantes:
+        raise ValueError(f'Columnas desconocidas: {sobrantes}')
+    filas = filas[list(referencia.columns)].reset_index(drop=True)
+    if len(filas) == 0:
+        return referencia.iloc[:0]
+    nulos = filas.columns[filas.isna().any()].tolist()
+    if nulos:
+        raise ValueError(f'Valores vacíos en: {nulos}')
+
+    columnas = {}
+    for columna in referencia.columns:
+        tipo = referencia[columna].dtype
+        valores = filas[columna]
+        if tipo.kind == 'M':
+            try:
+                columnas[columna] = pd.to_datetime(valores).to_numpy(dtype=tipo)
+            except (ValueError, TypeError) as e:
+                raise ValueError(f'Fechas inválidas en {columna!r}') from e
+            continue
+        if columna == 'Seasons' and valores.dtype == object:
+            valores = valores.map(lambda v: CODIGOS_ESTACION.get(v, v))
+        numeros = pd.to_numeric(valores, errors='coerce').to_numpy(dtype=np.float64)
+        if np.isnan(numeros).any():
+            raise ValueError(f'Valores no numéricos en {columna!r}')
+        minimo, maximo = RANGOS.get(columna, (None, None))
+        if (minimo is not None and numeros.min() < minimo) or (maximo is not None and numeros.max() > maximo):
+            raise ValueError(f'Valores fuera de rango en {columna!r} ({minimo} a {maximo})')
+        if tipo.kind in 'iu':
+            limites = np.iinfo(tipo)
+            if np.any(numeros != np.round(numeros)) or numeros.min() < limites.min or numeros.max() > limites.max:
+                raise ValueError(f'{columna!r} debe tener enteros entre {limites.min} y {limites.max}')
+        columnas[columna] = numeros.astype(tipo)
+    filas = pd.DataFrame(columnas)
+
+    instantes = _instantes(filas)
+    if len(referencia):
+        posteriores = instantes > _instantes(referencia.iloc[-1:])[0]
+        if omitir_anteriores:
+            filas, instantes = filas[posteriores].reset_index(drop=True), instantes[posteriores]
+        elif not posteriores.all():
+            raise ValueError('Las filas deben ser posteriores a la última fila de los datos')
+    if np.any(instantes[1:] <= instantes[:-1]):
+        raise ValueError('Las filas deben venir ordenadas por fecha y hora, sin repetirse')
+    return filas
+
+
+def _token_valido(token_esperado):
+    autorizacion = request.headers.get('Authorization', '')
+    if autorizacion.startswith('Bearer '):
+        recibido = autorizacion[len('Bearer '):].strip()
+    else:
+        recibido = request.headers.get('X-Token-Ingesta', '')
+    # Comparación en tiempo constante: no revela cuántos caracteres coinciden
+    return hmac.compare_digest(recibido.encode('utf-8'), token_esperado.encode('utf-8'))
+
+
+class AlmacenDatos:
+    """Tabla del tablero que crece con las filas ingeridas.
+
+    Mientras no llegan filas, ``datos`` es la tabla original (mapeada en
+    memoria). La primera ingesta la copia a arreglos con espacio libre al
+    final; las siguientes sólo escriben las filas nuevas, así que agregar k
+    filas cuesta O(k). Cada ingesta publica un DataFrame nuevo con vistas de
+    esos arreglos: quien tenga el anterior lo sigue viendo completo.
+
+    ``suscribir(funcion, reconstruir)`` registra ``funcion(datos, nuevas)``,
+    que se llama en cada ingesta y en orden, para actualizar las estructuras
+    derivadas. Los suscriptores corren antes de publicar ``datos``: si uno
+    falla, la ingesta no se publica, cada suscriptor ya llamado (y el que
+    falló) rehace su estado con ``reconstruir(datos)`` sobre los datos
+    vigentes y el error se propaga.
+    """
+
+    def __init__(self, datos):
+        no_soportadas = [c for c in datos.columns if datos[c].dtype.kind not in 'iufbM']
+        if no_soportadas:
+            raise TypeError(f'Sólo se admiten columnas numéricas y de fecha: {no_soportadas}')
+        self.datos = datos
+        self.filas_base = len(datos)
+        self._arreglos = None
+        self._candado = threading.Lock()
+        self._suscriptores = []
+
+    @property
+    def version(self):
+        """Filas ingeridas; es la misma en todos los procesos que leyeron el mismo archivo."""
+        return len(self.datos) - self.filas_base
+
+    def suscribir(self, funcion, reconstruir=None):
+        self._suscriptores.append((funcion, reconstruir))
+
+    def leer(self, funcion):
+        """Devuelve ``funcion(datos)``; mientras corre no se publica ninguna ingesta."""
+        with self._candado:
+            return funcion(self.datos)
+
+    def agregar(self, filas, omitir_anteriores=False):
+        """Valida ``filas``, las agrega al final y devuelve las filas agregadas."""
+        with self._candado:
+            nuevas = validar(filas, self.datos, omitir_anteriores)
+            if len(nuevas) == 0:
+                return nuevas
+            n, k = len(self.datos), len(nuevas)
+            if self._arreglos is None or n + k > len(next(iter(self._arreglos.values()))):
+                capacidad = max(n + k, int(1.5 * n))
+                arreglos = {}
+                for columna in self.datos.columns:
+                    valores = self.datos[columna].to_numpy()
+                    arreglos[columna] = np.empty(capacidad, dtype=valores.dtype)
+                    arreglos[columna][:n] = valores
+                self._arreglos = arreglos
+            for columna, arreglo in self._arreglos.items():
+                arreglo[n:n + k] = nuevas[columna].to_numpy()
+            # Las filas n.. de los arreglos no son parte de self.datos hasta publicarlo
+            candidato = pd.DataFrame({c: a[:n + k] for c, a in self._arreglos.items()}, copy=False)
+            aplicados = []
+            try:
+                for funcion, reconstruir in self._suscriptores:
+                    aplicados.append(reconstruir)
+                    funcion(candidato, nuevas)
+            except Exception:
+                for reconstruir in reversed(aplicados):
+                    if reconstruir is not None:
+                        reconstruir(self.datos)
+                raise
+            self.datos = candidato
+        return nuevas
+
+
+def _bloquear(archivo):
+    if fcntl is not None:
+        fcntl.flock(archivo.fileno(), fcntl.LOCK_EX)
+
+
+def _desbloquear(archivo):
+    if fcntl is not None:
+        fcntl.flock(archivo.fileno(), fcntl.LOCK_UN)
+
+
+class LectorIngesta:
+    """Sigue el CSV de ingesta y agrega al ``almacen`` las líneas completas nuevas.
+
+    Un bloque con filas inválidas se descarta (los demás procesos lo descartan
+    igual). Si en cambio falla la aplicación local (un suscriptor), la
+    posición no avanza: el bloque se reintenta en la próxima revisión, así
+    que este proceso no queda con menos filas que los demás, y el error queda
+    en ``fallo`` hasta que se aplique.
+    """
+
+    def __init__(self, almacen, ruta=RUTA_INGESTA, intervalo=INTERVALO_REVISION):
+        self.almacen = almacen
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self.posicion = 0
+        self.cabecera = None
+        self.errores = 0
+        self.fallo = None
+        self._ultima_revision = float('-inf')
+        self._candado = threading.Lock()
+
+    def revisar(self, forzar=False):
+        """Lee lo agregado al archivo desde la última vez; devuelve las filas ingeridas.
+
+        Sin ``forzar``, no hace nada si se revisó hace menos de ``intervalo``
+        segundos o si otro hilo está revisando.
+        """
+        ahora = time.monotonic()
+        if not forzar and ahora - self._ultima_revision < self.intervalo:
+            return 0
+        if not self._candado.acquire(blocking=forzar):
+            return 0
+        try:
+            self._ultima_revision = ahora
+            try:
+                tamano = os.path.getsize(self.ruta)
+            except OSError:
+                return 0
+            if tamano < self.posicion:
+                # El archivo se reemplazó: se relee y se omiten las filas ya ingeridas
+                self.posicion, self.cabecera = 0, None
+            if tamano == self.posicion:
+                return 0
+            with open(self.ruta, 'rb') as f:
+                f.seek(self.posicion)
+                bloque = f.read(tamano - self.posicion)
+            # Sólo líneas completas: una escritura a medias se lee en la próxima revisión
+            fin = bloque.rfind(b'\n') + 1
+            if fin == 0:
+                return 0
+            bloque = bloque[:fin]
+            cabecera = self.cabecera
+            if cabecera is None:
+                corte = bloque.index(b'\n') + 1
+                cabecera, bloque = bloque[:corte], bloque[corte:]
+            ingeridas = 0
+            try:
+                if bloque.strip():
+                    filas = pd.read_csv(io.BytesIO(cabecera + bloque))
+                    ingeridas = len(self.almacen.agregar(filas, omitir_anteriores=True))
+            except ValueError as e:
+                self.errores += 1
+                logger.warning('Bloque de ingesta descartado (%s, bytes %d-%d): %s',
+                               self.ruta, self.posicion, self.posicion + fin, e)
+            except Exception as e:
+                # Falló un suscriptor: el almacén ya volvió a los datos anteriores
+                # y el bloque se vuelve a leer en la próxima revisión
+                self.errores += 1
+                self.fallo = e
+                logger.exception('Bloque de ingesta no aplicado, se reintentará (%s, bytes %d-%d)',
+                                 self.ruta, self.posicion, self.posicion + fin)
+                return 0
+            self.posicion += fin
+            self.cabecera = cabecera
+            self.fallo = None
+            return ingeridas
+        finally:
+            self._candado.release()
+
+    def escribir(self, filas):
+        """Valida ``filas`` contra los datos actuales, las agrega al archivo y las ingiere.
+
+        Lanza ``RuntimeError`` si este proceso no pudo aplicar las filas del
+        archivo (ver ``fallo``): antes de escribir, porque no se puede validar
+        el orden contra datos incompletos, o después, con las filas ya
+        guardadas en el archivo y pendientes de reintento.
+        """
+        directorio = os.path.dirname(self.ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        with open(self.ruta, 'a+b') as f:
+            _bloquear(f)
+            try:
+                # Primero lo que hayan escrito otros procesos, para validar el orden contra eso
+                self.revisar(forzar=True)
+                if self.fallo is not None:
+                    raise RuntimeError(f'No se pudieron aplicar las filas ya ingeridas: {self.fallo}')
+                nuevas = validar(filas, self.almacen.datos)
+                if len(nuevas):
+                    f.seek(0, os.SEEK_END)
+                    texto = nuevas.to_csv(index=False, header=f.tell() == 0, date_format='%Y-%m-%d')
+                    f.write(texto.encode('utf-8'))
+                    f.flush()
+            finally:
+                _desbloquear(f)
+        self.revisar(forzar=True)
+        if self.fallo is not None:
+            raise RuntimeError(f'Filas guardadas pero no aplicadas (se reintentará): {self.fallo}')
+        return len(nuevas)
+
+    def registrar(self, server, ruta='/api/ingesta', token=TOKEN_INGESTA):
+        """Revisa el archivo durante las solicitudes del ``server`` y registra ``POST ruta``.
+
+        ``POST ruta`` sólo acepta solicitudes con ``token``; la dirección de
+        origen no sirve detrás de un proxy inverso, que hace todo local.
+        """
+
+        @server.before_request
+        def _revisar_ingesta():
+            self.revisar()
+
+        def ingesta():
+            if not token:
+                return jsonify({'error': 'Ingesta desactivada: falta TABLERO_TOKEN_INGESTA'}), 403
+            if not _token_valido(token):
+                return jsonify({'error': 'Clave de ingesta inválida'}), 401, {'WWW-Authenticate': 'Bearer'}
+            cuerpo = request.get_json(force=True, silent=True)
+            try:
+                if isinstance(cuerpo, dict) and 'filas' in cuerpo:
+                    filas = pd.DataFrame(cuerpo['filas'], columns=cuerpo.get('columnas'))
+                elif isinstance(cuerpo, (list, dict)):
+                    filas = pd.DataFrame(cuerpo)
+                else:
+                    raise ValueError('Se esperaba JSON con filas')
+                if len(filas) > MAX_FILAS:
+                    return jsonify({'error': f'Máximo {MAX_FILAS} filas por solicitud'}), 413
+                agregadas = self.escribir(filas)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            except RuntimeError as e:
+                return jsonify({'error': str(e)}), 500
+            return jsonify({'filas': agregadas, 'version': self.almacen.version})
+
+        server.add_url_rule(ruta, 'ingesta', ingesta, methods=['POST'])
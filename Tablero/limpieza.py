@@ -0,0 +1,204 @@
+"""Limpieza de SeoulBikeData por bloques (versión ejecutable del cuaderno "Limpieza de datos").
+
+Uso:
+    python Tablero/limpieza.py data/SeoulBikeData_utf8.csv data/SeoulBikeData_limpio.csv
+    python Tablero/limpieza.py entrada.csv salida_columnas --formato columnas --procesos 4
+    python Tablero/limpieza.py entrada.csv salida.csv --procesos 4 --estadisticas estadisticas.json
+
+Pasos (los mismos del cuaderno):
+    - 'Date' se convierte con el formato %d/%m/%Y
+    - se eliminan Dew point, Rainfall, Snowfall y Holiday
+    - se conservan sólo las filas con Functioning Day == "Yes"
+    - 'Seasons' se codifica con una tabla fija (Autumn=0, Spring=1, Summer=2, Winter=3)
+
+La entrada se lee en bloques de tamaño fijo con tipos explícitos, así que la
+memoria usada no depende del tamaño del archivo. Con ``--estadisticas`` cada
+bloque calcula también sus estadísticas (en su proceso, si hay varios) y se
+combinan al final en un JSON que ``EstadisticasFlujo.de_dict`` vuelve a leer.
+"""
+import argparse
+import json
+import os
+import shutil
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from numpy.lib import format as formato_npy
+
+from datos import CODIGOS_ESTACION, ESQUEMA, VERSION_FORMATO
+from estadisticas import EstadisticasFlujo
+
+# Columnas de la salida, en el orden de SeoulBikeData_limpio.csv
+COLUMNAS_SALIDA = [
+    'Date', 'Rented Bike Count', 'Hour', 'Temperature(C)', 'Humidity(%)',
+    'Wind speed (m/s)', 'Visibility (10m)', 'Solar Radiation (MJ/m2)', 'Seasons',
+]
+
+# Tipos de las columnas que se leen (los de datos.ESQUEMA; las eliminadas ni siquiera se cargan)
+TIPOS_ENTRADA = {
+    'Date': 'object',
+    **{c: ESQUEMA[c] for c in ['Rented Bike Count', 'Hour', 'Temperature(C)', 'Humidity(%)',
+                               'Wind speed (m/s)', 'Visibility (10m)', 'Solar Radiation (MJ/m2)']},
+    'Seasons': 'object',
+    'Functioning Day': 'object',
+}
+
+FORMATO_FECHA = '%d/%m/%Y'
+TAM_BLOQUE = 100_000
+
+
+def limpiar_bloque(bloque):
+    """Aplica la limpieza a un bloque del CSV original."""
+    bloque = bloque[bloque['Functioning Day'] == 'Yes']
+    bloque = bloque.drop(columns=['Functioning Day'])
+    bloque['Date'] = pd.to_datetime(bloque['Date'], format=FORMATO_FECHA)
+
+    estaciones = bloque['Seasons'].map(CODIGOS_ESTACION)
+    if estaciones.isna().any():
+        desconocidas = sorted(bloque.loc[estaciones.isna(), 'Seasons'].astype(str).unique())
+        raise ValueError(f'Estaciones desconocidas: {desconocidas}')
+    bloque['Seasons'] = estaciones.astype('int8')
+
+    return bloque[COLUMNAS_SALIDA]
+
+
+def limpiar_y_medir(bloque):
+    """``limpiar_bloque`` más las estadísticas de las columnas numéricas del bloque limpio."""
+    limpio = limpiar_bloque(bloque)
+    return limpio, EstadisticasFlujo(COLUMNAS_SALIDA[1:]).agregar(limpio)
+
+
+def leer_bloques(ruta, tam_bloque=TAM_BLOQUE):
+    return pd.read_csv(ruta, usecols=list(TIPOS_ENTRADA), dtype=TIPOS_ENTRADA, chunksize=tam_bloque)
+
+
+def _en_orden(bloques, procesos, funcion=limpiar_bloque):
+    """Limpia los bloques (en paralelo si ``procesos`` > 1) y los devuelve en orden.
+
+    Nunca hay más de 2 × ``procesos`` bloques pendientes, así que la memoria
+    sigue acotada aunque la lectura sea más rápida que la limpieza.
+    """
+    if procesos <= 1:
+        for bloque in bloques:
+            yield funcion(bloque)
+        return
+
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        pendientes = deque()
+        for bloque in bloques:
+            pendientes.append(ejecutor.submit(funcion, bloque))
+            if len(pendientes) >= 2 * procesos:
+                yield pendientes.popleft().result()
+        while pendientes:
+            yield pendientes.popleft().result()
+
+
+class EscritorCSV:
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.temporal = f'{ruta}.{os.getpid()}.tmp'
+        self.primero = True
+
+    def escribir(self, bloque):
+        bloque.to_csv(self.temporal, mode='w' if self.primero else 'a', header=self.primero,
+                      index=False, encoding='utf-8', date_format='%Y-%m-%d')
+        self.primero = False
+
+    def cerrar(self):
+        if self.primero:
+            pd.DataFrame(columns=COLUMNAS_SALIDA).to_csv(self.temporal, index=False, encoding='utf-8')
+        os.replace(self.temporal, self.ruta)
+
+
+class EscritorColumnas:
+    """Escribe un ``.npy`` por columna (el formato que lee ``datos.abrir``).
+
+    Cada bloque se agrega en crudo a un archivo temporal por columna; al cerrar
+    se escribe la cabecera ``.npy`` con el número total de filas y se copia el
+    contenido por partes.
+    """
+
+    def __init__(self, destino):
+        self.destino = destino
+        os.makedirs(destino, exist_ok=True)
+        self.filas = 0
+        self.tipos = {}
+        self.crudos = {}
+
+    def escribir(self, bloque):
+        for i, nombre in enumerate(COLUMNAS_SALIDA):
+            valores = bloque[nombre].to_numpy()
+            if nombre == 'Date':
+                valores = valores.astype('datetime64[ns]')
+            tipo = self.tipos.setdefault(nombre, valores.dtype)
+            if nombre not in self.crudos:
+                self.crudos[nombre] = open(os.path.join(self.destino, f'col_{i:02d}.crudo'), 'wb')
+            np.ascontiguousarray(valores, dtype=tipo).tofile(self.crudos[nombre])
+        self.filas += len(bloque)
+
+    def cerrar(self):
+        columnas = []
+        for i, nombre in enumerate(COLUMNAS_SALIDA):
+            archivo = f'col_{i:02d}.npy'
+            ruta = os.path.join(self.destino, archivo)
+            tipo = self.tipos.get(nombre, np.dtype(TIPOS_ENTRADA.get(nombre, 'datetime64[ns]')))
+            crudo = os.path.join(self.destino, f'col_{i:02d}.crudo')
+            if nombre in self.crudos:
+                self.crudos[nombre].close()
+            else:
+                open(crudo, 'wb').close()
+            with open(ruta, 'wb') as salida, open(crudo, 'rb') as entrada:
+                cabecera = {'descr': formato_npy.dtype_to_descr(tipo), 'fortran_order': False,
+                            'shape': (self.filas,)}
+                formato_npy.write_array_header_1_0(salida, cabecera)
+                shutil.copyfileobj(entrada, salida, 1 << 20)
+            os.remove(crudo)
+            columnas.append({'nombre': nombre, 'archivo': archivo, 'dtype': str(tipo)})
+
+        meta = {'version': VERSION_FORMATO, 'filas': self.filas, 'columnas': columnas}
+        with open(os.path.join(self.destino, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=1)
+
+
+def limpiar(entrada, salida, formato='csv', tam_bloque=TAM_BLOQUE, procesos=1, ruta_estadisticas=None):
+    """Limpia ``entrada`` y escribe el resultado en ``salida``; devuelve las filas escritas.
+
+    Con ``ruta_estadisticas`` guarda ahí (JSON) las estadísticas de la salida.
+    """
+    escritor = EscritorCSV(salida) if formato == 'csv' else EscritorColumnas(salida)
+    estadisticas = EstadisticasFlujo(COLUMNAS_SALIDA[1:])
+    filas = 0
+    if ruta_estadisticas is None:
+        resultados = ((bloque, None) for bloque in _en_orden(leer_bloques(entrada, tam_bloque), procesos))
+    else:
+        resultados = _en_orden(leer_bloques(entrada, tam_bloque), procesos, limpiar_y_medir)
+    for bloque, parcial in resultados:
+        escritor.escribir(bloque)
+        filas += len(bloque)
+        if parcial is not None:
+            estadisticas = estadisticas.combinar(parcial)
+    escritor.cerrar()
+    if ruta_estadisticas is not None:
+        with open(ruta_estadisticas, 'w', encoding='utf-8') as f:
+            json.dump(estadisticas.a_dict(), f, ensure_ascii=False)
+    return filas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Limpieza por bloques de SeoulBikeData.')
+    parser.add_argument('entrada', help='CSV original (SeoulBikeData_utf8.csv)')
+    parser.add_argument('salida', help='CSV limpio o directorio de columnas')
+    parser.add_argument('--formato', choices=['csv', 'columnas'], default='csv')
+    parser.add_argument('--tam-bloque', type=int, default=TAM_BLOQUE, help='filas por bloque')
+    parser.add_argument('--procesos', type=int, default=1, help='procesos para limpiar bloques en paralelo')
+    parser.add_argument('--estadisticas', help='JSON donde guardar las estadísticas de la salida')
+    args = parser.parse_args(argv)
+
+    filas = limpiar(args.entrada, args.salida, args.formato, args.tam_bloque, args.procesos, args.estadisticas)
+    print(f'{filas} filas escritas en {args.salida}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+
+from flask import Response, g, request
+
+logger = logging.getLogger('tablero.metricas')
+
+# Umbral (segundos) a partir del cual un callback se registra como lento
+UMBRAL_LENTO = float(os.environ.get('TABLERO_UMBRAL_LENTO', 1.0))
+
+# Perfilador por muestreo: sólo si TABLERO_PERFILADOR=1 y la solicitud lo pide
+PERFILADOR_ACTIVO = os.environ.get('TABLERO_PERFILADOR') == '1'
+DIRECTORIO_PERFILES = os.environ.get('TABLERO_PERFILES', os.path.join('cache', 'perfiles'))
+
+LIMITES_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_BYTES = (1e3, 1e4, 1e5, 1e6, 1e7)
+
+
+class Histograma:
+    def __init__(self, limites):
+        self.limites = tuple(limites)
+        self.conteos = [0] * (len(self.limites) + 1)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        i = 0
+        while i < len(self.limites) and valor > self.limites[i]:
+            i += 1
+        self.conteos[i] += 1
+        self.suma += valor
+        self.total += 1
+
+    def lineas(self, nombre, etiquetas):
+        acumulado = 0
+        for limite, conteo in zip(self.limites + (float('inf'),), self.conteos):
+            acumulado += conteo
+            le = '+Inf' if limite == float('inf') else f'{limite:g}'
+            yield f'{nombre}_bucket{{{etiquetas},le="{le}"}} {acumulado}'
+        yield f'{nombre}_sum{{{etiquetas}}} {self.suma:g}'
+        yield f'{nombre}_count{{{etiquetas}}} {self.total}'
+
+
+class Metricas:
+    """Registro de métricas del tablero en formato de texto de Prometheus.
+
+    Cada proceso (worker) tiene su propio registro; la etiqueta ``pid`` de
+    ``tablero_info`` permite distinguirlos al consultar ``/metricas``.
+    """
+
+    def __init__(self):
+        self._candado = threading.Lock()
+        self._duraciones = collections.defaultdict(lambda: Histograma(LIMITES_SEGUNDOS))
+        self._tamanos = collections.defaultdict(lambda: Histograma(LIMITES_BYTES))
+        self._lentos = collections.Counter()
+        self._medidores = {}
+
+    def observar_callback(self, callback, segundos, n_bytes):
+        with self._candado:
+            self._duraciones[callback].observar(segundos)
+            self._tamanos[callback].observar(n_bytes)
+            if segundos > UMBRAL_LENTO:
+                self._lentos[callback] += 1
+
+    def registrar_medidor(self, nombre, funcion, ayuda=''):
+        """Valor que se lee al momento de exponer las métricas (duraciones, cachés...)."""
+        self._medidores[nombre] = (funcion, ayuda)
+
+    def texto(self):
+        lineas = [
+            '# HELP tablero_info Proceso que responde',
+            '# TYPE tablero_info gauge',
+            f'tablero_info{{pid="{os.getpid()}"}} 1',
+        ]
+        with self._candado:
+            lineas += ['# HELP tablero_callback_duracion_segundos Duración de cada callback de Dash',
+                       '# TYPE tablero_callback_duracion_segundos histogram']
+            for callback, histograma in sorted(self._duraciones.items()):
+                lineas += histograma.lineas('tablero_callback_duracion_segundos', f'callback="{callback}"')
+            lineas += ['# HELP tablero_callback_respuesta_bytes Tamaño de la respuesta de cada callback',
+                       '# TYPE tablero_callback_respuesta_bytes histogram']
+            for callback, histograma in sorted(self._tamanos.items()):
+                lineas += histograma.lineas('tablero_callback_respuesta_bytes', f'callback="{callback}"')
+            lineas += ['# HELP tablero_callback_lentos_total Callbacks que superaron el umbral de lentitud',
+                       '# TYPE tablero_callback_lentos_total counter']
+            for callback, conteo in sorted(self._lentos.items()):
+                lineas.append(f'tablero_callback_lentos_total{{callback="{callback}"}} {conteo}')
+
+        for nombre, (funcion, ayuda) in sorted(self._medidores.items()):
+            try:
+                valor = funcion()
+            except Exception:
+                continue
+            if valor is None:
+                continue
+            lineas += [f'# HELP {nombre} {ayuda}', f'# TYPE {nombre} gauge', f'{nombre} {float(valor):g}']
+        return '\n'.join(lineas) + '\n'
+
+
+class PerfiladorMuestreo:
+    """Perfilador por muestreo de un hilo: cada ``intervalo`` segundos guarda su pila.
+
+    El resultado se escribe en formato de pilas colapsadas (una línea por pila
+    con su número de muestras), que leen flamegraph.pl y speedscope.
+    """
+
+    def __init__(self, hilo_id, intervalo=0.005):
+        self.hilo_id = hilo_id
+        self.intervalo = intervalo
+        self.muestras = collections.Counter()
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._muestrear, name='perfilador', daemon=True)
+
+    def _muestrear(self):
+        while not self._detener.wait(self.intervalo):
+            marco = sys._current_frames().get(self.hilo_id)
+            pila = []
+            while marco is not None:
+                codigo = marco.f_code
+                pila.append(f'{os.path.basename(codigo.co_filename)}:{codigo.co_name}:{marco.f_lineno}')
+                marco = marco.f_back
+            if pila:
+                self.muestras[';'.join(reversed(pila))] += 1
+
+    def __enter__(self):
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._detener.set()
+        self._hilo.join()
+
+    def guardar(self, nombre):
+        os.makedirs(DIRECTORIO_PERFILES, exist_ok=True)
+        ruta = os.path.join(DIRECTORIO_PERFILES, f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-{nombre}.txt')
+        with open(ruta, 'w', encoding='utf-8') as f:
+            for pila, conteo in self.muestras.most_common():
+                f.write(f'{pila} {conteo}\n')
+        return ruta
+
+
+def _nombre_callback(cuerpo):
+    salida = (cuerpo or {}).get('output', 'desconocido')
+    # Salidas múltiples: "..a.figure...b.data.." -> "a.figure+b.data"
+    return '+'.join(p for p in salida.strip('.').split('...') if p) or 'desconocido'
+
+
+def instrumentar(server, metricas, ruta='/metricas'):
+    """Mide los callbacks de Dash en el ``server`` de Flask y expone ``ruta``.
+
+    Se mide cada POST a ``/_dash-update-component`` (tiempo y bytes de la
+    respuesta). Los callbacks más lentos que ``UMBRAL_LENTO`` se registran en
+    el log con sus entradas. Con TABLERO_PERFILADOR=1, una solicitud con la
+    cabecera ``X-Perfilar: 1`` se perfila por muestreo y el perfil se guarda
+    en ``DIRECTORIO_PERFILES``.
+    """
+
+    @server.before_request
+    def _inicio():
+        if request.path.endswith('/_dash-update-component'):
+            g.metricas_inicio = time.perf_counter()
+            if PERFILADOR_ACTIVO and request.headers.get('X-Perfilar') == '1':
+                g.perfilador = PerfiladorMuestreo(threading.get_ident()).__enter__()
+
+    @server.after_request
+    def _fin(respuesta):
+        inicio = g.pop('metricas_inicio', None)
+        if inicio is None:
+            return respuesta
+        segundos = time.perf_counter() - inicio
+        cuerpo = request.get_json(silent=True)
+        callback = _nombre_callback(cuerpo)
+        n_bytes = respuesta.calculate_content_length() or 0
+        metricas.observar_callback(callback, segundos, n_bytes)
+
+        if segundos > UMBRAL_LENTO:
+            entradas = [(e.get('id'), e.get('property'), e.get('value'))
+                        for e in (cuerpo or {}).get('inputs', []) if isinstance(e, dict)]
+            logger.warning('Callback lento %s: %.3f s, %d bytes, entradas=%.500s',
+                           callback, segundos, n_bytes, entradas)
+
+        perfilador = g.pop('perfilador', None)
+        if perfilador is not None:
+            perfilador.__exit__(None, None, None)
+            ruta_perfil = perfilador.guardar(callback.replace('/', '_'))
+            respuesta.headers['X-Perfil'] = os.path.basename(ruta_perfil)
+            logger.info('Perfil de %s guardado en %s', callback, ruta_perfil)
+        return respuesta
+
+    @server.route(ruta)
+    def _metricas():
+        return Response(metricas.texto(), mimetype='text/plain; version=0.0.4')
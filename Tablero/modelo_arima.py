@@ -0,0 +1,322 @@
+import contextlib
+import hashlib
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from datos import DIRECTORIO_CACHE
+
+ORDEN_ARIMA = (5, 1, 0)
+PASOS_PRONOSTICO = 50
+
+# Versión del contenido de la caché en disco (cambia la clave de todas las entradas)
+FORMATO_CACHE = 2
+
+# Lo único que se guarda de cada ajuste: los resultados completos de statsmodels
+# (con los estados y covarianzas de cada observación) crecen con la serie
+CAMPOS_CACHE = ('order', 'pasos', 'params', 'forecast_mean', 'forecast_ci')
+
+# Segundos que un proceso espera a que otro termine el mismo ajuste antes de hacerlo él
+ESPERA_AJUSTE = 600
+
+# Orden elegido por seleccion_orden.py; si no existe se usa ORDEN_ARIMA
+RUTA_CONFIG = os.environ.get('TABLERO_CONFIG_MODELO', 'modelo_arima.json')
+
+
+def orden_configurado(ruta=RUTA_CONFIG):
+    """Orden (p, d, q) guardado en la configuración del modelo, o ``ORDEN_ARIMA``."""
+    try:
+        with open(ruta, encoding='utf-8') as f:
+            order = tuple(int(x) for x in json.load(f)['order'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return ORDEN_ARIMA
+    return order if len(order) == 3 else ORDEN_ARIMA
+
+
+def guardar_orden(order, ruta=RUTA_CONFIG, **detalles):
+    contenido = dict(detalles, order=list(order))
+    temporal = f'{ruta}.{os.getpid()}.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(contenido, f, indent=1)
+    os.replace(temporal, ruta)
+
+
+def hash_archivo(ruta, tam_bloque=1 << 20):
+    """SHA-256 del contenido de ``ruta``, leído por bloques."""
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(tam_bloque), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def hash_serie(serie):
+    """SHA-256 de los valores de una serie (para modelos que no salen de un archivo)."""
+    return hashlib.sha256(np.ascontiguousarray(serie, dtype=np.float64).tobytes()).hexdigest()
+
+
+def clave_modelo(hash_datos, order, pasos):
+    texto = f'{hash_datos}|{tuple(order)}|{pasos}|v{FORMATO_CACHE}'
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()[:32]
+
+
+def _guardar(ruta, contenido):
+    # Escritura atómica: nunca queda un archivo a medio escribir en la caché
+    temporal = f'{ruta}.{os.getpid()}.tmp'
+    with open(temporal, 'wb') as f:
+        pickle.dump(contenido, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporal, ruta)
+
+
+def _leer(ruta, clave):
+    try:
+        with open(ruta, 'rb') as f:
+            contenido = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # Entrada corrupta o de otra versión: se descarta y se reajusta
+        return None
+    if not isinstance(contenido, dict) or contenido.get('clave') != clave or 'params' not in contenido:
+        return None
+    return contenido
+
+
+def _pronostico(model_fit, order, pasos, alfa=0.05):
+    # El modelo se ajusta sin fechas: el pronóstico sale por posición y quien
+    # lo publica le pone las fechas (``forecast_index``)
+    forecast = model_fit.get_forecast(steps=pasos)
+    return {
+        'order': tuple(order),
+        'pasos': pasos,
+        'params': np.asarray(model_fit.params, dtype=np.float64),
+        'model_fit': model_fit,
+        'forecast_mean': pd.Series(np.asarray(forecast.predicted_mean, dtype=np.float64), name='predicted_mean'),
+        'forecast_ci': pd.DataFrame(np.asarray(forecast.conf_int(alpha=alfa), dtype=np.float64),
+                                    columns=['lower', 'upper']),
+    }
+
+
+def ajustar(serie, order=ORDEN_ARIMA, pasos=PASOS_PRONOSTICO, alfa=0.05):
+    """Ajusta el ARIMA y precalcula el pronóstico y su intervalo de confianza."""
+    # statsmodels tarda en importarse: se carga en el primer ajuste (en el hilo
+    # del servicio de pronóstico), no al arrancar el tablero
+    from statsmodels.tsa.arima.model import ARIMA
+
+    # Sobre los valores y no sobre la serie: el índice Date + Hour no tiene
+    # frecuencia y statsmodels no sabría fechar el pronóstico (advierte en 0.14
+    # y falla en get_forecast desde 0.15)
+    return _pronostico(ARIMA(np.asarray(serie, dtype=np.float64), order=order).fit(), order, pasos, alfa)
+
+
+def reconstruir(serie, order, params):
+    """Resultados de ``serie`` con ``params`` ya estimados: sólo corre el filtro, sin optimizar."""
+    from statsmodels.tsa.arima.model import ARIMA
+
+    return ARIMA(np.asarray(serie, dtype=np.float64), order=order).filter(np.asarray(params, dtype=np.float64))
+
+
+@contextlib.contextmanager
+def _turno(ruta, espera=ESPERA_AJUSTE, intervalo=0.5):
+    """Exclusión entre procesos con un archivo de candado creado con ``O_EXCL``.
+
+    Un candado con más de ``espera`` segundos se da por abandonado. Si no se
+    consigue en ``espera`` segundos, o no se puede crear, se sigue sin él.
+    """
+    limite = time.monotonic() + espera
+    descriptor = None
+    while True:
+        try:
+            descriptor = os.open(ruta, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(ruta) > espera:
+                    os.remove(ruta)
+                    continue
+            except OSError:
+                # Lo soltó quien lo tenía: se vuelve a intentar
+                continue
+            if time.monotonic() > limite:
+                break
+            time.sleep(intervalo)
+        except OSError:
+            break
+    try:
+        yield
+    finally:
+        if descriptor is not None:
+            os.close(descriptor)
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+
+
+def _cargar_o_ajustar_clave(serie, clave, order, pasos, directorio):
+    ruta = os.path.join(directorio, f'arima_{clave}.pkl')
+    contenido = _leer(ruta, clave)
+    if contenido is not None:
+        return contenido
+    try:
+        os.makedirs(directorio, exist_ok=True)
+    except OSError:
+        pass
+
+    # Un solo proceso ajusta cada clave; los demás esperan y leen su resultado
+    with _turno(f'{ruta}.lock'):
+        contenido = _leer(ruta, clave)
+        if contenido is not None:
+            return contenido
+        modelo = ajustar(serie, order, pasos)
+        contenido = {campo: modelo[campo] for campo in CAMPOS_CACHE}
+        contenido['clave'] = clave
+        try:
+            _guardar(ruta, contenido)
+        except OSError:
+            # Sin permisos de escritura: se sirve el modelo igualmente
+            pass
+    return contenido
+
+
+def cargar_o_ajustar(serie, ruta_datos, order=ORDEN_ARIMA, pasos=PASOS_PRONOSTICO,
+                     directorio=DIRECTORIO_CACHE):
+    """Devuelve el modelo guardado para (datos, orden) o lo ajusta y lo guarda.
+
+    La clave combina el hash del archivo de datos con el orden y los pasos del
+    pronóstico, así que cualquier cambio en los datos invalida la entrada.
+    Se guardan y se devuelven sólo ``CAMPOS_CACHE`` (parámetros y pronóstico,
+    unos pocos KB); para extender el modelo se usa ``reconstruir``. Si varios
+    procesos piden la misma clave a la vez, sólo uno ajusta.
+    """
+    return _cargar_o_ajustar_clave(serie, clave_modelo(hash_archivo(ruta_datos), order, pasos),
+                                   order, pasos, directorio)
+
+
+class ModeloIncremental:
+    """ARIMA que incorpora observaciones nuevas sin volver a estimar los parámetros.
+
+    ``agregar`` extiende los resultados ajustados con ``extend``: el filtro de
+    Kalman sólo recorre las observaciones nuevas, partiendo del último estado,
+    y con los mismos parámetros. Así el pronóstico se refresca en un tiempo
+    que depende de cuántos datos llegan y no del largo de la historia.
+
+    La reestimación completa (``reestimar``, que devuelve un modelo nuevo y
+    no toca éste) se recomienda cuando se acumulan
+    ``reestimar_cada`` observaciones o cuando el error de pronóstico a un paso
+    estandarizado de los datos nuevos (RMS, ~1 si el modelo sigue siendo
+    bueno) supera ``umbral_deriva``.
+
+    Se crea con los parámetros ya estimados; los resultados de statsmodels se
+    reconstruyen (``reconstruir``) recién en la primera actualización y,
+    como ``extend`` sólo guarda las observaciones nuevas, después ocupan lo
+    que ocupen esas observaciones y no toda la historia.
+
+    La serie acumulada vive en arreglos con espacio libre al final: agregar k
+    observaciones copia sólo esas k, y ``serie`` es una vista de lo ocupado
+    (las vistas ya entregadas no cambian). ``clave`` identifica la serie y
+    los parámetros de partida (p. ej. la clave de ``cargar_o_ajustar``); la
+    clave de cada pronóstico sale de ella, del largo y de la última fecha,
+    sin recorrer la serie.
+    """
+
+    def __init__(self, serie, params, order=ORDEN_ARIMA, pasos=PASOS_PRONOSTICO,
+                 reestimar_cada=24 * 7, umbral_deriva=3.0, clave=None):
+        self.params = np.asarray(params, dtype=np.float64)
+        self.model_fit = None
+        self.clave = clave if clave is not None else hash_serie(serie)
+        self.nombre = serie.name
+        self.n = len(serie)
+        capacidad = max(self.n + 1, int(1.5 * self.n))
+        self._valores = np.empty(capacidad, dtype=np.float64)
+        self._valores[:self.n] = serie.to_numpy(dtype=np.float64)
+        indice = serie.index.to_numpy()
+        self._indice = np.empty(capacidad, dtype=indice.dtype)
+        self._indice[:self.n] = indice
+        self.order = tuple(order)
+        self.pasos = pasos
+        self.reestimar_cada = reestimar_cada
+        self.umbral_deriva = umbral_deriva
+        self.pendientes = 0
+        self.deriva = 0.0
+
+    @property
+    def serie(self):
+        return self._serie_hasta(self.n)
+
+    def _serie_hasta(self, n):
+        # Lo anterior a ``n`` nunca cambia (ni al crecer los arreglos): se puede
+        # leer desde otro hilo mientras se agregan observaciones
+        return pd.Series(self._valores[:n], index=pd.Index(self._indice[:n]), name=self.nombre, copy=False)
+
+    def clave_actual(self):
+        ultimo = self._indice[self.n - 1] if self.n else None
+        return clave_modelo(f'{self.clave}|{self.n}|{ultimo}', self.order, self.pasos)
+
+    @property
+    def necesita_reestimar(self):
+        return self.pendientes >= self.reestimar_cada or self.deriva > self.umbral_deriva
+
+    def _resultados(self):
+        if self.model_fit is None:
+            self.model_fit = reconstruir(self.serie, self.order, self.params)
+        return self.model_fit
+
+    def pronostico(self):
+        modelo = _pronostico(self._resultados(), self.order, self.pasos)
+        del modelo['model_fit']
+        modelo['clave'] = self.clave_actual()
+        return modelo
+
+    def _anexar(self, nuevos):
+        k = len(nuevos)
+        if self.n + k > len(self._valores):
+            capacidad = max(self.n + k, int(1.5 * len(self._valores)))
+            for nombre in ('_valores', '_indice'):
+                viejo = getattr(self, nombre)
+                arreglo = np.empty(capacidad, dtype=viejo.dtype)
+                arreglo[:self.n] = viejo[:self.n]
+                setattr(self, nombre, arreglo)
+        self._valores[self.n:self.n + k] = nuevos.to_numpy(dtype=np.float64)
+        self._indice[self.n:self.n + k] = nuevos.index.to_numpy()
+        self.n += k
+
+    def agregar(self, nuevos):
+        """Agrega ``nuevos`` (serie con índice de fechas) y devuelve el pronóstico actualizado."""
+        if len(nuevos) == 0:
+            return self.pronostico()
+        extendido = self._resultados().extend(nuevos.to_numpy(dtype=np.float64))
+        errores = np.asarray(extendido.standardized_forecasts_error)[0]
+        errores = errores[np.isfinite(errores)]
+        self.deriva = float(np.sqrt(np.mean(errores ** 2))) if len(errores) else 0.0
+
+        self.model_fit = extendido
+        self._anexar(nuevos)
+        self.pendientes += len(nuevos)
+        return self.pronostico()
+
+    def reestimar(self, directorio=DIRECTORIO_CACHE):
+        """Estima los parámetros con la historia acumulada hasta ahora.
+
+        Devuelve ``(nuevo, modelo)``: un ``ModeloIncremental`` con esa historia
+        y los parámetros nuevos, y su pronóstico. No modifica ``self``, así que
+        mientras se ajusta otro hilo puede seguir llamando a ``agregar``; lo
+        que llegue en ese tiempo está en ``self.serie.iloc[nuevo.n:]``.
+
+        Los parámetros pasan por la caché de ``cargar_o_ajustar`` con una clave
+        que sale de ``clave`` y del largo: los procesos con la misma historia
+        (los workers que ingieren las mismas filas) hacen un solo ajuste.
+        """
+        n = self.n
+        serie = self._serie_hasta(n)
+        clave = clave_modelo(f'{self.clave}|reestimado|{n}', self.order, self.pasos)
+        modelo = dict(_cargar_o_ajustar_clave(serie, clave, self.order, self.pasos, directorio))
+        nuevo = ModeloIncremental(serie, modelo['params'], order=self.order, pasos=self.pasos,
+                                  reestimar_cada=self.reestimar_cada, umbral_deriva=self.umbral_deriva,
+                                  clave=clave)
+        modelo['clave'] = nuevo.clave_actual()
+        return nuevo, modelo
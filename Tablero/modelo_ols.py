@@ -0,0 +1,159 @@
+"""Modelo OLS de demanda (``linreg2`` del cuaderno "Modelamiento") y su API de predicción.
+
+El modelo se guarda sólo como su vector de coeficientes; predecir un lote
+es un producto matriz-vector, sin pandas ni statsmodels por fila.
+
+Uso:
+    python Tablero/modelo_ols.py data/SeoulBikeData_limpio.csv      # entrena y guarda modelo_ols.json
+
+API (registrada en el ``server`` de Flask del tablero):
+    POST /api/prediccion
+        application/json: {"columnas": [...], "filas": [[...], ...]}
+                       o  {"Hour": [...], "Temperature(C)": [...], ...}
+        application/octet-stream: float64 little-endian, n × 6 por filas,
+                       en el orden de FEATURES
+    Responde JSON {"prediccion": [...]} o, si se pide
+    ``Accept: application/octet-stream``, los float64 en binario.
+"""
+import argparse
+import functools
+import json
+import os
+
+import numpy as np
+from flask import Response, jsonify, request
+
+import datos
+
+FEATURES = ['Hour', 'Temperature(C)', 'Humidity(%)', 'Visibility (10m)', 'Solar Radiation (MJ/m2)', 'Seasons']
+
+RUTA_MODELO = os.environ.get('TABLERO_MODELO_OLS', 'modelo_ols.json')
+
+# Máximo de filas por solicitud
+MAX_FILAS = int(os.environ.get('TABLERO_MAX_FILAS_PREDICCION', 1_000_000))
+
+
+class ModeloOLS:
+    def __init__(self, coeficientes, features=FEATURES):
+        self.coeficientes = np.asarray(coeficientes, dtype=np.float64)
+        self.features = list(features)
+        if len(self.coeficientes) != len(self.features) + 1:
+            raise ValueError('Se esperaba un coeficiente por variable más la constante')
+
+    def predecir(self, X):
+        """Predicción para una matriz ``X`` (n × len(features)) en una sola operación."""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(self.features):
+            raise ValueError(f'Se esperaba una matriz de n × {len(self.features)} ({", ".join(self.features)})')
+        return X @ self.coeficientes[1:] + self.coeficientes[0]
+
+    def guardar(self, ruta=RUTA_MODELO):
+        contenido = {'features': self.features, 'coeficientes': self.coeficientes.tolist()}
+        temporal = f'{ruta}.{os.getpid()}.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(contenido, f, indent=1)
+        os.replace(temporal, ruta)
+
+    @classmethod
+    def cargar(cls, ruta=RUTA_MODELO):
+        with open(ruta, encoding='utf-8') as f:
+            contenido = json.load(f)
+        return cls(contenido['coeficientes'], contenido['features'])
+
+
+def particion(n, test_size=0.2, random_state=1):
+    """Índices de entrenamiento y prueba iguales a los de ``train_test_split`` del cuaderno."""
+    n_prueba = int(np.ceil(test_size * n))
+    permutacion = np.random.RandomState(random_state).permutation(n)
+    return permutacion[n_prueba:], permutacion[:n_prueba]
+
+
+def entrenar(tabla, features=FEATURES, test_size=0.2, random_state=1):
+    """Ajusta el OLS con la misma partición 80/20 que el cuaderno (mínimos cuadrados con constante)."""
+    X = tabla[features].to_numpy(dtype=np.float64)
+    y = tabla['Rented Bike Count'].to_numpy(dtype=np.float64)
+    if test_size:
+        entrenamiento, _ = particion(len(X), test_size, random_state)
+        X, y = X[entrenamiento], y[entrenamiento]
+    X = np.column_stack([np.ones(len(X)), X])
+    coeficientes, *_ = np.linalg.lstsq(X, y, rcond=None)
+    return ModeloOLS(coeficientes, features)
+
+
+def cargar_o_entrenar(tabla, ruta=RUTA_MODELO):
+    try:
+        return ModeloOLS.cargar(ruta)
+    except (OSError, ValueError, KeyError):
+        modelo = entrenar(tabla)
+        try:
+            modelo.guardar(ruta)
+        except OSError:
+            pass
+        return modelo
+
+
+def _matriz_solicitud(solicitud, features):
+    if solicitud.mimetype == 'application/octet-stream':
+        valores = np.frombuffer(solicitud.get_data(cache=False), dtype='<f8')
+        if len(valores) % len(features):
+            raise ValueError(f'El cuerpo binario debe tener n × {len(features)} float64')
+        return valores.reshape(-1, len(features))
+
+    cuerpo = solicitud.get_json(force=True, silent=True)
+    if not isinstance(cuerpo, dict):
+        raise ValueError('Se esperaba un objeto JSON')
+    if 'filas' in cuerpo:
+        columnas = cuerpo.get('columnas', features)
+        X = np.asarray(cuerpo['filas'], dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(columnas):
+            raise ValueError('"filas" debe ser una lista de filas del largo de "columnas"')
+        faltantes = [f for f in features if f not in columnas]
+        if faltantes:
+            raise ValueError(f'Faltan columnas: {faltantes}')
+        return X[:, [columnas.index(f) for f in features]]
+
+    faltantes = [f for f in features if f not in cuerpo]
+    if faltantes:
+        raise ValueError(f'Faltan columnas: {faltantes}')
+    return np.column_stack([np.asarray(cuerpo[f], dtype=np.float64) for f in features])
+
+
+def registrar_api(server, modelo, ruta='/api/prediccion'):
+    """Registra el endpoint de predicción por lotes en el ``server`` de Flask.
+
+    ``modelo`` puede ser un ``ModeloOLS`` o una función sin argumentos que lo
+    devuelve; en ese caso se llama en la primera solicitud (no al arrancar).
+    """
+    obtener_modelo = functools.lru_cache(maxsize=None)(modelo) if callable(modelo) else lambda: modelo
+
+    def prediccion():
+        modelo_actual = obtener_modelo()
+        try:
+            X = _matriz_solicitud(request, modelo_actual.features)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if len(X) > MAX_FILAS:
+            return jsonify({'error': f'Máximo {MAX_FILAS} filas por solicitud'}), 413
+
+        y = modelo_actual.predecir(X)
+        if request.accept_mimetypes.best == 'application/octet-stream':
+            return Response(y.astype('<f8').tobytes(), mimetype='application/octet-stream')
+        return Response(json.dumps({'prediccion': y.tolist()}), mimetype='application/json')
+
+    server.add_url_rule(ruta, 'prediccion_ols', prediccion, methods=['POST'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Entrena el OLS de demanda y guarda sus coeficientes.')
+    parser.add_argument('datos', help='CSV limpio (SeoulBikeData_limpio.csv)')
+    parser.add_argument('--salida', default=RUTA_MODELO)
+    args = parser.parse_args(argv)
+
+    modelo = entrenar(datos.cargar(args.datos, columnas=FEATURES + ['Rented Bike Count']))
+    modelo.guardar(args.salida)
+    for nombre, valor in zip(['const'] + modelo.features, modelo.coeficientes):
+        print(f'{nombre:>25}: {valor: .6f}')
+
+
+if __name__ == '__main__':
+    main()
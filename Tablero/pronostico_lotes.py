@@ -0,0 +1,154 @@
+"""Pronósticos ARIMA por grupo (estación, hora del día, ...) en paralelo.
+
+Uso:
+    python Tablero/pronostico_lotes.py data/SeoulBikeData_limpio.csv --por Seasons --salida pronosticos.csv
+    python Tablero/pronostico_lotes.py data/SeoulBikeData_limpio.csv --por Hour --procesos 8
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+import datos
+from modelo_arima import ORDEN_ARIMA, PASOS_PRONOSTICO, ajustar
+
+
+def _ajustar_grupo(grupo, valores, order, pasos, alfa):
+    # Se ejecuta en un proceso del pool; cualquier error queda dentro del grupo
+    inicio = time.perf_counter()
+    try:
+        modelo = ajustar(pd.Series(valores), order=order, pasos=pasos, alfa=alfa)
+        intervalo = modelo['forecast_ci']
+        return {
+            'grupo': grupo,
+            'pronostico': np.asarray(modelo['forecast_mean'], dtype=np.float64),
+            'inferior': intervalo.iloc[:, 0].to_numpy(dtype=np.float64),
+            'superior': intervalo.iloc[:, 1].to_numpy(dtype=np.float64),
+            'segundos': time.perf_counter() - inicio,
+            'error': None,
+        }
+    except Exception as e:
+        return {'grupo': grupo, 'segundos': time.perf_counter() - inicio,
+                'error': f'{type(e).__name__}: {e}'}
+
+
+def _marcas_tiempo(filas, columna_fecha):
+    # Fecha + hora del registro (los datos son horarios; 'Date' sola repite el día 24 veces)
+    marcas = pd.DatetimeIndex(filas[columna_fecha].to_numpy())
+    if 'Hour' in filas:
+        marcas = marcas + pd.to_timedelta(filas['Hour'].to_numpy(dtype=np.int64), unit='h')
+    return marcas
+
+
+def _paso_tipico(marcas):
+    """Diferencia más frecuente entre marcas consecutivas de un grupo (1 h, 1 día, ...)."""
+    # En ns explícitos: ``asi8`` está en la unidad del índice (µs con pandas 3)
+    diferencias = np.diff(marcas.to_numpy(dtype='datetime64[ns]').view(np.int64))
+    diferencias = diferencias[diferencias > 0]
+    if diferencias.size == 0:
+        return None
+    valores, conteos = np.unique(diferencias, return_counts=True)
+    return pd.Timedelta(int(valores[np.argmax(conteos)]), unit='ns')
+
+
+def pronosticar_grupos(datos_grupos, por, columna='Rented Bike Count', columna_fecha='Date',
+                       order=ORDEN_ARIMA, pasos=PASOS_PRONOSTICO, alfa=0.05, frecuencia=None,
+                       procesos=None, progreso=None):
+    """Ajusta un ARIMA por cada grupo de ``por`` y pronostica ``pasos`` períodos.
+
+    Las fechas del pronóstico siguen a la última marca (fecha + hora) de
+    cada grupo con paso ``frecuencia``; si es ``None`` se usa el paso más
+    frecuente del grupo (1 hora al agrupar por estación, 1 día al agrupar
+    por hora).
+    Cada grupo se ajusta en un proceso del pool. Devuelve ``(tabla, errores)``:
+    ``tabla`` tiene una fila por grupo y paso con las columnas de ``por``,
+    'paso', ``columna_fecha``, 'pronostico', 'inferior' y 'superior';
+    ``errores`` asocia cada grupo que falló con su mensaje, sin afectar a los
+    demás. ``progreso(completados, total, grupo, error)`` se llama al
+    terminar cada grupo.
+    """
+    por = [por] if isinstance(por, str) else list(por)
+    ordenados = datos_grupos.sort_values(by=[columna_fecha] + (['Hour'] if 'Hour' in datos_grupos else []),
+                                         kind='stable')
+    tareas = {}
+    fechas_pronostico = {}
+    for grupo, filas in ordenados.groupby(por, sort=True):
+        grupo = grupo if isinstance(grupo, tuple) else (grupo,)
+        tareas[grupo] = filas[columna].to_numpy(dtype=np.float64)
+        marcas = _marcas_tiempo(filas, columna_fecha)
+        paso = pd.Timedelta(frecuencia) if frecuencia is not None else _paso_tipico(marcas)
+        if paso is None:
+            paso = pd.Timedelta(hours=1) if 'Hour' in filas else pd.Timedelta(days=1)
+        fechas_pronostico[grupo] = marcas[-1] + pd.to_timedelta(np.arange(1, pasos + 1) * paso.value, unit='ns')
+
+    resultados = {}
+    errores = {}
+    total = len(tareas)
+    with ProcessPoolExecutor(max_workers=procesos or os.cpu_count()) as ejecutor:
+        futuros = {ejecutor.submit(_ajustar_grupo, grupo, valores, tuple(order), pasos, alfa): grupo
+                   for grupo, valores in tareas.items()}
+        for completados, futuro in enumerate(as_completed(futuros), start=1):
+            grupo = futuros[futuro]
+            try:
+                resultado = futuro.result()
+            except Exception as e:
+                # El proceso murió (p. ej. por memoria): sólo se pierde este grupo
+                resultado = {'grupo': grupo, 'error': f'{type(e).__name__}: {e}'}
+            if resultado['error'] is None:
+                resultados[grupo] = resultado
+            else:
+                errores[grupo] = resultado['error']
+            if progreso is not None:
+                progreso(completados, total, grupo, resultado['error'])
+
+    partes = []
+    for grupo in sorted(resultados):
+        resultado = resultados[grupo]
+        parte = pd.DataFrame({
+            'paso': np.arange(1, pasos + 1),
+            columna_fecha: fechas_pronostico[grupo],
+            'pronostico': resultado['pronostico'],
+            'inferior': resultado['inferior'],
+            'superior': resultado['superior'],
+        })
+        for nombre, valor in zip(por, grupo):
+            parte.insert(0, nombre, valor)
+        partes.append(parte)
+
+    columnas = por + ['paso', columna_fecha, 'pronostico', 'inferior', 'superior']
+    tabla = pd.concat(partes, ignore_index=True)[columnas] if partes else pd.DataFrame(columns=columnas)
+    return tabla, errores
+
+
+def _imprimir_progreso(completados, total, grupo, error):
+    estado = 'error' if error else 'ok'
+    print(f'[{completados}/{total}] {grupo}: {estado}', file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pronósticos ARIMA por grupo en paralelo.')
+    parser.add_argument('datos', help='CSV limpio (SeoulBikeData_limpio.csv)')
+    parser.add_argument('--por', nargs='+', default=['Seasons'], help='columnas que definen los grupos')
+    parser.add_argument('--order', nargs=3, type=int, default=list(ORDEN_ARIMA), metavar=('P', 'D', 'Q'))
+    parser.add_argument('--pasos', type=int, default=PASOS_PRONOSTICO)
+    parser.add_argument('--frecuencia', default=None,
+                        help="paso entre fechas del pronóstico (p. ej. '1h', '1D'); por defecto, el de cada grupo")
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--salida', help='CSV donde guardar la tabla (por defecto, la salida estándar)')
+    args = parser.parse_args(argv)
+
+    columnas = list(dict.fromkeys(['Date', 'Hour', 'Rented Bike Count'] + args.por))
+    datos_grupos = datos.cargar(args.datos, columnas=columnas)
+    tabla, errores = pronosticar_grupos(datos_grupos, args.por, order=args.order, pasos=args.pasos,
+                                        frecuencia=args.frecuencia, procesos=args.procesos, progreso=_imprimir_progreso)
+    for grupo, mensaje in errores.items():
+        print(f'Falló el grupo {grupo}: {mensaje}', file=sys.stderr)
+    tabla.to_csv(args.salida or sys.stdout, index=False)
+
+
+if __name__ == '__main__':
+    main()
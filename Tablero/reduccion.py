@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Puntos máximos de una serie en la figura: dos (mínimo y máximo) por píxel
+# de un gráfico de unos 1000 px de ancho
+PUNTOS_SERIE = int(os.environ.get('TABLERO_PUNTOS_SERIE', 2000))
+
+
+def indices_minmax(y, tamano):
+    """Índices del mínimo y del máximo de ``y`` en cada bloque de ``tamano`` puntos.
+
+    Conserva los picos y los valles de la serie (la forma que se ve en el
+    gráfico), junto con el primer y el último punto. Los índices vuelven
+    ordenados y sin repetir.
+    """
+    n = len(y)
+    if tamano <= 1 or n <= 2:
+        return np.arange(n)
+    m = n // tamano
+    bloques = y[:m * tamano].reshape(m, tamano)
+    base = np.arange(m) * tamano
+    partes = [base + bloques.argmin(axis=1), base + bloques.argmax(axis=1), [0, n - 1]]
+    if m * tamano < n:
+        resto = y[m * tamano:]
+        partes.append([m * tamano + resto.argmin(), m * tamano + resto.argmax()])
+    return np.unique(np.concatenate(partes))
+
+
+class PiramideSerie:
+    """Serie (x ordenado, y) precalculada a varias resoluciones.
+
+    El nivel 0 es la serie completa; cada nivel siguiente guarda el mínimo y
+    el máximo de cada bloque de 4 puntos del anterior (la mitad de puntos),
+    así que construir todos los niveles cuesta lo mismo que recorrer la serie
+    dos veces. ``ventana`` devuelve, para un rango de x, el nivel más fino que
+    cabe en el presupuesto de puntos: la serie completa si el rango es corto.
+    """
+
+    def __init__(self, x, y):
+        x = pd.DatetimeIndex(x)
+        y = np.asarray(y, dtype=np.float64)
+        self.niveles = [(x, y)]
+        # Claves en ns, como ``pd.Timestamp.value`` (``asi8`` está en la unidad del índice)
+        self._claves = [x.to_numpy(dtype='datetime64[ns]').view(np.int64)]
+        indices = np.arange(len(y))
+        while len(indices) > 4:
+            indices = indices[indices_minmax(y[indices], 4)]
+            self.niveles.append((x[indices], y[indices]))
+            self._claves.append(self._claves[0][indices])
+
+    def __len__(self):
+        return len(self.niveles[0][1])
+
+    def ventana(self, inicio=None, fin=None, puntos=PUNTOS_SERIE):
+        """``(x, y, nivel)`` de la serie entre ``inicio`` y ``fin`` con a lo sumo ``puntos`` puntos."""
+        desde = None if inicio is None else pd.Timestamp(inicio).value
+        hasta = None if fin is None else pd.Timestamp(fin).value
+        for nivel, ((x, y), claves) in enumerate(zip(self.niveles, self._claves)):
+            i0 = 0 if desde is None else np.searchsorted(claves, desde, side='left')
+            i1 = len(claves) if hasta is None else np.searchsorted(claves, hasta, side='right')
+            # Un punto a cada lado para que la línea llegue a los bordes del gráfico
+            i0, i1 = max(i0 - 1, 0), min(i1 + 1, len(claves))
+            if i1 - i0 <= puntos or nivel == len(self.niveles) - 1:
+                return x[i0:i1], y[i0:i1], nivel
+
+
+def rango_x(relayout):
+    """Rango del eje x de un ``relayoutData`` de Plotly: ``(inicio, fin)``, ``None`` si es toda la serie.
+
+    Devuelve ``False`` si el evento no cambió el eje x (p. ej. sólo el eje y).
+    """
+    if not relayout:
+        return False
+    if relayout.get('xaxis.autorange'):
+        return None
+    if 'xaxis.range[0]' in relayout and 'xaxis.range[1]' in relayout:
+        return relayout['xaxis.range[0]'], relayout['xaxis.range[1]']
+    if isinstance(relayout.get('xaxis.range'), list):
+        return tuple(relayout['xaxis.range'][:2])
+    return False
@@ -0,0 +1,332 @@
+"""Respuestas más livianas para el navegador: figuras compactas y compresión.
+
+``optimizar(server)`` agrega al ``server`` de Flask dos pasos, cada uno con
+su medición de bytes (medidores ``tablero_carga_*`` en /metricas y la
+cabecera ``X-Carga-Original`` en cada respuesta compactada):
+
+    1. Figuras compactas, en las respuestas de los callbacks y del layout:
+       - los números de los trazos se redondean a ``DIGITOS`` cifras
+         significativas (las columnas float32 se serializan, si no, como
+         -5.199999809265137) y los que quedan enteros se envían sin decimales;
+       - con Plotly 6 los arreglos llegan en binario (``{'dtype', 'bdata'}``):
+         los enteros se pasan al tipo entero más chico que los contiene y los
+         float64 a float32 si ``DIGITOS`` <= 7;
+       - los ejes de fechas se envían como milisegundos desde 1970 (con el
+         eje declarado 'date') o, si los pasos son regulares, como x0 + dx;
+       - los textos de hover que son fechas a medianoche se envían sin la hora.
+    2. Compresión brotli o gzip según ``Accept-Encoding`` del navegador, para
+       cualquier respuesta de texto, JSON o JavaScript de más de ``MIN_COMPRIMIR``
+       bytes. Los archivos estáticos comprimidos se guardan en una caché pequeña.
+
+Con orjson instalado se usa para leer y escribir el JSON, y
+``configurar_json()`` (que se llama al armar la app) lo vuelve también el
+motor JSON de Plotly; brotli es opcional: sin él sólo se ofrece gzip.
+TABLERO_COMPACTAR=0 o TABLERO_COMPRIMIR=0 desactivan cada paso para comparar.
+"""
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from flask import request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPACTAR = os.environ.get('TABLERO_COMPACTAR', '1') == '1'
+COMPRIMIR = os.environ.get('TABLERO_COMPRIMIR', '1') == '1'
+DIGITOS = int(os.environ.get('TABLERO_DIGITOS', 6))
+MIN_COMPRIMIR = 1024
+NIVEL_GZIP = 6
+CALIDAD_BROTLI = 5
+
+RUTAS_FIGURAS = ('/_dash-update-component', '/_dash-layout')
+TIPOS_COMPRIMIBLES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+
+# Atributos numéricos de los trazos que se redondean
+ATRIBUTOS_NUMERICOS = ('x', 'y', 'z', 'base', 'customdata')
+
+# Milisegundos que Plotly acepta en un eje de fechas
+_MS = np.dtype('datetime64[ms]')
+
+# Tipos enteros de los arreglos binarios de Plotly.js, de menor a mayor
+_ENTEROS_BINARIOS = ('i1', 'u1', 'i2', 'u2', 'i4', 'u4')
+
+# float32 conserva ~7 cifras significativas
+_DIGITOS_FLOAT32 = 7
+
+
+def configurar_json():
+    """Usa orjson (si está instalado) como motor JSON de Plotly; devuelve si se usa.
+
+    Dash serializa las respuestas con la configuración JSON de Plotly, que
+    es global al proceso: por eso se configura al armar la app y no al
+    importar este módulo.
+    """
+    if orjson is None:
+        return False
+    import plotly.io as pio
+
+    pio.json.config.default_engine = 'orjson'
+    return True
+
+
+def cargar_json(texto):
+    if orjson is not None:
+        try:
+            return orjson.loads(texto)
+        except orjson.JSONDecodeError:
+            pass  # p. ej. NaN literales, que orjson no acepta
+    return json.loads(texto)
+
+
+def volcar_json(objeto):
+    """JSON compacto en bytes."""
+    if orjson is not None:
+        return orjson.dumps(objeto, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(objeto, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def redondear(valores, digitos=DIGITOS):
+    """``valores`` (lista, posiblemente anidada, de números o None) con ``digitos`` cifras significativas.
+
+    Devuelve ``None`` si no hay nada que redondear (enteros, textos, listas irregulares).
+    """
+    try:
+        muestra = np.asarray(valores)
+        if muestra.dtype.kind == 'O' and not all(v is None or isinstance(v, (int, float))
+                                                  for v in muestra.ravel()):
+            return None
+        if muestra.dtype.kind not in 'fO':
+            return None
+        arreglo = np.array(valores, dtype=np.float64)
+    except (TypeError, ValueError):
+        return None
+    finitos = np.isfinite(arreglo)
+    magnitud = np.floor(np.log10(np.abs(np.where(finitos & (arreglo != 0), arreglo, 1))))
+    decimales = np.clip(digitos - 1 - magnitud, -22, 22)
+    escala = 10.0 ** np.abs(decimales)
+    # Entero / potencia de 10 exacta: el resultado se escribe con los dígitos pedidos
+    redondeado = np.where(decimales >= 0, np.round(arreglo * escala) / escala, np.round(arreglo / escala) * escala)
+    validos = redondeado[finitos]
+    if np.all(validos == np.trunc(validos)) and (validos.size == 0 or np.abs(validos).max() < 2 ** 53):
+        salida = np.where(finitos, redondeado, 0).astype(np.int64).astype(object)
+    else:
+        salida = redondeado.astype(object)
+    salida[~finitos] = None
+    return salida.tolist()
+
+
+def _binario(valor, digitos=DIGITOS):
+    """Arreglo binario de Plotly (``{'dtype', 'bdata', 'shape'}``) con un tipo más chico, o ``None``."""
+    try:
+        arreglo = np.frombuffer(base64.b64decode(valor['bdata']), dtype=np.dtype(valor['dtype']))
+    except (TypeError, ValueError, KeyError):
+        return None
+    validos = arreglo[np.isfinite(arreglo)] if arreglo.dtype.kind == 'f' else arreglo
+    tipo = None
+    if validos.size == arreglo.size and (arreglo.dtype.kind in 'iu' or np.all(validos == np.trunc(validos))):
+        minimo, maximo = (validos.min(), validos.max()) if validos.size else (0, 0)
+        tipo = next((t for t in _ENTEROS_BINARIOS
+                     if np.iinfo(t).min <= minimo and maximo <= np.iinfo(t).max), None)
+    elif arreglo.dtype == np.float64 and digitos <= _DIGITOS_FLOAT32:
+        tipo = 'f4'
+    if tipo is None or np.dtype(tipo).itemsize >= arreglo.dtype.itemsize:
+        return None
+    return dict(valor, dtype=tipo, bdata=base64.b64encode(arreglo.astype(tipo).tobytes()).decode('ascii'))
+
+
+def _fechas(valores):
+    """Milisegundos desde 1970 de una lista de fechas en texto, o ``None`` si no lo son."""
+    if not isinstance(valores, list) or len(valores) < 2:
+        return None
+    # Sólo textos con forma AAAA-MM-DD... (numpy también leería '7' como el año 7)
+    if not all(isinstance(v, str) and len(v) >= 10 and v[4] == '-' and v[7] == '-' for v in valores):
+        return None
+    try:
+        return np.array(valores, dtype=_MS).astype(np.int64)
+    except (TypeError, ValueError):
+        return None
+
+
+def _eje(trazo, eje):
+    # 'x2' -> 'xaxis2'
+    referencia = trazo.get(f'{eje}axis', eje)
+    return f'{eje}axis{referencia[1:]}'
+
+
+def _tamano(valor):
+    return len(volcar_json(valor))
+
+
+class _Medicion:
+    """Bytes ahorrados por cada paso (por proceso)."""
+
+    def __init__(self):
+        self._candado = threading.Lock()
+        self.valores = dict.fromkeys(['originales', 'compactados', 'ahorro_precision', 'ahorro_fechas',
+                                      'sin_comprimir', 'comprimidos', 'respuestas_comprimidas'], 0)
+
+    def sumar(self, **valores):
+        with self._candado:
+            for clave, valor in valores.items():
+                self.valores[clave] += valor
+
+
+def compactar_figura(figura, digitos=DIGITOS, medicion=None):
+    """Compacta en el lugar una figura serializada (``{'data': [...], 'layout': {...}}``)."""
+    trazos = [t for t in figura.get('data') or [] if isinstance(t, dict)]
+    layout = figura.setdefault('layout', {})
+    ahorro_precision = ahorro_fechas = 0
+
+    # Fechas: un eje se convierte sólo si todos sus trazos tienen fechas en x
+    por_eje = {}
+    for trazo in trazos:
+        por_eje.setdefault(_eje(trazo, 'x'), []).append(trazo)
+    for eje, trazos_eje in por_eje.items():
+        if (layout.get(eje) or {}).get('type') not in (None, '-', 'date'):
+            continue
+        fechas = [_fechas(t.get('x')) for t in trazos_eje]
+        if any(f is None for f in fechas):
+            continue
+        for trazo, ms in zip(trazos_eje, fechas):
+            antes = _tamano(trazo['x'])
+            pasos = np.diff(ms)
+            if len(ms) > 2 and np.all(pasos == pasos[0]) and pasos[0] > 0 and trazo.get('type') != 'heatmap':
+                trazo['x0'], trazo['dx'] = trazo.pop('x')[0], int(pasos[0])
+                ahorro_fechas += antes - _tamano([trazo['x0'], trazo['dx']])
+            else:
+                trazo['x'] = ms.tolist()
+                ahorro_fechas += antes - _tamano(trazo['x'])
+        layout[eje] = {**(layout.get(eje) or {}), 'type': 'date'}
+
+    for trazo in trazos:
+        for atributo in ATRIBUTOS_NUMERICOS:
+            valores = trazo.get(atributo)
+            if isinstance(valores, dict) and 'bdata' in valores:
+                nuevos = _binario(valores, digitos)
+            elif isinstance(valores, list) and valores:
+                nuevos = redondear(valores, digitos)
+            else:
+                continue
+            if nuevos is not None:
+                ahorro_precision += _tamano(valores) - _tamano(nuevos)
+                trazo[atributo] = nuevos
+        hover = trazo.get('hovertext')
+        if (isinstance(hover, list) and hover and all(isinstance(v, str) for v in hover)
+                and all(v.endswith('T00:00:00') for v in hover)):
+            antes = _tamano(hover)
+            trazo['hovertext'] = [v[:-9] for v in hover]
+            ahorro_fechas += antes - _tamano(trazo['hovertext'])
+
+    if medicion is not None:
+        medicion.sumar(ahorro_precision=ahorro_precision, ahorro_fechas=ahorro_fechas)
+    return figura
+
+
+def _compactar_figuras(objeto, digitos, medicion):
+    # Las figuras están en cualquier nivel de la respuesta (salidas, layout, children)
+    if isinstance(objeto, dict):
+        if isinstance(objeto.get('data'), list) and isinstance(objeto.get('layout'), dict):
+            compactar_figura(objeto, digitos, medicion)
+            return
+        for valor in objeto.values():
+            _compactar_figuras(valor, digitos, medicion)
+    elif isinstance(objeto, list):
+        for valor in objeto:
+            _compactar_figuras(valor, digitos, medicion)
+
+
+def _codificacion():
+    aceptadas = request.accept_encodings
+    if brotli is not None and aceptadas.quality('br') > 0:
+        return 'br'
+    if aceptadas.quality('gzip') > 0:
+        return 'gzip'
+    return None
+
+
+def _comprimir(cuerpo, codificacion):
+    if codificacion == 'br':
+        return brotli.compress(cuerpo, quality=CALIDAD_BROTLI)
+    return gzip.compress(cuerpo, compresslevel=NIVEL_GZIP)
+
+
+def optimizar(server, metricas=None, compactar=COMPACTAR, comprimir=COMPRIMIR, digitos=DIGITOS):
+    """Registra en el ``server`` la compactación de figuras y la compresión de respuestas.
+
+    Conviene llamarla después de ``metricas.instrumentar``: Flask corre los
+    ``after_request`` en orden inverso, así que los bytes de los callbacks
+    que se miden allí son los que salen por la red.
+    """
+    medicion = _Medicion()
+    estaticos = OrderedDict()
+    candado = threading.Lock()
+
+    @server.after_request
+    def _optimizar(respuesta):
+        if respuesta.direct_passthrough or respuesta.is_streamed or not 200 <= respuesta.status_code < 300:
+            return respuesta
+
+        if (compactar and request.path.endswith(RUTAS_FIGURAS)
+                and respuesta.mimetype == 'application/json'):
+            original = respuesta.get_data()
+            if not original:
+                return respuesta
+            contenido = cargar_json(original)
+            _compactar_figuras(contenido, digitos, medicion)
+            compacto = volcar_json(contenido)
+            respuesta.set_data(compacto)
+            respuesta.headers['X-Carga-Original'] = str(len(original))
+            medicion.sumar(originales=len(original), compactados=len(compacto))
+
+        if (not comprimir or 'Content-Encoding' in respuesta.headers
+                or not respuesta.mimetype.startswith(TIPOS_COMPRIMIBLES)):
+            return respuesta
+        codificacion = _codificacion()
+        cuerpo = respuesta.get_data()
+        if codificacion is None or len(cuerpo) < MIN_COMPRIMIR:
+            return respuesta
+        if request.method == 'GET':
+            # Los JavaScript y CSS de Dash son siempre los mismos: se comprimen una vez
+            clave = (codificacion, hashlib.blake2b(cuerpo, digest_size=16).digest())
+            with candado:
+                comprimido = estaticos.get(clave)
+            if comprimido is None:
+                comprimido = _comprimir(cuerpo, codificacion)
+                with candado:
+                    estaticos[clave] = comprimido
+                    while len(estaticos) > 32:
+                        estaticos.popitem(last=False)
+        else:
+            comprimido = _comprimir(cuerpo, codificacion)
+        respuesta.set_data(comprimido)
+        respuesta.headers['Content-Encoding'] = codificacion
+        respuesta.vary.add('Accept-Encoding')
+        medicion.sumar(sin_comprimir=len(cuerpo), comprimidos=len(comprimido), respuestas_comprimidas=1)
+        return respuesta
+
+    if metricas is not None:
+        ayudas = {
+            'originales': 'Bytes de las respuestas con figuras antes de compactarlas',
+            'compactados': 'Bytes de las respuestas con figuras después de compactarlas',
+            'ahorro_precision': 'Bytes ahorrados al redondear los números de las figuras',
+            'ahorro_fechas': 'Bytes ahorrados al codificar las fechas de las figuras',
+            'sin_comprimir': 'Bytes de las respuestas comprimidas antes de comprimirlas',
+            'comprimidos': 'Bytes de las respuestas comprimidas enviados',
+            'respuestas_comprimidas': 'Respuestas enviadas con gzip o brotli',
+        }
+        for clave, ayuda in ayudas.items():
+            metricas.registrar_medidor(f'tablero_carga_{clave}', lambda clave=clave: medicion.valores[clave], ayuda)
+    return medicion
@@ -0,0 +1,189 @@
+"""Selección del orden (p, d, q) del ARIMA en paralelo y con memoria en disco.
+
+Reemplaza el paso de ``auto_arima`` del cuaderno "Modelamiento": primero fija
+el orden de diferenciación d (con la prueba ADF o fijo con ``--d``; el
+cuaderno usa d=0) y
+después evalúa una rejilla de (p, q) con ese d en un pool de procesos, guarda
+el AIC/BIC de cada candidato en disco (clave: hash de los datos + orden) y
+escribe el orden ganador en la configuración que leen los tableros
+(modelo_arima.json). El AIC de modelos con distinto d no es comparable (la
+verosimilitud se calcula sobre series diferenciadas de distinto largo), así
+que d nunca se elige por AIC.
+
+Uso:
+    python Tablero/seleccion_orden.py data/SeoulBikeData_limpio.csv
+    python Tablero/seleccion_orden.py data/SeoulBikeData_limpio.csv --p 0 6 --d 0 --q 0 3 --criterio bic
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+
+import datos
+from datos import DIRECTORIO_CACHE
+from modelo_arima import RUTA_CONFIG, guardar_orden, hash_serie
+
+DIRECTORIO_ORDENES = os.path.join(DIRECTORIO_CACHE, 'ordenes')
+
+# Prueba ADF: se diferencia mientras el p-valor supere ALFA_ADF, hasta D_MAXIMO veces
+ALFA_ADF = 0.05
+D_MAXIMO = 2
+
+
+def _nombre(order):
+    return '_'.join(str(x) for x in order)
+
+
+def _leer_json(ruta):
+    try:
+        with open(ruta, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _escribir_json(ruta, contenido):
+    temporal = f'{ruta}.{os.getpid()}.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(contenido, f)
+    os.replace(temporal, ruta)
+
+
+def evaluar_orden(valores, order, parametros_iniciales=None):
+    """Ajusta un ARIMA de orden ``order`` y devuelve su AIC, BIC y parámetros.
+
+    Si hay parámetros de un ajuste anterior del mismo orden (sobre datos
+    parecidos), se usan como punto de partida del optimizador.
+    """
+    inicio = time.perf_counter()
+    try:
+        modelo = sm.tsa.ARIMA(np.asarray(valores, dtype=np.float64), order=order)
+        if parametros_iniciales is not None and len(parametros_iniciales) != len(modelo.start_params):
+            parametros_iniciales = None
+        model_fit = modelo.fit(start_params=parametros_iniciales)
+        return {
+            'order': list(order),
+            'aic': float(model_fit.aic),
+            'bic': float(model_fit.bic),
+            'parametros': [float(x) for x in model_fit.params],
+            'segundos': time.perf_counter() - inicio,
+            'error': None,
+        }
+    except Exception as e:
+        return {'order': list(order), 'aic': None, 'bic': None, 'parametros': None,
+                'segundos': time.perf_counter() - inicio, 'error': f'{type(e).__name__}: {e}'}
+
+
+def elegir_d(valores, alfa=ALFA_ADF, d_maximo=D_MAXIMO):
+    """Orden de diferenciación: las veces que hay que diferenciar para que la prueba ADF rechace raíz unitaria."""
+    valores = np.asarray(valores, dtype=np.float64)
+    for d in range(d_maximo):
+        if sm.tsa.adfuller(valores, autolag='AIC')[1] <= alfa:
+            return d
+        valores = np.diff(valores)
+    return d_maximo
+
+
+def seleccionar_orden(serie, p=range(0, 6), q=range(0, 3), d=None, criterio='aic',
+                      procesos=None, directorio=DIRECTORIO_ORDENES, progreso=None):
+    """Evalúa los órdenes (p, d, q) de la rejilla con un único ``d`` y devuelve ``(mejor_orden, tabla)``.
+
+    Si ``d`` es ``None`` se elige con ``elegir_d``. ``tabla`` tiene una fila
+    por candidato con su AIC, BIC, tiempo, si salió de la memoria en disco y
+    el error si el ajuste falló.
+    """
+    valores = np.asarray(serie, dtype=np.float64)
+    if d is None:
+        d = elegir_d(valores)
+    hash_datos = hash_serie(valores)
+    directorio_datos = os.path.join(directorio, hash_datos[:32])
+    os.makedirs(directorio_datos, exist_ok=True)
+
+    candidatos = [tuple(o) for o in itertools.product(p, [d], q)]
+    resultados = {}
+    pendientes = []
+    for order in candidatos:
+        guardado = _leer_json(os.path.join(directorio_datos, f'{_nombre(order)}.json'))
+        if guardado is not None:
+            resultados[order] = dict(guardado, memoria=True)
+        else:
+            pendientes.append(order)
+
+    total = len(pendientes)
+    if pendientes:
+        with ProcessPoolExecutor(max_workers=procesos or os.cpu_count()) as ejecutor:
+            futuros = {}
+            for order in pendientes:
+                # Parámetros del último ajuste de este orden (con otros datos) como punto de partida
+                anterior = _leer_json(os.path.join(directorio, f'ultimo_{_nombre(order)}.json'))
+                iniciales = anterior.get('parametros') if anterior else None
+                futuros[ejecutor.submit(evaluar_orden, valores, order, iniciales)] = order
+            for completados, futuro in enumerate(as_completed(futuros), start=1):
+                order = futuros[futuro]
+                try:
+                    resultado = futuro.result()
+                except Exception as e:
+                    resultado = {'order': list(order), 'aic': None, 'bic': None, 'parametros': None,
+                                 'segundos': None, 'error': f'{type(e).__name__}: {e}'}
+                if resultado['error'] is None:
+                    _escribir_json(os.path.join(directorio_datos, f'{_nombre(order)}.json'), resultado)
+                    _escribir_json(os.path.join(directorio, f'ultimo_{_nombre(order)}.json'), resultado)
+                resultados[order] = dict(resultado, memoria=False)
+                if progreso is not None:
+                    progreso(completados, total, order, resultado)
+
+    tabla = pd.DataFrame([
+        {'order': order, 'aic': r['aic'], 'bic': r['bic'], 'segundos': r.get('segundos'),
+         'memoria': r['memoria'], 'error': r.get('error')}
+        for order, r in resultados.items()
+    ]).sort_values(by=criterio, na_position='last', ignore_index=True)
+
+    validos = tabla[tabla[criterio].notna()]
+    if validos.empty:
+        raise RuntimeError('Ningún orden candidato se pudo ajustar')
+    return tuple(validos['order'].iloc[0]), tabla
+
+
+def _imprimir_progreso(completados, total, order, resultado):
+    valor = 'error' if resultado['error'] else f"AIC={resultado['aic']:.1f} BIC={resultado['bic']:.1f}"
+    print(f'[{completados}/{total}] {order}: {valor}', file=sys.stderr)
+
+
+def _orden_d(texto):
+    return texto if texto == 'adf' else int(texto)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Selección en paralelo del orden del ARIMA.')
+    parser.add_argument('datos', help='CSV limpio (SeoulBikeData_limpio.csv)')
+    parser.add_argument('--p', nargs=2, type=int, default=[0, 6], metavar=('DESDE', 'HASTA'))
+    parser.add_argument('--d', type=_orden_d, default='adf',
+                        help="orden de diferenciación fijo (el cuaderno usa 0) o 'adf' para elegirlo con la prueba ADF")
+    parser.add_argument('--q', nargs=2, type=int, default=[0, 3], metavar=('DESDE', 'HASTA'))
+    parser.add_argument('--criterio', choices=['aic', 'bic'], default='aic')
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--config', default=RUTA_CONFIG, help='archivo de configuración del modelo')
+    args = parser.parse_args(argv)
+
+    serie = datos.cargar(args.datos, columnas=['Date', 'Rented Bike Count'])['Rented Bike Count']
+    d = None if args.d == 'adf' else args.d
+    mejor, tabla = seleccionar_orden(serie, range(*args.p), range(*args.q), d=d,
+                                     criterio=args.criterio, procesos=args.procesos,
+                                     progreso=_imprimir_progreso)
+    print(tabla.to_string(index=False))
+
+    fila = tabla.iloc[0]
+    guardar_orden(mejor, args.config, criterio=args.criterio, aic=float(fila['aic']), bic=float(fila['bic']),
+                  d_elegido_por='adf' if d is None else 'fijo')
+    print(f'Orden elegido: {mejor} (guardado en {args.config})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,264 @@
+import threading
+import time
+import traceback
+
+import pandas as pd
+
+import datos
+from modelo_arima import ORDEN_ARIMA, PASOS_PRONOSTICO, ModeloIncremental, cargar_o_ajustar, hash_archivo
+
+
+class ServicioPronostico:
+    """Ajusta el ARIMA en un hilo de fondo y publica el último pronóstico válido.
+
+    Los callbacks sólo leen ``ultimo()``, que nunca bloquea: devuelve ``None``
+    mientras se calcula el primer pronóstico y después siempre el último
+    resultado completo. Cada resultado se publica de una vez (una sola
+    asignación bajo candado), así que nunca se ve un pronóstico a medias.
+
+    Se reajusta cuando cambia el hash del archivo de datos o cuando alguien
+    llama a ``solicitar_reajuste()``. Cada ``intervalo`` segundos se mira el
+    tamaño y la fecha de modificación del archivo (``datos.version``) y sólo
+    si cambiaron se lee entero para calcular el hash.
+
+    La serie es horaria: las fechas del pronóstico siguen a la última
+    observación con paso ``paso``.
+
+    Las observaciones que llegan entre reajustes se incorporan con
+    ``agregar_observaciones()``, que sólo extiende el filtro (ver
+    ``ModeloIncremental``); la reestimación completa corre en el hilo de fondo
+    cada ``reestimar_cada`` observaciones o si se detecta deriva. Con varios
+    procesos cada uno tiene su propio modelo, pero los reajustes pasan por la
+    caché en disco de ``modelo_arima``: el primero que llega ajusta y los
+    demás leen sus parámetros.
+
+    ``cargar_serie()`` devuelve la serie del archivo ``ruta_datos``. Si las
+    observaciones nuevas salen de un ``AlmacenDatos``, ``leer_ingeridas(f)``
+    debe llamar ``f(serie de las filas ingeridas)`` sin que se publique otra
+    ingesta mientras tanto (``almacen.leer``): cada reajuste las toma de allí
+    y extiende con ellas el modelo del archivo, así que no se pierden.
+    """
+
+    def __init__(self, ruta_datos, cargar_serie, order=ORDEN_ARIMA, pasos=PASOS_PRONOSTICO,
+                 intervalo=None, reestimar_cada=24 * 7, umbral_deriva=3.0, leer_ingeridas=None,
+                 paso=pd.Timedelta(hours=1)):
+        self.ruta_datos = ruta_datos
+        self.cargar_serie = cargar_serie
+        self.leer_ingeridas = leer_ingeridas
+        self.order = tuple(order)
+        self.pasos = pasos
+        self.paso = paso
+        self.intervalo = intervalo
+        self.reestimar_cada = reestimar_cada
+        self.umbral_deriva = umbral_deriva
+
+        self._candado_incremental = threading.Lock()
+        self._incremental = None
+        self._reestimar_pendiente = False
+        self._en_espera = []
+
+        self._candado = threading.Lock()
+        self._resultado = None
+        self._calculando = False
+        self._error = None
+        self._version = 0
+        self._hash_datos = None
+        self._version_datos = None
+
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        self._publicado = threading.Event()
+        self._hilo = None
+
+    def iniciar(self):
+        # También sirve para relanzar el hilo en un proceso hijo tras un fork
+        if self._hilo is None or not self._hilo.is_alive():
+            self._detener.clear()
+            self._despertar.set()
+            self._hilo = threading.Thread(target=self._ciclo, name='servicio-pronostico', daemon=True)
+            self._hilo.start()
+        return self
+
+    def detener(self, esperar=False):
+        self._detener.set()
+        self._despertar.set()
+        if esperar and self._hilo is not None:
+            self._hilo.join()
+
+    def esperar(self, timeout=None):
+        """Bloquea hasta que haya un pronóstico publicado; devuelve si lo hay."""
+        return self._publicado.wait(timeout)
+
+    def solicitar_reajuste(self):
+        """Pide un reajuste sin esperar a que termine (p. ej. tras cargar datos nuevos)."""
+        with self._candado:
+            self._hash_datos = None
+        self._despertar.set()
+
+    def agregar_observaciones(self, nuevos):
+        """Incorpora observaciones nuevas (serie con índice de fechas) sin reajustar.
+
+        Actualiza el estado filtrado y el pronóstico en el hilo que llama (es
+        barato) y publica el resultado. Si todavía no hay un modelo, quedan en
+        espera hasta que se publique el primer ajuste y se devuelve ``False``.
+        No lanza errores (se llama dentro de la ingesta): si la actualización
+        falla, se descarta el estado incremental, se pide un reajuste completo
+        y se devuelve ``False``.
+        """
+        with self._candado_incremental:
+            if self._incremental is None:
+                resultado = self._resultado
+                if resultado is None:
+                    self._en_espera.append(nuevos)
+                    return False
+            inicio = time.perf_counter()
+            try:
+                if self._incremental is None:
+                    self._incremental = ModeloIncremental(
+                        resultado['serie'], resultado['params'], order=self.order, pasos=self.pasos,
+                        reestimar_cada=self.reestimar_cada, umbral_deriva=self.umbral_deriva,
+                        clave=resultado['clave'])
+                modelo = self._incremental.agregar(nuevos)
+            except Exception:
+                self._incremental = None
+                self._fallo()
+                self.solicitar_reajuste()
+                return False
+            self._publicar(modelo, self._incremental.serie, self._hash_datos, inicio)
+            if self._incremental.necesita_reestimar:
+                self._reestimar_pendiente = True
+                self._despertar.set()
+        return True
+
+    def ultimo(self):
+        """Último pronóstico publicado, o ``None`` si aún no hay ninguno."""
+        return self._resultado
+
+    def estado(self):
+        with self._candado:
+            if self._error is not None and self._resultado is None:
+                estado = 'error'
+            elif self._calculando:
+                estado = 'calculando'
+            elif self._resultado is None:
+                estado = 'pendiente'
+            else:
+                estado = 'listo'
+            return {'estado': estado, 'version': self._version, 'error': self._error}
+
+    def _ciclo(self):
+        while not self._detener.is_set():
+            self._despertar.wait(self.intervalo)
+            self._despertar.clear()
+            if self._detener.is_set():
+                break
+            if self._reestimar_pendiente:
+                self._reestimar()
+                continue
+            try:
+                version_datos = datos.version(self.ruta_datos)
+            except OSError:
+                version_datos = None
+            if version_datos is not None and version_datos == self._version_datos and self._hash_datos is not None:
+                continue
+            try:
+                hash_datos = hash_archivo(self.ruta_datos)
+            except OSError:
+                hash_datos = None
+            if hash_datos is None or hash_datos != self._hash_datos:
+                self._recalcular(hash_datos)
+            # Sólo si el modelo publicado es de este archivo: si el ajuste falló, se reintenta
+            if hash_datos is not None and hash_datos == self._hash_datos:
+                self._version_datos = version_datos
+
+    def _publicar(self, modelo, serie, hash_datos, inicio):
+        forecast_index = pd.date_range(start=serie.index[-1], periods=self.pasos + 1, freq=self.paso)[1:]
+        # Los resultados de statsmodels no se publican: sólo parámetros y pronóstico
+        resultado = {campo: valor for campo, valor in modelo.items() if campo != 'model_fit'}
+        resultado.update(serie=serie, forecast_index=forecast_index, duracion=time.perf_counter() - inicio)
+        with self._candado:
+            self._version += 1
+            resultado['version'] = self._version
+            self._resultado = resultado
+            self._hash_datos = hash_datos
+            self._calculando = False
+            self._error = None
+        self._publicado.set()
+
+    def _fallo(self):
+        with self._candado:
+            self._calculando = False
+            self._error = traceback.format_exc(limit=3)
+
+    def _recalcular(self, hash_datos):
+        with self._candado:
+            self._calculando = True
+        inicio = time.perf_counter()
+        try:
+            serie = self.cargar_serie()
+            modelo = cargar_o_ajustar(serie, self.ruta_datos, order=self.order, pasos=self.pasos)
+        except Exception:
+            self._fallo()
+            return
+        if self.leer_ingeridas is None:
+            self._instalar(modelo, serie, hash_datos, inicio)
+        else:
+            # El almacén no publica filas mientras tanto: las que lleguen después
+            # entran por agregar_observaciones al modelo nuevo
+            self.leer_ingeridas(lambda ingeridas: self._instalar(modelo, serie, hash_datos, inicio, ingeridas))
+
+    def _instalar(self, modelo, serie, hash_datos, inicio, ingeridas=None):
+        """Reemplaza el modelo en memoria por el del archivo, extendido con las filas ingeridas."""
+        with self._candado_incremental:
+            self._incremental = None
+            self._reestimar_pendiente = False
+            if ingeridas is None:
+                # Sin almacén: sólo las observaciones que llegaron antes del primer ajuste
+                ingeridas = pd.concat(self._en_espera) if self._en_espera else None
+            # Con almacén, lo que quedó en espera ya está en ``ingeridas``
+            self._en_espera = []
+            if ingeridas is None or len(ingeridas) == 0:
+                self._publicar(modelo, serie, hash_datos, inicio)
+                return
+            try:
+                incremental = ModeloIncremental(
+                    serie, modelo['params'], order=self.order, pasos=self.pasos,
+                    reestimar_cada=self.reestimar_cada, umbral_deriva=self.umbral_deriva,
+                    clave=modelo['clave'])
+                actualizado = incremental.agregar(ingeridas)
+            except Exception:
+                self._publicar(modelo, serie, hash_datos, inicio)
+                self._fallo()
+                return
+            self._incremental = incremental
+            self._publicar(actualizado, incremental.serie, hash_datos, inicio)
+
+    def _reestimar(self):
+        with self._candado_incremental:
+            self._reestimar_pendiente = False
+            incremental = self._incremental
+            if incremental is None:
+                return
+        with self._candado:
+            self._calculando = True
+        inicio = time.perf_counter()
+        try:
+            # Fuera del candado: mientras tanto las observaciones nuevas siguen entrando en ``incremental``
+            nuevo, modelo = incremental.reestimar()
+        except Exception:
+            self._fallo()
+            return
+        with self._candado_incremental:
+            if self._incremental is not incremental:
+                # Otro ajuste (o un fallo) lo reemplazó mientras tanto: éste ya no sirve
+                with self._candado:
+                    self._calculando = False
+                return
+            # Observaciones que llegaron mientras se reestimaba
+            faltantes = incremental.serie.iloc[nuevo.n:]
+            if len(faltantes):
+                modelo = nuevo.agregar(faltantes)
+            self._incremental = nuevo
+            # Lo que pidió reestimar mientras tanto ya está en el modelo nuevo
+            self._reestimar_pendiente = nuevo.necesita_reestimar
+            self._publicar(modelo, nuevo.serie, self._hash_datos, inicio)
@@ -0,0 +1,433 @@
+"""Tablero completo: datos, ingesta, pronóstico, métricas, layout y callbacks.
+
+``construir_app(ruta_datos)`` arma la app de Dash con las seis
+visualizaciones y devuelve un ``Tablero``. Los puntos de entrada ("Tablero
+completo.py" y soportes/despliegue/Tablero_completo_aws.py) sólo eligen la
+ruta de los datos y cómo se sirve la app.
+"""
+import os
+import time
+
+import dash
+from dash import dcc, html
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
+import plotly.express as px
+
+from indice_fechas import IndiceFechas
+from ingesta import AlmacenDatos, LectorIngesta
+import datos
+from cache_figuras import CacheFiguras
+import demanda_cliente
+from agregados import CuboDemanda
+from calendario import facetas_options, figura_calendario
+from correlaciones import figura_calidad, figura_correlaciones
+from arranque import Arranque
+from dispersion import figura_dispersion, modo_options
+from estadisticas import EstadisticasFlujo
+from grafico_pronostico import componentes_pronostico, registrar_pronostico
+from modelo_arima import orden_configurado
+import modelo_ols
+from metricas import Metricas, instrumentar
+import respuestas
+from servicio_pronostico import ServicioPronostico
+
+# Estilos externos
+external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
+
+# Colores por estación
+color_map = { 
+    "Spring": "hotpink",  
+    "Summer": "palegreen",  
+    "Autumn": "darkorange",  
+    "Winter": "lightskyblue" 
+}
+
+# Opciones para el dropdown del tercer gráfico
+x_options = {
+    'Temperature(C)': 'Temperatura (C)',
+    'Humidity(%)': 'Humedad (%)',
+    'Wind speed (m/s)': 'Velocidad del viento (m/s)',
+    'Visibility (10m)': 'Visibilidad (10m)',
+    'Solar Radiation (MJ/m2)': 'Radiación Solar (MJ/m2)'
+}
+
+season_value_map = {
+    3:'Winter',
+    0:'Autumn',
+    2:'Summer',
+    1:'Spring'
+}
+
+
+class Tablero:
+    """Lo que los puntos de entrada usan del tablero armado (gunicorn, /listo, benchmark)."""
+
+    def __init__(self, app, arranque, almacen, servicio_pronostico, metricas):
+        self.app = app
+        self.server = app.server
+        self.arranque = arranque
+        self.almacen = almacen
+        self.servicio_pronostico = servicio_pronostico
+        self.metricas = metricas
+
+    @property
+    def datab(self):
+        """Tabla vigente: la original más las filas ingeridas."""
+        return self.almacen.datos
+
+
+def construir_app(ruta_datos, nombre=__name__, inicio_arranque=None):
+    """Carga ``ruta_datos`` y arma la app; devuelve un ``Tablero``.
+
+    ``inicio_arranque`` es el ``time.perf_counter()`` del inicio del punto de
+    entrada, para que el reporte del arranque incluya las importaciones.
+    """
+    # Tiempos de cada etapa del arranque (se muestran al final).
+    # statsmodels no se importa aquí: se carga en el primer ajuste del ARIMA.
+    arranque = Arranque(inicio_arranque)
+    arranque.marcar('importaciones')
+
+    # Leer los datos desde su copia columnar (fechas ya convertidas y filas
+    # ordenadas por fecha y hora); se regenera sola si cambia el CSV
+    inicio_carga = time.perf_counter()
+    datab = datos.cargar(ruta_datos)
+
+    # Indexar los bloques de cada día
+    indice_fechas = IndiceFechas(datab)
+    duracion_carga = time.perf_counter() - inicio_carga
+
+    # Memoria por columna (tipos compactos de datos.ESQUEMA): cada worker tiene su copia
+    print(datos.reporte_memoria(datab, 'datab'), flush=True)
+    arranque.marcar('carga de datos')
+
+    # Si caben, los datos por hora de todos los días se envían al navegador una sola
+    # vez y el cambio de fecha se resuelve allí, sin ir al servidor
+    precargar_demanda = demanda_cliente.precargar(indice_fechas)
+
+    # Filas nuevas en vivo (ver ingesta.py): datab pasa a ser la tabla del almacén,
+    # que crece al final sin recargar el CSV
+    almacen = AlmacenDatos(datab)
+
+    # Serie del modelo ARIMA: mientras el CSV no cambie es una vista sobre sus
+    # filas en datab (sin una segunda copia); si cambió, se vuelve a leer. Las
+    # filas ingeridas llegan al modelo con agregar_observaciones y, en cada
+    # reajuste, se vuelven a leer del almacén con leer_ingeridas.
+    version_datab = datos.version(ruta_datos)
+
+    def cargar_serie():
+        if datos.version(ruta_datos) == version_datab:
+            return datos.serie(almacen.datos.iloc[:almacen.filas_base])
+        return datos.serie(datos.cargar(ruta_datos, columnas=['Date', 'Hour', 'Rented Bike Count']))
+
+    def leer_ingeridas(funcion):
+        return almacen.leer(lambda actuales: funcion(datos.serie(actuales.iloc[almacen.filas_base:])))
+
+    # El ARIMA se ajusta en segundo plano para que la app responda desde el inicio
+    # (el hilo se lanza al final, con el layout y los callbacks listos, para
+    # que statsmodels no compita con el arranque). Cada 10 minutos se revisa
+    # si cambiaron los datos y, si es así, se reajusta.
+    # El modelo ajustado y su pronóstico se guardan en disco y se reutilizan
+    # mientras no cambien los datos ni el orden del modelo (modelo_arima.json,
+    # escrito por seleccion_orden.py; (5, 1, 0) si no existe).
+    servicio_pronostico = ServicioPronostico(ruta_datos, cargar_serie, order=orden_configurado(), pasos=50,
+                                             intervalo=600, leer_ingeridas=leer_ingeridas)
+
+    # Caché de figuras: mismas entradas y misma versión de los datos (CSV y filas
+    # ingeridas) -> misma figura. Con TABLERO_CACHE_FIGURAS se comparte además en
+    # disco entre procesos.
+    cache_figuras = CacheFiguras(version=lambda: f'{datos.version(ruta_datos)}+{almacen.version}', max_entradas=512,
+                                 directorio=os.environ.get('TABLERO_CACHE_FIGURAS'))
+    arranque.marcar('datos del pronóstico')
+
+    # Inicializar la app Dash
+    app = dash.Dash(nombre, external_stylesheets=external_stylesheets)
+    server = app.server
+
+    # Métricas de los callbacks (latencia, bytes, lentos), de la carga de datos,
+    # del modelo y de la caché de figuras, en formato Prometheus en /metricas
+    metricas = Metricas()
+    instrumentar(server, metricas)
+    # Figuras compactas (precisión, fechas) y compresión gzip/brotli de las
+    # respuestas; después de instrumentar para medir los bytes que salen por la red.
+    # Las respuestas se serializan con orjson si está instalado.
+    respuestas.configurar_json()
+    respuestas.optimizar(server, metricas)
+    metricas.registrar_medidor('tablero_carga_datos_segundos', lambda: duracion_carga,
+                               'Duración de la carga de datos e índices')
+    metricas.registrar_medidor('tablero_datos_bytes', lambda: int(datos.memoria(datab)['bytes'].sum()),
+                               'Memoria ocupada por los datos cargados')
+    metricas.registrar_medidor('tablero_ajuste_modelo_segundos',
+                               lambda: (servicio_pronostico.ultimo() or {}).get('duracion'),
+                               'Duración del último ajuste o actualización del ARIMA')
+    metricas.registrar_medidor('tablero_cache_figuras_aciertos', lambda: cache_figuras.estadisticas()['aciertos'],
+                               'Figuras servidas desde la memoria')
+    metricas.registrar_medidor('tablero_cache_figuras_aciertos_disco',
+                               lambda: cache_figuras.estadisticas()['aciertos_disco'],
+                               'Figuras servidas desde el disco compartido')
+    metricas.registrar_medidor('tablero_cache_figuras_fallos', lambda: cache_figuras.estadisticas()['fallos'],
+                               'Figuras construidas')
+    metricas.registrar_medidor('tablero_cache_figuras_tasa_aciertos',
+                               lambda: cache_figuras.estadisticas()['tasa_aciertos'],
+                               'Fracción de figuras servidas desde la caché')
+
+    # API de predicción por lotes con el modelo OLS (coeficientes en modelo_ols.json);
+    # el modelo se lee o se entrena en la primera solicitud
+    modelo_ols.registrar_api(server, lambda: modelo_ols.cargar_o_entrenar(datab))
+    arranque.marcar('app, métricas y API')
+
+    # Agregados de la demanda por estación, hora, día de la semana y mes (una sola pasada);
+    # las gráficas de resumen se dibujan desde estas tablas pequeñas
+    cubo_demanda = CuboDemanda(datab)
+
+    # Medias, varianzas, co-momentos, ceros y nulos de las columnas numéricas (una
+    # pasada); el panel de correlaciones y calidad de datos se dibuja desde aquí
+    estadisticas_datos = EstadisticasFlujo.de_tabla(datab)
+
+    # Figura de la demanda por estación (se rehace cuando llegan filas nuevas)
+    def figura_estaciones():
+        demanda_estacion = cubo_demanda.resumen(por=['Seasons'])
+        demanda_estacion['Season Value'] = demanda_estacion['Seasons'].map(season_value_map)
+        return (px.bar(demanda_estacion, x='Seasons', y='sum', color='Season Value', text_auto=True,
+                       labels={'sum': 'Rented Bike Count'},
+                       color_discrete_map=color_map)  # Colores personalizados
+                .update_layout(
+                    plot_bgcolor='rgba(0, 0, 0, 0)',
+                    xaxis_title="Estaciones",
+                    yaxis_title='Demanda de Bicicletas',
+                    xaxis=dict(mirror=True, ticks='outside', gridcolor='lightgrey'),
+                    yaxis=dict(mirror=True, ticks='outside', gridcolor='lightgrey'),
+                    coloraxis_colorbar=dict(
+                        title="Valor de la Estación",
+                        tickvals=[0, 1, 2, 3],
+                        ticktext=['Autumn (0)', 'Spring (1)', 'Summer (2)', 'Winter (3)']
+                    )
+                ))
+
+    # Cada ingesta actualiza las estructuras derivadas sólo con las filas nuevas:
+    # índice de fechas (y su matriz por hora), agregados, estadísticas y modelo ARIMA
+    def al_ingerir(datos_actuales, nuevas):
+        nonlocal datab
+        datab = datos_actuales
+        indice_fechas.extender(datos_actuales)
+        cubo_demanda.agregar(nuevas)
+        estadisticas_datos.agregar(nuevas)
+        servicio_pronostico.agregar_observaciones(datos.serie(nuevas))
+
+    # Si la ingesta falla a medias, las estructuras se rehacen con los datos vigentes
+    def al_revertir(datos_vigentes):
+        nonlocal datab, indice_fechas, cubo_demanda, estadisticas_datos
+        datab = datos_vigentes
+        indice_fechas = IndiceFechas(datos_vigentes)
+        cubo_demanda = CuboDemanda(datos_vigentes)
+        estadisticas_datos = EstadisticasFlujo.de_tabla(datos_vigentes)
+
+    almacen.suscribir(al_ingerir, al_revertir)
+    lector_ingesta = LectorIngesta(almacen)
+    lector_ingesta.registrar(server)
+    # Filas ya escritas en el archivo de ingesta antes de este arranque
+    lector_ingesta.revisar(forzar=True)
+    metricas.registrar_medidor('tablero_ingesta_filas', lambda: almacen.version,
+                               'Filas agregadas por la ingesta desde el arranque')
+    metricas.registrar_medidor('tablero_ingesta_errores', lambda: lector_ingesta.errores,
+                               'Bloques del archivo de ingesta descartados por inválidos')
+
+    arranque.marcar('agregados')
+
+    # Layout de la aplicación con las seis visualizaciones
+    app.layout = html.Div(children=[
+        # Título del Dashboard
+        html.H1(children='Demanda de Bicicletas en Seúl', style={'text-align': 'center', }),
+
+        # Primera visualización: Histograma de demanda de bicicletas por estación
+        html.Div([
+            html.H2('Demanda de Bicicletas por Estación'),
+            dcc.Graph(
+                id='graph-rented-bikes-seasons',
+                figure=figura_estaciones()
+            )
+        ], style={'margin-bottom': '40px'}),
+
+        # Segunda visualización: Línea de demanda por hora y fecha seleccionada
+        html.Div([
+            html.H2('Demanda de Bicicletas por Hora'),
+            html.Div('Seleccione una fecha para visualizar la demanda de bicicletas:'),
+            dcc.DatePickerSingle(
+                id='date-picker-single',
+                min_date_allowed=datab['Date'].min().date(),
+                max_date_allowed=datab['Date'].max().date(),
+                date=datab['Date'].min().date(),
+                display_format='YYYY-MM-DD'
+            ),
+            dcc.Store(
+                id='demanda-por-dia',
+                data=demanda_cliente.payload_demanda(indice_fechas) if precargar_demanda else None
+            ),
+            # Revisión periódica de datos nuevos (fechas del calendario, estaciones, etc.)
+            dcc.Interval(id='datos-interval', interval=5000),
+            dcc.Store(id='datos-version', data=almacen.version),
+            dcc.Graph(id='graph-rented-bikes-hour')
+        ], style={'margin-bottom': '40px'}),
+
+        # Tercera visualización: calendario de la demanda de cada día por hora, desde
+        # la misma matriz (días × 24) que la gráfica por hora
+        html.Div([
+            html.H2('Calendario de la Demanda por Hora'),
+            dcc.RadioItems(
+                id='faceta-calendario',
+                options=[{'label': label, 'value': value} for value, label in facetas_options.items()],
+                value='ninguna',
+                inline=True
+            ),
+            dcc.Graph(id='graph-calendario')
+        ], style={'margin-bottom': '40px'}),
+
+        # Cuarta visualización: correlaciones entre las variables y calidad de los datos
+        html.Div([
+            html.H2('Correlaciones y Calidad de los Datos'),
+            dcc.Graph(id='graph-correlaciones'),
+            dcc.Graph(id='graph-calidad')
+        ], style={'margin-bottom': '40px'}),
+
+        # Quinta visualización: Gráfico de dispersión con diferentes variables climáticas
+        html.Div([
+            html.H2('Demanda de Bicicletas vs. Condiciones Climáticas'),
+            html.Div([
+                dcc.Dropdown(
+                    id='xaxis-column',
+                    options=[{'label': label, 'value': value} for value, label in x_options.items()],
+                    value='Wind speed (m/s)'  # Valor por defecto
+                ),
+            ], style={'width': '100%', 'display': 'inline-block'}),
+
+            # Modo de dibujo: con muchos registros se muestra la densidad en lugar de los puntos
+            dcc.RadioItems(
+                id='modo-dispersion',
+                options=[{'label': label, 'value': value} for value, label in modo_options.items()],
+                value='auto',
+                inline=True
+            ),
+
+            dcc.Graph(id='indicator-graphic')
+        ], style={'margin-bottom': '40px'}),
+
+        # Sexta visualización: Pronóstico de demanda con ARIMA
+        html.Div([
+            html.H2('Pronóstico de la Demanda de Bicicletas con ARIMA'),
+            *componentes_pronostico()
+        ])
+    ])
+    arranque.marcar('layout')
+
+    # Callback que lleva los datos nuevos de la ingesta al navegador: límites del
+    # calendario, demanda por día precargada y gráfica por estación
+    @app.callback(
+        [Output('date-picker-single', 'min_date_allowed'),
+         Output('date-picker-single', 'max_date_allowed'),
+         Output('demanda-por-dia', 'data'),
+         Output('graph-rented-bikes-seasons', 'figure'),
+         Output('datos-version', 'data')],
+        [Input('datos-interval', 'n_intervals')],
+        [State('datos-version', 'data')]
+    )
+    def update_datos(_, version_mostrada):
+        lector_ingesta.revisar()
+        version = almacen.version
+        if version == version_mostrada:
+            raise PreventUpdate
+        payload = demanda_cliente.payload_demanda(indice_fechas) if precargar_demanda else None
+        figura = cache_figuras.obtener('figura_estaciones', [], figura_estaciones)
+        return (datab['Date'].iloc[0].date(), datab['Date'].iloc[-1].date(), payload, figura, version)
+
+    # Callback para actualizar el gráfico de demanda por hora según la fecha seleccionada
+    @cache_figuras.memorizar()
+    def update_graph_hour(selected_date, _version_datos=None):
+        if selected_date is None:
+            selected_date = datab['Date'].min().date()
+
+        filtered_data = indice_fechas.dia(selected_date)
+        # El día de la semana se calcula sólo para las 24 filas del día (no se guarda en datab)
+        filtered_data = filtered_data.assign(**{'Día de la Semana': filtered_data['Date'].dt.day_name()})
+
+        fig = px.line(filtered_data, x="Hour", y="Rented Bike Count", color="Día de la Semana", markers=True)
+
+        fig.update_layout(
+            title=f"Bicicletas Rentadas por Hora en {selected_date}",
+            xaxis_title="Hora",
+            yaxis_title="Demanda de Bicicletas",
+            plot_bgcolor='rgba(0, 0, 0, 0)',
+            xaxis=dict(mirror=True, ticks='outside', gridcolor='lightgrey'),
+            yaxis=dict(mirror=True, ticks='outside', gridcolor='lightgrey')
+        )
+
+        return fig
+
+    # Con los datos precargados la gráfica se actualiza en el navegador; si no, en el servidor
+    if precargar_demanda:
+        demanda_cliente.registrar_grafica_horaria(app, 'date-picker-single', 'graph-rented-bikes-hour', 'demanda-por-dia')
+    else:
+        app.callback(Output('graph-rented-bikes-hour', 'figure'),
+                     [Input('date-picker-single', 'date'),
+                      Input('datos-version', 'data')])(update_graph_hour)
+
+    # Callback para el calendario (se rehace con cada faceta y cuando llegan datos nuevos)
+    @app.callback(
+        Output('graph-calendario', 'figure'),
+        [Input('faceta-calendario', 'value'),
+         Input('datos-version', 'data')]
+    )
+    @cache_figuras.memorizar()
+    def update_calendario(faceta, _version_datos=None):
+        return figura_calendario(indice_fechas, faceta or 'ninguna')
+
+    # Callbacks del panel de correlaciones y calidad (sólo cambian cuando llegan datos nuevos)
+    @app.callback(
+        Output('graph-correlaciones', 'figure'),
+        [Input('datos-version', 'data')]
+    )
+    @cache_figuras.memorizar()
+    def update_correlaciones(_version_datos=None):
+        return figura_correlaciones(estadisticas_datos)
+
+    @app.callback(
+        Output('graph-calidad', 'figure'),
+        [Input('datos-version', 'data')]
+    )
+    @cache_figuras.memorizar()
+    def update_calidad(_version_datos=None):
+        return figura_calidad(estadisticas_datos)
+
+    # Callback para actualizar el gráfico de dispersión con variables climáticas
+    @app.callback(
+        Output('indicator-graphic', 'figure'),
+        [Input('xaxis-column', 'value'),
+         Input('modo-dispersion', 'value'),
+         Input('datos-version', 'data')]
+    )
+    @cache_figuras.memorizar()
+    def update_graph_climate(xaxis_column_name, modo, _version_datos=None):
+        fig = figura_dispersion(datab, xaxis_column_name, 'Rented Bike Count', modo or 'auto')
+
+        fig.update_layout(
+            title=f'Dispersión de Demanda Bicicletas vs {x_options.get(xaxis_column_name, xaxis_column_name)}',
+            xaxis_title=x_options.get(xaxis_column_name, xaxis_column_name),
+            yaxis_title="Demanda de Bicicletas",
+            plot_bgcolor='rgba(0, 0, 0, 0)',
+            xaxis=dict(mirror=True, ticks='outside', gridcolor='lightgrey'),
+            yaxis=dict(mirror=True, ticks='outside', gridcolor='lightgrey')
+        )
+
+        return fig
+
+    # Callback del gráfico de pronóstico (nunca espera al ajuste; ver grafico_pronostico.py)
+    registrar_pronostico(app, servicio_pronostico, cache_figuras,
+                         titulo='Pronóstico de Demanda de Bicicletas con ARIMA (50 periodos siguientes)')
+
+    arranque.marcar('callbacks')
+    print(arranque.reporte(), flush=True)
+    metricas.registrar_medidor('tablero_arranque_segundos', arranque.total,
+                               'Duración del arranque hasta tener el layout y los callbacks')
+
+    # Primer ajuste del ARIMA (o lectura de su caché) en segundo plano
+    servicio_pronostico.iniciar()
+    return Tablero(app, arranque, almacen, servicio_pronostico, metricas)
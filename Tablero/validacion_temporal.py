@@ -0,0 +1,269 @@
+"""Validación walk-forward (con origen móvil) del ARIMA y de los OLS de demanda.
+
+Reemplaza la partición aleatoria 80/20 del cuaderno "Modelamiento": en cada
+corte se entrena con toda la historia anterior y se pronostican las
+``horizonte`` horas siguientes, como se usaría el modelo en el tablero.
+
+Los cortes se reparten en tramos consecutivos que se evalúan en paralelo en
+un pool de procesos. Dentro de cada tramo se reutiliza el ajuste:
+    - ARIMA: se estiman los parámetros en el primer corte del tramo y en los
+      siguientes sólo se extiende el filtro con las observaciones nuevas
+      (``extend``, como ``ModeloIncremental``);
+    - OLS: las ecuaciones normales (X'X, X'y) se acumulan de un corte al
+      siguiente, así que cada corte cuesta lo que las filas nuevas.
+``--reajustar-cada`` fija el largo de los tramos (1 = estimar en cada corte).
+
+Uso:
+    python Tablero/validacion_temporal.py data/SeoulBikeData_limpio.csv
+    python Tablero/validacion_temporal.py data/SeoulBikeData_limpio.csv --cortes 40 --horizonte 48 \\
+        --ordenes 5,1,0 2,1,2 --ols linreg1 linreg2 --procesos 8 --salida validacion
+"""
+import argparse
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+import datos
+from modelo_arima import ajustar, orden_configurado
+from modelo_ols import FEATURES
+
+# Conjuntos de variables de los OLS del cuaderno (linreg2 es el del tablero)
+CONJUNTOS_OLS = {
+    'linreg1': ['Hour', 'Temperature(C)', 'Humidity(%)', 'Wind speed (m/s)', 'Visibility (10m)',
+                'Solar Radiation (MJ/m2)', 'Seasons'],
+    'linreg2': FEATURES,
+}
+
+CORTES = 20
+HORIZONTE = 24
+# Fracción de la serie que se usa siempre para entrenar (el primer corte)
+INICIO = 0.5
+# Horizontes (horas) que se muestran en la tabla por horizonte
+HORIZONTES_REPORTE = (1, 3, 6, 12, 24, 48)
+
+# Datos de cada proceso del pool (se envían una vez, en el inicializador)
+_DATOS = {}
+
+
+def _iniciar(y, matrices):
+    _DATOS['y'] = y
+    _DATOS['X'] = matrices
+
+
+def cortes(n, n_cortes=CORTES, horizonte=HORIZONTE, inicio=INICIO):
+    """Posiciones de corte equiespaciadas entre ``inicio`` × n y n − ``horizonte``."""
+    primero = max(int(inicio * n), 1)
+    ultimo = n - horizonte
+    if ultimo < primero:
+        raise ValueError(f'La serie ({n} filas) es muy corta para un horizonte de {horizonte}')
+    return np.unique(np.linspace(primero, ultimo, n_cortes).astype(np.int64))
+
+
+def evaluar_arima(order, posiciones, horizonte):
+    """Pronósticos del ARIMA en cada corte de ``posiciones`` (un tramo, en orden)."""
+    y = _DATOS['y']
+    inicio = time.perf_counter()
+    model_fit = ajustar(y[:posiciones[0]], order=order, pasos=horizonte)['model_fit']
+    predicciones = []
+    for anterior, corte in zip(np.concatenate([[posiciones[0]], posiciones[:-1]]), posiciones):
+        if corte > anterior:
+            model_fit = model_fit.extend(y[anterior:corte])
+        predicciones.append(np.asarray(model_fit.forecast(steps=horizonte), dtype=np.float64))
+    return np.vstack(predicciones), time.perf_counter() - inicio
+
+
+def evaluar_ols(conjunto, posiciones, horizonte):
+    """Predicciones del OLS de ``conjunto`` en cada corte, acumulando las ecuaciones normales."""
+    y = _DATOS['y']
+    X = _DATOS['X'][conjunto]
+    inicio = time.perf_counter()
+    k = X.shape[1] + 1
+    gram, xy = np.zeros((k, k)), np.zeros(k)
+    desde = 0
+    predicciones = []
+    for corte in posiciones:
+        nuevas = np.column_stack([np.ones(corte - desde), X[desde:corte]])
+        gram += nuevas.T @ nuevas
+        xy += nuevas.T @ y[desde:corte]
+        desde = corte
+        coeficientes, *_ = np.linalg.lstsq(gram, xy, rcond=None)
+        predicciones.append(X[corte:corte + horizonte] @ coeficientes[1:] + coeficientes[0])
+    return np.vstack(predicciones), time.perf_counter() - inicio
+
+
+def _evaluar(tipo, parametro, posiciones, horizonte):
+    if tipo == 'arima':
+        return evaluar_arima(parametro, posiciones, horizonte)
+    return evaluar_ols(parametro, posiciones, horizonte)
+
+
+def metricas(real, prediccion):
+    """R², MAE y RMSE de ``prediccion`` frente a ``real`` (arreglos del mismo tamaño)."""
+    real, prediccion = np.ravel(real), np.ravel(prediccion)
+    errores = prediccion - real
+    total = np.sum((real - real.mean()) ** 2)
+    return {
+        'r2': 1 - np.sum(errores ** 2) / total if total > 0 else np.nan,
+        'mae': np.mean(np.abs(errores)),
+        'rmse': np.sqrt(np.mean(errores ** 2)),
+    }
+
+
+def validar(y, matrices=None, ordenes=(), conjuntos=(), n_cortes=CORTES, horizonte=HORIZONTE,
+            inicio=INICIO, reajustar_cada=None, procesos=None, progreso=None):
+    """Evalúa los ARIMA de ``ordenes`` y los OLS de ``conjuntos`` en los mismos cortes.
+
+    ``matrices`` tiene la matriz de variables (n × k) de cada conjunto.
+    Devuelve ``(posiciones, resultados)``: ``resultados[modelo]`` tiene la
+    matriz de predicciones (cortes × horizonte), los segundos de cómputo y
+    los ajustes desde cero (uno por tramo); los modelos que fallaron traen ``error``.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    matrices = {c: np.asarray(matrices[c], dtype=np.float64) for c in conjuntos}
+    posiciones = cortes(len(y), n_cortes, horizonte, inicio)
+    procesos = procesos or os.cpu_count()
+    tam_tramo = reajustar_cada or math.ceil(len(posiciones) / procesos)
+    tramos = [(i, posiciones[i:i + tam_tramo]) for i in range(0, len(posiciones), tam_tramo)]
+
+    modelos = {f'ARIMA{tuple(o)}': ('arima', tuple(o)) for o in ordenes}
+    modelos.update({f'OLS {c}': ('ols', c) for c in conjuntos})
+    tareas = [(nombre, i, tramo) for nombre in modelos for i, tramo in tramos]
+    resultados = {nombre: {'prediccion': np.full((len(posiciones), horizonte), np.nan), 'segundos': 0.0,
+                           'ajustes': 0, 'error': None} for nombre in modelos}
+
+    def registrar(nombre, i, tramo, futuro_o_valor, completadas):
+        try:
+            prediccion, segundos = futuro_o_valor()
+            resultado = resultados[nombre]
+            resultado['prediccion'][i:i + len(tramo)] = prediccion
+            resultado['segundos'] += segundos
+            resultado['ajustes'] += 1
+        except Exception as e:
+            resultados[nombre]['error'] = f'{type(e).__name__}: {e}'
+        if progreso is not None:
+            progreso(completadas, len(tareas), nombre, resultados[nombre])
+
+    if procesos <= 1:
+        _iniciar(y, matrices)
+        for completadas, (nombre, i, tramo) in enumerate(tareas, start=1):
+            tipo, parametro = modelos[nombre]
+            registrar(nombre, i, tramo, lambda: _evaluar(tipo, parametro, tramo, horizonte), completadas)
+    else:
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar, initargs=(y, matrices)) as ejecutor:
+            futuros = {ejecutor.submit(_evaluar, *modelos[nombre], tramo, horizonte): (nombre, i, tramo)
+                       for nombre, i, tramo in tareas}
+            for completadas, futuro in enumerate(as_completed(futuros), start=1):
+                registrar(*futuros[futuro], futuro.result, completadas)
+    return posiciones, resultados
+
+
+def reales(y, posiciones, horizonte):
+    """Valores observados (cortes × horizonte) que corresponden a cada pronóstico."""
+    return np.asarray(y, dtype=np.float64)[posiciones[:, None] + np.arange(horizonte)]
+
+
+def tabla_pliegues(y, posiciones, resultados, fechas=None):
+    """Una fila por modelo y corte, con las métricas sobre todo el horizonte."""
+    horizonte = next(iter(resultados.values()))['prediccion'].shape[1]
+    observados = reales(y, posiciones, horizonte)
+    filas = []
+    for nombre, resultado in resultados.items():
+        if resultado['error']:
+            continue
+        for pliegue, corte in enumerate(posiciones):
+            filas.append({'modelo': nombre, 'pliegue': pliegue,
+                          'corte': fechas[corte] if fechas is not None else corte,
+                          'entrenamiento': int(corte),
+                          **metricas(observados[pliegue], resultado['prediccion'][pliegue])})
+    return pd.DataFrame(filas)
+
+
+def tabla_horizontes(y, posiciones, resultados, horizontes=None):
+    """Una fila por modelo y horizonte (horas desde el corte), con las métricas sobre todos los cortes."""
+    horizonte = next(iter(resultados.values()))['prediccion'].shape[1]
+    observados = reales(y, posiciones, horizonte)
+    horizontes = range(1, horizonte + 1) if horizontes is None else horizontes
+    filas = []
+    for nombre, resultado in resultados.items():
+        if resultado['error']:
+            continue
+        for h in horizontes:
+            filas.append({'modelo': nombre, 'horizonte': h,
+                          **metricas(observados[:, h - 1], resultado['prediccion'][:, h - 1])})
+    return pd.DataFrame(filas)
+
+
+def _orden(texto):
+    try:
+        order = tuple(int(x) for x in texto.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'Orden inválido: {texto!r} (se espera p,d,q)')
+    if len(order) != 3:
+        raise argparse.ArgumentTypeError(f'Orden inválido: {texto!r} (se espera p,d,q)')
+    return order
+
+
+def _imprimir_progreso(completadas, total, nombre, resultado):
+    estado = f"error: {resultado['error']}" if resultado['error'] else 'ok'
+    print(f'[{completadas}/{total}] {nombre}: {estado}', file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Validación walk-forward del ARIMA y los OLS de demanda.')
+    parser.add_argument('datos', help='CSV limpio (SeoulBikeData_limpio.csv)')
+    parser.add_argument('--cortes', type=int, default=CORTES, help='número de cortes (pliegues)')
+    parser.add_argument('--horizonte', type=int, default=HORIZONTE, help='horas pronosticadas en cada corte')
+    parser.add_argument('--inicio', type=float, default=INICIO,
+                        help='fracción de la serie usada para entrenar en el primer corte')
+    parser.add_argument('--ordenes', nargs='*', type=_orden, default=None, metavar='P,D,Q',
+                        help='órdenes del ARIMA (por defecto el de modelo_arima.json)')
+    parser.add_argument('--ols', nargs='*', choices=sorted(CONJUNTOS_OLS), default=sorted(CONJUNTOS_OLS),
+                        help='conjuntos de variables de los OLS')
+    parser.add_argument('--reajustar-cada', type=int, default=None,
+                        help='cortes por tramo: los parámetros se estiman al comienzo de cada tramo')
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--salida', help='prefijo de los CSV con las tablas (_pliegues.csv, _horizontes.csv)')
+    args = parser.parse_args(argv)
+
+    ordenes = [orden_configurado()] if args.ordenes is None else args.ordenes
+    columnas = sorted({c for conjunto in args.ols for c in CONJUNTOS_OLS[conjunto]})
+    tabla = datos.cargar(args.datos, columnas=['Date', 'Rented Bike Count'] + columnas)
+    fechas = tabla['Date'].to_numpy()
+    y = tabla['Rented Bike Count'].to_numpy(dtype=np.float64)
+    matrices = {c: tabla[CONJUNTOS_OLS[c]].to_numpy(dtype=np.float64) for c in args.ols}
+
+    inicio = time.perf_counter()
+    posiciones, resultados = validar(y, matrices, ordenes, args.ols, args.cortes, args.horizonte, args.inicio,
+                                     args.reajustar_cada, args.procesos, progreso=_imprimir_progreso)
+    segundos = time.perf_counter() - inicio
+
+    pliegues = tabla_pliegues(y, posiciones, resultados, fechas)
+    horizontes = tabla_horizontes(y, posiciones, resultados,
+                                  [h for h in HORIZONTES_REPORTE if h < args.horizonte] + [args.horizonte])
+    pd.set_option('display.width', 160)
+    print(pliegues.to_string(index=False, float_format='{:.3f}'.format))
+    print()
+    print(horizontes.to_string(index=False, float_format='{:.3f}'.format))
+    print()
+    for nombre, resultado in resultados.items():
+        if resultado['error']:
+            print(f'{nombre}: error ({resultado["error"]})')
+        else:
+            total = metricas(reales(y, posiciones, args.horizonte), resultado['prediccion'])
+            print(f'{nombre}: R²={total["r2"]:.3f} MAE={total["mae"]:.1f} RMSE={total["rmse"]:.1f} '
+                  f'({resultado["ajustes"]} ajustes, {resultado["segundos"]:.1f} s de cómputo)')
+    print(f'{len(posiciones)} cortes × {args.horizonte} horas en {segundos:.1f} s')
+
+    if args.salida:
+        pliegues.to_csv(f'{args.salida}_pliegues.csv', index=False)
+        tabla_horizontes(y, posiciones, resultados).to_csv(f'{args.salida}_horizontes.csv', index=False)
+        print(f'Tablas guardadas en {args.salida}_pliegues.csv y {args.salida}_horizontes.csv')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+# Configuración de producción del tablero en AWS.
+#
+# Uso (desde soportes/despliegue):
+#     gunicorn -c gunicorn.conf.py Tablero_completo_aws:server
+#
+# Con preload_app el proceso maestro importa el tablero una sola vez: carga los
+# datos y ajusta (o lee de la caché) el ARIMA antes de crear los workers, que
+# comparten esa memoria por copy-on-write en lugar de repetir la carga.
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('TABLERO_PUERTO', '8050')}"
+workers = int(os.environ.get('TABLERO_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('TABLERO_THREADS', 4))
+worker_class = 'gthread'
+preload_app = True
+timeout = int(os.environ.get('TABLERO_TIMEOUT', 120))
+keepalive = 5
+accesslog = '-'
+
+# Las figuras ya construidas se comparten en disco entre los workers
+os.environ.setdefault('TABLERO_CACHE_FIGURAS', os.path.join('cache', 'figuras'))
+
+# Tiempo máximo que el maestro espera el primer pronóstico antes de crear los workers
+ESPERA_MODELO = float(os.environ.get('TABLERO_ESPERA_MODELO', 600))
+
+
+def _tablero():
+    import sys
+    return sys.modules.get('Tablero_completo_aws')
+
+
+def when_ready(server):
+    # Se espera el primer pronóstico en el maestro para que los workers lo hereden
+    # ya calculado. Luego se detiene el hilo de fondo: los hilos no sobreviven al
+    # fork y no debe haber candados tomados en el momento de crear los workers.
+    tablero = _tablero()
+    if tablero is None:
+        return
+    servicio = tablero.servicio_pronostico
+    if servicio.esperar(ESPERA_MODELO):
+        servicio.detener(esperar=True)
+    else:
+        server.log.warning('El pronóstico no estuvo listo a tiempo; cada worker lo calculará')
+        servicio.detener()
+
+
+def post_fork(server, worker):
+    # Cada worker relanza su hilo de reajuste programado
+    tablero = _tablero()
+    if tablero is not None:
+        tablero.servicio_pronostico.iniciar()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los módulos del tablero se importan por nombre desde la carpeta Tablero, como en los scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Tablero'))
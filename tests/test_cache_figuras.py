@@ -0,0 +1,137 @@
+"""Caché de figuras: LRU, TTL, versión de los datos, contadores y nivel en disco."""
+import os
+
+import pytest
+
+pytest.importorskip('plotly')
+import cache_figuras
+from cache_figuras import CacheFiguras
+
+
+def _figura(texto):
+    return {'data': [], 'layout': {'title': {'text': texto}}}
+
+
+class Construcciones:
+    """Cuenta cuántas veces se construye cada figura."""
+
+    def __init__(self):
+        self.llamadas = []
+
+    def __call__(self, texto):
+        def construir():
+            self.llamadas.append(texto)
+            return _figura(texto)
+        return construir
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    ahora = [1_000_000.0]
+    monkeypatch.setattr(cache_figuras.time, 'time', lambda: ahora[0])
+    return ahora
+
+
+def test_acierto_y_contadores():
+    cache, construir = CacheFiguras(), Construcciones()
+    primera = cache.obtener('grafico', [1, 'a'], construir('uno'))
+    segunda = cache.obtener('grafico', [1, 'a'], construir('uno'))
+
+    assert construir.llamadas == ['uno']
+    assert segunda['layout']['title']['text'] == primera['layout']['title']['text']
+    estadisticas = cache.estadisticas()
+    assert (estadisticas['aciertos'], estadisticas['fallos'], estadisticas['entradas']) == (1, 1, 1)
+    assert estadisticas['tasa_aciertos'] == 0.5
+
+
+def test_lru_descarta_la_menos_usada():
+    cache, construir = CacheFiguras(max_entradas=2), Construcciones()
+    cache.obtener('g', ['a'], construir('a'))
+    cache.obtener('g', ['b'], construir('b'))
+    cache.obtener('g', ['a'], construir('a'))   # 'a' pasa a ser la más reciente
+    cache.obtener('g', ['c'], construir('c'))   # sale 'b'
+    cache.obtener('g', ['a'], construir('a'))
+    cache.obtener('g', ['b'], construir('b'))
+
+    assert construir.llamadas == ['a', 'b', 'c', 'b']
+    assert cache.estadisticas()['entradas'] == 2
+
+
+def test_cambio_de_version_invalida():
+    version = ['v1']
+    cache, construir = CacheFiguras(version=lambda: version[0]), Construcciones()
+    cache.obtener('g', [], construir('x'))
+    version[0] = 'v2'
+    cache.obtener('g', [], construir('x'))
+    assert construir.llamadas == ['x', 'x']
+
+
+def test_ttl(reloj):
+    cache, construir = CacheFiguras(ttl=60), Construcciones()
+    cache.obtener('g', [], construir('x'))
+    reloj[0] += 59
+    cache.obtener('g', [], construir('x'))
+    reloj[0] += 2
+    cache.obtener('g', [], construir('x'))
+    assert construir.llamadas == ['x', 'x']
+    assert cache.estadisticas()['entradas'] == 1
+
+
+def test_disco_compartido_entre_procesos(tmp_path):
+    directorio = str(tmp_path / 'figuras')
+    construir = Construcciones()
+    CacheFiguras(directorio=directorio).obtener('g', [1], construir('x'))
+
+    otro = CacheFiguras(directorio=directorio)
+    figura = otro.obtener('g', [1], construir('x'))
+    assert construir.llamadas == ['x']
+    assert figura['layout']['title']['text'] == 'x'
+    assert otro.estadisticas()['aciertos_disco'] == 1
+    # Después del disco queda en memoria
+    otro.obtener('g', [1], construir('x'))
+    assert otro.estadisticas()['aciertos'] == 1
+
+
+def test_disco_acotado_por_cantidad(tmp_path):
+    directorio = tmp_path / 'figuras'
+    cache, construir = CacheFiguras(directorio=str(directorio), max_disco=3), Construcciones()
+    for i in range(6):
+        cache.obtener('g', [i], construir(str(i)))
+        # Fechas de modificación distintas y crecientes
+        for j, ruta in enumerate(sorted(directorio.iterdir(), key=os.path.getmtime)):
+            os.utime(ruta, (1000 + j, 1000 + j))
+
+    assert len(list(directorio.glob('*.json'))) == 3
+    # Quedan las tres últimas
+    otro = CacheFiguras(directorio=str(directorio))
+    for i in range(3, 6):
+        otro.obtener('g', [i], construir(str(i)))
+    assert otro.estadisticas()['aciertos_disco'] == 3
+
+
+def test_disco_borra_las_vencidas(tmp_path, reloj):
+    directorio = tmp_path / 'figuras'
+    cache, construir = CacheFiguras(directorio=str(directorio), ttl=60), Construcciones()
+    cache.obtener('g', ['vieja'], construir('vieja'))
+    vieja = next(directorio.glob('*.json'))
+    os.utime(vieja, (reloj[0] - 120, reloj[0] - 120))
+
+    cache.obtener('g', ['nueva'], construir('nueva'))
+    assert not vieja.exists()
+    assert len(list(directorio.glob('*.json'))) == 1
+
+
+def test_memorizar():
+    cache = CacheFiguras()
+    llamadas = []
+
+    @cache.memorizar()
+    def update_grafico(valor):
+        llamadas.append(valor)
+        return _figura(str(valor))
+
+    update_grafico(1)
+    update_grafico(1)
+    update_grafico(2)
+    assert llamadas == [1, 2]
+    assert update_grafico.__name__ == 'update_grafico'
@@ -0,0 +1,108 @@
+"""Copia columnar de los CSV (datos.convertir / datos.cargar)."""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import datos
+
+
+def _csv(ruta, filas=48, desordenado=True):
+    rng = np.random.default_rng(1)
+    fechas = np.repeat(pd.date_range('2017-12-01', periods=filas // 24, freq='D'), 24)
+    tabla = pd.DataFrame({
+        'Date': fechas.strftime('%d/%m/%Y'),
+        'Rented Bike Count': rng.integers(0, 3000, filas),
+        'Hour': np.tile(np.arange(24), filas // 24),
+        'Temperature(C)': rng.normal(0, 5, filas).round(1),
+        'Visibility (10m)': rng.integers(27, 2001, filas),
+        'Seasons': np.where(np.arange(filas) < 24, 'Winter', 'Spring'),
+    })
+    if desordenado:
+        tabla = tabla.sample(frac=1, random_state=0)
+    tabla.to_csv(ruta, index=False)
+    return tabla
+
+
+@pytest.fixture
+def csv(tmp_path):
+    ruta = tmp_path / 'datos.csv'
+    return str(ruta), _csv(ruta)
+
+
+def test_cargar_ida_y_vuelta(csv, tmp_path):
+    ruta, original = csv
+    cargada = datos.cargar(ruta, formato_fecha='%d/%m/%Y', directorio=str(tmp_path / 'cache'))
+
+    esperada = original.assign(Date=pd.to_datetime(original['Date'], format='%d/%m/%Y'))
+    esperada = esperada.sort_values(by=['Date', 'Hour'], kind='stable', ignore_index=True)
+    assert list(cargada.columns) == list(esperada.columns)
+    np.testing.assert_array_equal(cargada['Date'].to_numpy(), esperada['Date'].to_numpy())
+    for columna in ['Rented Bike Count', 'Hour', 'Visibility (10m)']:
+        np.testing.assert_array_equal(cargada[columna].to_numpy(), esperada[columna].to_numpy())
+    np.testing.assert_allclose(cargada['Temperature(C)'], esperada['Temperature(C)'], rtol=1e-6)
+    assert list(cargada['Seasons'].astype(str)) == list(esperada['Seasons'])
+
+    # Tipos compactos de ESQUEMA y texto como categorías
+    assert cargada['Rented Bike Count'].dtype == np.int32
+    assert cargada['Hour'].dtype == np.int8
+    assert cargada['Visibility (10m)'].dtype == np.int16
+    assert cargada['Temperature(C)'].dtype == np.float32
+    assert isinstance(cargada['Seasons'].dtype, pd.CategoricalDtype)
+
+
+def test_cargar_solo_columnas_pedidas(csv, tmp_path):
+    ruta, _ = csv
+    cargada = datos.cargar(ruta, columnas=['Date', 'Hour'], formato_fecha='%d/%m/%Y',
+                           directorio=str(tmp_path / 'cache'))
+    assert list(cargada.columns) == ['Date', 'Hour']
+    with pytest.raises(KeyError):
+        datos.cargar(ruta, columnas=['Inexistente'], formato_fecha='%d/%m/%Y', directorio=str(tmp_path / 'cache'))
+
+
+def test_no_reconvierte_si_el_csv_no_cambio(csv, tmp_path, monkeypatch):
+    ruta, _ = csv
+    cache = str(tmp_path / 'cache')
+    datos.cargar(ruta, formato_fecha='%d/%m/%Y', directorio=cache)
+
+    def no_convertir(*args, **kwargs):
+        raise AssertionError('No debía volver a convertir')
+
+    monkeypatch.setattr(datos, 'convertir', no_convertir)
+    assert len(datos.cargar(ruta, formato_fecha='%d/%m/%Y', directorio=cache)) == 48
+
+
+def test_reconvierte_si_cambia_el_csv_o_el_formato(csv, tmp_path):
+    ruta, _ = csv
+    cache = str(tmp_path / 'cache')
+    datos.cargar(ruta, formato_fecha='%d/%m/%Y', directorio=cache)
+    version = datos.version(ruta)
+
+    _csv(ruta, filas=72)
+    estado = os.stat(ruta)
+    os.utime(ruta, ns=(estado.st_atime_ns, estado.st_mtime_ns + 1_000_000_000))
+    assert datos.version(ruta) != version
+    assert len(datos.cargar(ruta, formato_fecha='%d/%m/%Y', directorio=cache)) == 72
+
+    meta = datos._leer_meta(datos.directorio_columnas(ruta, cache))
+    assert not datos._vigente(meta, ruta, formato_fecha=None)
+
+
+def test_regenera_una_columna_danada(csv, tmp_path):
+    ruta, _ = csv
+    cache = str(tmp_path / 'cache')
+    datos.cargar(ruta, formato_fecha='%d/%m/%Y', directorio=cache)
+    destino = datos.directorio_columnas(ruta, cache)
+    with open(os.path.join(destino, 'col_01.npy'), 'wb') as f:
+        f.write(b'no es un npy')
+
+    cargada = datos.cargar(ruta, formato_fecha='%d/%m/%Y', directorio=cache)
+    assert cargada['Rented Bike Count'].dtype == np.int32 and len(cargada) == 48
+
+
+def test_compactar_no_pierde_informacion():
+    assert datos.compactar('Hour', np.array([0, 23])).dtype == np.int8
+    assert datos.compactar('Hour', np.array([0, 300])).dtype == np.int64
+    assert datos.compactar('Hour', np.array([0.5, 2.0])).dtype == np.float64
+    assert datos.compactar('Sin esquema', np.array([1, 2])).dtype == np.int64
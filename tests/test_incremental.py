@@ -0,0 +1,250 @@
+"""Ingerir filas y actualizar cada estructura derivada da lo mismo que reconstruirla con todos los datos."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import datos
+from agregados import CuboDemanda
+from estadisticas import EstadisticasFlujo
+from indice_fechas import IndiceFechas
+from reduccion import PiramideSerie
+
+
+def _tabla(dias=20, inicio='2018-01-30', semilla=0, omitir=()):
+    """Tabla horaria con las columnas y tipos de datos.ESQUEMA (sin las filas de ``omitir``)."""
+    rng = np.random.default_rng(semilla)
+    fechas = np.repeat(pd.date_range(inicio, periods=dias, freq='D').to_numpy(dtype='datetime64[ns]'), 24)
+    horas = np.tile(np.arange(24), dias)
+    n = len(fechas)
+    tabla = pd.DataFrame({
+        'Date': fechas,
+        'Rented Bike Count': rng.integers(0, 3000, n).astype(np.int32),
+        'Hour': horas.astype(np.int8),
+        'Temperature(C)': rng.normal(10, 8, n).astype(np.float32),
+        'Humidity(%)': rng.integers(10, 100, n).astype(np.int8),
+        'Wind speed (m/s)': rng.gamma(2, 1, n).astype(np.float32),
+        'Seasons': (pd.DatetimeIndex(fechas).month % 12 // 3).to_numpy().astype(np.int8),
+    })
+    # Algunos ceros, como las horas sin servicio del conjunto real
+    tabla.loc[rng.random(n) < 0.05, 'Rented Bike Count'] = 0
+    return tabla.drop(index=list(omitir)).reset_index(drop=True)
+
+
+@pytest.fixture(params=[30, 24 * 7, 24 * 7 + 5], ids=['mitad_del_dia', 'fin_del_dia', 'tras_un_dia'])
+def partes(request):
+    """(base, nuevas, completa): la ingesta corta en medio de un día, al final o tras un día completo."""
+    # Falta un día entero (el 10) y un par de horas sueltas
+    completa = _tabla(omitir=list(range(24 * 10, 24 * 11)) + [24 * 3 + 5, 24 * 15 + 23])
+    corte = request.param
+    return completa.iloc[:corte].reset_index(drop=True), completa.iloc[corte:].reset_index(drop=True), completa
+
+
+def test_indice_fechas_extender(partes):
+    base, _, completa = partes
+    incremental = IndiceFechas(base)
+    incremental.matriz()
+    incremental.extender(completa)
+    reconstruido = IndiceFechas(completa)
+
+    np.testing.assert_array_equal(incremental.inicios, reconstruido.inicios)
+    assert incremental.ultimo_dia == reconstruido.ultimo_dia
+    np.testing.assert_array_equal(incremental.matriz(), reconstruido.matriz())
+    for fecha in pd.date_range(completa['Date'].iloc[0], completa['Date'].iloc[-1], freq='D'):
+        pd.testing.assert_frame_equal(incremental.dia(fecha), reconstruido.dia(fecha))
+
+
+def test_indice_fechas_rechaza_filas_anteriores(partes):
+    base, _, completa = partes
+    indice = IndiceFechas(completa)
+    with pytest.raises(ValueError):
+        indice.extender(pd.concat([completa, base], ignore_index=True))
+
+
+def test_cubo_agregar(partes):
+    base, nuevas, completa = partes
+    incremental = CuboDemanda(base, histograma=True).agregar(nuevas)
+    reconstruido = CuboDemanda(completa, histograma=True)
+
+    np.testing.assert_allclose(incremental.suma, reconstruido.suma)
+    np.testing.assert_allclose(incremental.suma_cuadrados, reconstruido.suma_cuadrados)
+    np.testing.assert_array_equal(incremental.conteo, reconstruido.conteo)
+    np.testing.assert_array_equal(incremental.histograma, reconstruido.histograma)
+    pd.testing.assert_frame_equal(incremental.resumen(por=['Seasons', 'Hour'], cuantiles=[0.5]),
+                                  reconstruido.resumen(por=['Seasons', 'Hour'], cuantiles=[0.5]))
+
+
+def test_cubo_contra_pandas():
+    tabla = _tabla()
+    cubo = CuboDemanda(tabla)
+    assert cubo.histograma is None
+    resumen = cubo.resumen(por=['Hour']).set_index('Hour')
+    esperado = tabla.groupby('Hour')['Rented Bike Count'].agg(['sum', 'count'])
+    np.testing.assert_allclose(resumen['sum'], esperado['sum'])
+    np.testing.assert_array_equal(resumen['count'], esperado['count'])
+    with pytest.raises(ValueError):
+        cubo.resumen(por=['Hour'], cuantiles=[0.5])
+
+
+COLUMNAS = ['Rented Bike Count', 'Temperature(C)', 'Humidity(%)', 'Wind speed (m/s)']
+
+
+def _comparar_estadisticas(obtenidas, esperadas):
+    pd.testing.assert_frame_equal(obtenidas.resumen(), esperadas.resumen(), rtol=1e-9)
+    pd.testing.assert_frame_equal(obtenidas.covarianza(), esperadas.covarianza(), rtol=1e-9)
+    pd.testing.assert_frame_equal(obtenidas.correlacion(), esperadas.correlacion(), rtol=1e-9)
+
+
+def test_estadisticas_agregar_y_combinar(partes):
+    base, nuevas, completa = partes
+    reconstruidas = EstadisticasFlujo.de_tabla(completa, COLUMNAS)
+
+    _comparar_estadisticas(EstadisticasFlujo.de_tabla(base, COLUMNAS).agregar(nuevas), reconstruidas)
+    _comparar_estadisticas(EstadisticasFlujo.de_tabla(base, COLUMNAS).combinar(
+        EstadisticasFlujo.de_tabla(nuevas, COLUMNAS)), reconstruidas)
+    # Por bloques pequeños y pasando por el estado serializado
+    por_bloques = EstadisticasFlujo.de_dict(EstadisticasFlujo.de_tabla(base, COLUMNAS, tam_bloque=7).a_dict())
+    _comparar_estadisticas(por_bloques.agregar(nuevas, tam_bloque=5), reconstruidas)
+
+
+def test_estadisticas_contra_pandas():
+    tabla = _tabla()[COLUMNAS].astype(np.float64)
+    tabla.iloc[::17, 1] = np.nan
+    estadisticas = EstadisticasFlujo.de_tabla(tabla.iloc[:100]).agregar(tabla.iloc[100:])
+    resumen = estadisticas.resumen()
+    np.testing.assert_allclose(resumen['mean'], tabla.mean())
+    np.testing.assert_allclose(resumen['std'], tabla.std())
+    np.testing.assert_array_equal(resumen['nulos'], tabla.isna().sum())
+    completas = tabla.dropna()
+    np.testing.assert_allclose(estadisticas.covarianza(), completas.cov())
+    np.testing.assert_allclose(estadisticas.correlacion_con('Rented Bike Count'),
+                               completas.drop(columns='Rented Bike Count').corrwith(completas['Rented Bike Count']))
+
+
+def test_serie_horaria():
+    serie = datos.serie(_tabla(dias=3))
+    assert serie.index.is_unique and serie.index.is_monotonic_increasing
+    assert (np.diff(serie.index.asi8) == pd.Timedelta(hours=1).value).all()
+
+
+def _xy(tabla):
+    serie = datos.serie(tabla)
+    return serie.index, serie.to_numpy()
+
+
+@pytest.fixture
+def ingesta():
+    pytest.importorskip('flask')
+    import ingesta
+    return ingesta
+
+
+def test_almacen_agregar_por_partes(ingesta, partes):
+    base, nuevas, completa = partes
+    almacen = ingesta.AlmacenDatos(base)
+    cubo = CuboDemanda(base)
+    indice = IndiceFechas(base)
+
+    def al_ingerir(actuales, filas):
+        indice.extender(actuales)
+        cubo.agregar(filas)
+
+    almacen.suscribir(al_ingerir)
+    for inicio in range(0, len(nuevas), 50):
+        almacen.agregar(nuevas.iloc[inicio:inicio + 50])
+
+    assert almacen.version == len(nuevas)
+    pd.testing.assert_frame_equal(almacen.datos, completa, check_dtype=True)
+    np.testing.assert_array_equal(indice.inicios, IndiceFechas(completa).inicios)
+    np.testing.assert_array_equal(cubo.conteo, CuboDemanda(completa).conteo)
+    np.testing.assert_allclose(cubo.suma, CuboDemanda(completa).suma)
+
+
+def test_piramide_de_serie_ingerida(ingesta, partes):
+    base, nuevas, completa = partes
+    almacen = ingesta.AlmacenDatos(base)
+    piramide = PiramideSerie(*_xy(base))
+
+    def al_ingerir(actuales, filas):
+        nonlocal piramide
+        piramide = PiramideSerie(*_xy(actuales))
+
+    almacen.suscribir(al_ingerir)
+    for inicio in range(0, len(nuevas), 70):
+        almacen.agregar(nuevas.iloc[inicio:inicio + 70])
+    reconstruida = PiramideSerie(*_xy(completa))
+
+    assert len(piramide.niveles) == len(reconstruida.niveles)
+    for (x_a, y_a), (x_b, y_b) in zip(piramide.niveles, reconstruida.niveles):
+        np.testing.assert_array_equal(x_a.asi8, x_b.asi8)
+        np.testing.assert_array_equal(y_a, y_b)
+    medio = completa['Date'].iloc[len(completa) // 2]
+    for rango in [(None, None), (medio, medio + pd.Timedelta(days=2))]:
+        a, b = piramide.ventana(*rango, puntos=50), reconstruida.ventana(*rango, puntos=50)
+        np.testing.assert_array_equal(a[1], b[1])
+        assert a[2] == b[2]
+
+
+def test_almacen_revierte_si_falla_un_suscriptor(ingesta, partes):
+    base, nuevas, _ = partes
+    almacen = ingesta.AlmacenDatos(base)
+    cubo = CuboDemanda(base)
+    reconstrucciones = []
+
+    def reconstruir(vigentes):
+        nonlocal cubo
+        reconstrucciones.append(len(vigentes))
+        cubo = CuboDemanda(vigentes)
+
+    def fallar(actuales, filas):
+        raise RuntimeError('suscriptor roto')
+
+    almacen.suscribir(lambda actuales, filas: cubo.agregar(filas), reconstruir)
+    almacen.suscribir(fallar)
+    with pytest.raises(RuntimeError):
+        almacen.agregar(nuevas)
+
+    assert almacen.version == 0
+    pd.testing.assert_frame_equal(almacen.datos, base)
+    assert reconstrucciones == [len(base)]
+    np.testing.assert_array_equal(cubo.conteo, CuboDemanda(base).conteo)
+
+
+def test_lector_reintenta_el_bloque_si_falla_un_suscriptor(ingesta, partes, tmp_path):
+    base, nuevas, completa = partes
+    ruta = tmp_path / 'ingesta.csv'
+    nuevas.to_csv(ruta, index=False, date_format='%Y-%m-%d')
+    almacen = ingesta.AlmacenDatos(base)
+    lector = ingesta.LectorIngesta(almacen, ruta=str(ruta))
+    fallas = [RuntimeError('suscriptor roto')]
+
+    def al_ingerir(actuales, filas):
+        if fallas:
+            raise fallas.pop()
+
+    almacen.suscribir(al_ingerir)
+    assert lector.revisar(forzar=True) == 0
+    assert lector.posicion == 0 and lector.fallo is not None
+    assert almacen.version == 0
+
+    assert lector.revisar(forzar=True) == len(nuevas)
+    assert lector.fallo is None and lector.posicion == ruta.stat().st_size
+    pd.testing.assert_frame_equal(almacen.datos, completa)
+
+
+def test_escribir_informa_si_no_se_aplican_las_filas(ingesta, partes, tmp_path):
+    base, nuevas, completa = partes
+    almacen = ingesta.AlmacenDatos(base)
+    lector = ingesta.LectorIngesta(almacen, ruta=str(tmp_path / 'ingesta.csv'))
+    fallas = [RuntimeError('suscriptor roto')]
+
+    def al_ingerir(actuales, filas):
+        if fallas:
+            raise fallas.pop()
+
+    almacen.suscribir(al_ingerir)
+    with pytest.raises(RuntimeError):
+        lector.escribir(nuevas)
+    assert almacen.version == 0
+    # Las filas quedaron en el archivo y entran en la próxima revisión
+    assert lector.revisar(forzar=True) == len(nuevas)
+    pd.testing.assert_frame_equal(almacen.datos, completa)
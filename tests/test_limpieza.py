@@ -0,0 +1,62 @@
+"""La limpieza por bloques da el mismo CSV que el cuaderno "Limpieza de datos"."""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import datos
+import limpieza
+from estadisticas import EstadisticasFlujo
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+ORIGINAL = os.path.join(RAIZ, 'data', 'SeoulBikeData_utf8.csv')
+LIMPIO = os.path.join(RAIZ, 'data', 'SeoulBikeData_limpio.csv')
+
+
+@pytest.fixture(scope='module')
+def esperado():
+    return pd.read_csv(LIMPIO)
+
+
+@pytest.mark.parametrize('tam_bloque, procesos', [(limpieza.TAM_BLOQUE, 1), (997, 1), (2000, 2)])
+def test_igual_al_csv_del_cuaderno(tmp_path, esperado, tam_bloque, procesos):
+    salida = tmp_path / 'limpio.csv'
+    filas = limpieza.limpiar(ORIGINAL, str(salida), tam_bloque=tam_bloque, procesos=procesos)
+
+    assert filas == len(esperado)
+    pd.testing.assert_frame_equal(pd.read_csv(salida), esperado)
+
+
+def test_formato_columnas(tmp_path, esperado):
+    destino = tmp_path / 'columnas'
+    limpieza.limpiar(ORIGINAL, str(destino), formato='columnas', tam_bloque=3000)
+    tabla = datos.abrir(str(destino))
+
+    assert list(tabla.columns) == limpieza.COLUMNAS_SALIDA
+    np.testing.assert_array_equal(tabla['Date'].to_numpy(), pd.to_datetime(esperado['Date']).to_numpy())
+    for columna in limpieza.COLUMNAS_SALIDA[1:]:
+        np.testing.assert_allclose(tabla[columna].to_numpy(dtype=np.float64), esperado[columna], rtol=1e-6)
+    assert tabla['Seasons'].dtype == np.int8
+
+
+def test_estadisticas_de_la_salida(tmp_path, esperado):
+    ruta = tmp_path / 'estadisticas.json'
+    limpieza.limpiar(ORIGINAL, str(tmp_path / 'limpio.csv'), tam_bloque=1500, ruta_estadisticas=str(ruta))
+    with open(ruta, encoding='utf-8') as f:
+        resumen = EstadisticasFlujo.de_dict(json.load(f)).resumen()
+
+    numericas = esperado[limpieza.COLUMNAS_SALIDA[1:]].astype(np.float64)
+    np.testing.assert_array_equal(resumen['count'], len(esperado))
+    np.testing.assert_allclose(resumen['mean'], numericas.mean(), rtol=1e-6)
+    np.testing.assert_allclose(resumen['std'], numericas.std(), rtol=1e-5)
+
+
+def test_estacion_desconocida():
+    bloque = pd.DataFrame({c: [0] for c in limpieza.TIPOS_ENTRADA})
+    bloque['Date'] = ['01/12/2017']
+    bloque['Functioning Day'] = ['Yes']
+    bloque['Seasons'] = ['Monsoon']
+    with pytest.raises(ValueError, match='Monsoon'):
+        limpieza.limpiar_bloque(bloque)
@@ -0,0 +1,126 @@
+"""Modelo OLS de demanda y su API de predicción por lotes (modelo_ols.py)."""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('flask')
+import modelo_ols
+from modelo_ols import FEATURES, ModeloOLS
+
+COEFICIENTES = np.array([120.0, 25.0, 30.0, -8.0, 0.05, -60.0, -40.0])
+
+
+@pytest.fixture
+def tabla():
+    rng = np.random.default_rng(3)
+    n = 500
+    tabla = pd.DataFrame({
+        'Hour': rng.integers(0, 24, n),
+        'Temperature(C)': rng.normal(12, 10, n),
+        'Humidity(%)': rng.integers(10, 100, n),
+        'Visibility (10m)': rng.integers(27, 2001, n),
+        'Solar Radiation (MJ/m2)': rng.gamma(1, 0.5, n),
+        'Seasons': rng.integers(0, 4, n),
+    })
+    tabla['Rented Bike Count'] = ModeloOLS(COEFICIENTES).predecir(tabla[FEATURES].to_numpy())
+    return tabla
+
+
+def test_entrenar_recupera_los_coeficientes(tabla):
+    modelo = modelo_ols.entrenar(tabla)
+    np.testing.assert_allclose(modelo.coeficientes, COEFICIENTES, rtol=1e-8, atol=1e-8)
+
+
+def test_particion_80_20_sin_repetir():
+    entrenamiento, prueba = modelo_ols.particion(101)
+    assert len(prueba) == 21 and len(entrenamiento) == 80
+    assert sorted(np.concatenate([entrenamiento, prueba])) == list(range(101))
+    np.testing.assert_array_equal(modelo_ols.particion(101)[1], prueba)
+
+
+def test_particion_igual_a_train_test_split():
+    model_selection = pytest.importorskip('sklearn.model_selection')
+    entrenamiento, prueba = model_selection.train_test_split(np.arange(1234), test_size=0.2, random_state=1)
+    propios = modelo_ols.particion(1234)
+    np.testing.assert_array_equal(propios[0], entrenamiento)
+    np.testing.assert_array_equal(propios[1], prueba)
+
+
+def test_predecir_valida_la_forma():
+    modelo = ModeloOLS(COEFICIENTES)
+    with pytest.raises(ValueError):
+        modelo.predecir(np.zeros((3, len(FEATURES) - 1)))
+    with pytest.raises(ValueError):
+        ModeloOLS(COEFICIENTES[:-1])
+
+
+def test_guardar_y_cargar(tmp_path):
+    ruta = str(tmp_path / 'modelo_ols.json')
+    ModeloOLS(COEFICIENTES).guardar(ruta)
+    cargado = ModeloOLS.cargar(ruta)
+    np.testing.assert_array_equal(cargado.coeficientes, COEFICIENTES)
+    assert cargado.features == FEATURES
+
+
+def test_cargar_o_entrenar_reentrena_si_el_archivo_no_sirve(tmp_path, tabla):
+    ruta = tmp_path / 'modelo_ols.json'
+    ruta.write_text('{"features": []', encoding='utf-8')
+    modelo = modelo_ols.cargar_o_entrenar(tabla, str(ruta))
+    np.testing.assert_allclose(modelo.coeficientes, COEFICIENTES, rtol=1e-8, atol=1e-8)
+    np.testing.assert_allclose(ModeloOLS.cargar(str(ruta)).coeficientes, modelo.coeficientes)
+
+
+@pytest.fixture
+def cliente(tabla):
+    from flask import Flask
+
+    server = Flask(__name__)
+    llamadas = []
+
+    def modelo():
+        llamadas.append(1)
+        return ModeloOLS(COEFICIENTES)
+
+    modelo_ols.registrar_api(server, modelo)
+    X = tabla[FEATURES].to_numpy(dtype=np.float64)[:10]
+    return server.test_client(), X, ModeloOLS(COEFICIENTES).predecir(X), llamadas
+
+
+def test_api_json_por_filas_y_por_columnas(cliente):
+    cliente, X, esperado, llamadas = cliente
+    columnas = FEATURES[::-1]
+    respuesta = cliente.post('/api/prediccion', json={'columnas': columnas, 'filas': X[:, ::-1].tolist()})
+    np.testing.assert_allclose(respuesta.get_json()['prediccion'], esperado)
+
+    respuesta = cliente.post('/api/prediccion', json={f: X[:, i].tolist() for i, f in enumerate(FEATURES)})
+    np.testing.assert_allclose(respuesta.get_json()['prediccion'], esperado)
+    # El modelo se obtiene una sola vez, en la primera solicitud
+    assert llamadas == [1]
+
+
+def test_api_binaria(cliente):
+    cliente, X, esperado, _ = cliente
+    respuesta = cliente.post('/api/prediccion', data=X.astype('<f8').tobytes(),
+                             content_type='application/octet-stream',
+                             headers={'Accept': 'application/octet-stream'})
+    assert respuesta.mimetype == 'application/octet-stream'
+    np.testing.assert_allclose(np.frombuffer(respuesta.get_data(), dtype='<f8'), esperado)
+
+
+@pytest.mark.parametrize('cuerpo', [
+    {'columnas': FEATURES[:-1], 'filas': [[0] * 5]},
+    {'Hour': [1]},
+    [1, 2, 3],
+])
+def test_api_errores(cliente, cuerpo):
+    cliente, *_ = cliente
+    respuesta = cliente.post('/api/prediccion', data=json.dumps(cuerpo), content_type='application/json')
+    assert respuesta.status_code == 400 and 'error' in respuesta.get_json()
+
+
+def test_api_binaria_incompleta(cliente):
+    cliente, *_ = cliente
+    respuesta = cliente.post('/api/prediccion', data=np.zeros(7).tobytes(), content_type='application/octet-stream')
+    assert respuesta.status_code == 400
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from reduccion import PiramideSerie, indices_minmax
+
+
+@pytest.mark.parametrize('unidad', ['ns', 'us', 's'])
+def test_ventana_con_cualquier_unidad_de_fechas(unidad):
+    x = pd.date_range('2018-01-01', periods=5000, freq='h').to_numpy().astype(f'datetime64[{unidad}]')
+    y = np.sin(np.arange(5000) / 50.0)
+    piramide = PiramideSerie(x, y)
+
+    inicio, fin = pd.Timestamp('2018-03-01'), pd.Timestamp('2018-03-02')
+    x_ventana, y_ventana, nivel = piramide.ventana(inicio, fin, puntos=100)
+    assert nivel == 0
+    # Las 25 horas del rango y un punto a cada lado
+    assert len(x_ventana) == 27
+    assert x_ventana[1] == inicio and x_ventana[-2] == fin
+    np.testing.assert_array_equal(y_ventana, y[(x >= x_ventana[0]) & (x <= x_ventana[-1])])
+
+
+def test_indices_minmax_conserva_extremos():
+    y = np.random.default_rng(0).normal(size=1003)
+    indices = indices_minmax(y, 10)
+    assert indices[0] == 0 and indices[-1] == len(y) - 1
+    assert y.argmax() in indices and y.argmin() in indices
+    assert np.all(np.diff(indices) > 0)
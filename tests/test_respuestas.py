@@ -0,0 +1,126 @@
+"""Compactación de figuras y compresión de respuestas (respuestas.py)."""
+import base64
+import gzip
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip('flask')
+import respuestas
+
+
+def _binario(arreglo):
+    arreglo = np.asarray(arreglo)
+    return {'dtype': arreglo.dtype.str.lstrip('<|='), 'bdata': base64.b64encode(arreglo.tobytes()).decode('ascii')}
+
+
+def _decodificar(valor):
+    return np.frombuffer(base64.b64decode(valor['bdata']), dtype=np.dtype(valor['dtype']))
+
+
+def test_redondear_cifras_significativas():
+    valores = [-5.199999809265137, 1234567.89, 0.000123456789, None, float('nan'), 0.0]
+    assert respuestas.redondear(valores, digitos=6) == [-5.2, 1234570, 0.000123457, None, None, 0]
+
+
+def test_redondear_enteros_sin_decimales():
+    assert respuestas.redondear([1.0, 2.0000000001, -3.0]) == [1, 2, -3]
+    assert all(isinstance(v, int) for v in respuestas.redondear([1.0, 2.0]))
+
+
+def test_redondear_deja_lo_que_no_es_numerico():
+    assert respuestas.redondear([1, 2, 3]) is None
+    assert respuestas.redondear(['a', 'b']) is None
+    assert respuestas.redondear([[1.5, 2.5], [3.5]]) is None
+
+
+@pytest.mark.parametrize('valores, tipo', [
+    (np.array([0, 200, 255], dtype=np.int64), 'u1'),
+    (np.array([-3, 100], dtype=np.int32), 'i1'),
+    (np.array([1.0, 60000.0], dtype=np.float64), 'u2'),
+    (np.array([-40000, 2], dtype=np.int64), 'i4'),
+])
+def test_binario_enteros_al_tipo_mas_chico(valores, tipo):
+    compacto = respuestas._binario(_binario(valores))
+    assert compacto['dtype'] == tipo
+    np.testing.assert_array_equal(_decodificar(compacto), valores)
+
+
+def test_binario_float64_a_float32():
+    valores = np.array([0.5, np.nan, 1e-3], dtype=np.float64)
+    compacto = respuestas._binario(_binario(valores), digitos=6)
+    assert compacto['dtype'] == 'f4'
+    np.testing.assert_allclose(_decodificar(compacto), valores, rtol=1e-6)
+    # Con más cifras de las que guarda float32 se deja como está
+    assert respuestas._binario(_binario(valores), digitos=10) is None
+
+
+def test_binario_sin_ganancia_o_invalido():
+    assert respuestas._binario(_binario(np.array([1, 2], dtype=np.int8))) is None
+    # Bytes que no completan un float64
+    assert respuestas._binario({'dtype': 'f8', 'bdata': base64.b64encode(b'abc').decode('ascii')}) is None
+
+
+def test_compactar_figura_fechas_regulares_e_irregulares():
+    figura = {
+        'data': [
+            {'type': 'scatter', 'x': ['2018-01-01', '2018-01-02', '2018-01-03'], 'y': [1.0, 2.5, 3.25]},
+            {'type': 'scatter', 'x': ['2018-01-01', '2018-01-05'], 'y': [0.1234567, 2.0],
+             'hovertext': ['2018-01-01T00:00:00', '2018-01-05T00:00:00']},
+        ],
+        'layout': {},
+    }
+    medicion = respuestas._Medicion()
+    respuestas.compactar_figura(figura, digitos=3, medicion=medicion)
+    regular, irregular = figura['data']
+
+    assert figura['layout']['xaxis']['type'] == 'date'
+    assert 'x' not in regular and regular['dx'] == 86_400_000
+    assert regular['x0'] == '2018-01-01'
+    assert irregular['x'] == np.array(['2018-01-01', '2018-01-05'], dtype='datetime64[ms]').astype(np.int64).tolist()
+    assert irregular['y'] == [0.123, 2]
+    assert irregular['hovertext'] == ['2018-01-01', '2018-01-05']
+    assert medicion.valores['ahorro_fechas'] > 0 and medicion.valores['ahorro_precision'] > 0
+
+
+def test_compactar_figura_respeta_ejes_no_fecha():
+    figura = {'data': [{'x': ['2018-01-01', '2018-01-02'], 'y': [1, 2]}],
+              'layout': {'xaxis': {'type': 'category'}}}
+    respuestas.compactar_figura(figura)
+    assert figura['data'][0]['x'] == ['2018-01-01', '2018-01-02']
+
+
+@pytest.fixture
+def servidor():
+    from flask import Flask, jsonify
+
+    server = Flask(__name__)
+    figura = {'data': [{'x': list(range(300)), 'y': [i / 3 for i in range(300)]}], 'layout': {}}
+
+    @server.route('/_dash-update-component', methods=['POST'])
+    def callback():
+        return jsonify({'response': {'grafico': {'figure': figura}}})
+
+    medicion = respuestas.optimizar(server, compactar=True, comprimir=True, digitos=4)
+    return server, medicion
+
+
+def test_optimizar_compacta_y_comprime(servidor):
+    server, medicion = servidor
+    respuesta = server.test_client().post('/_dash-update-component', json={},
+                                          headers={'Accept-Encoding': 'gzip'})
+    assert respuesta.headers['Content-Encoding'] == 'gzip'
+    contenido = json.loads(gzip.decompress(respuesta.get_data()))
+    y = contenido['response']['grafico']['figure']['data'][0]['y']
+    assert y[1] == 0.3333 and y[3] == 1
+    assert int(respuesta.headers['X-Carga-Original']) > medicion.valores['compactados']
+    assert medicion.valores['respuestas_comprimidas'] == 1
+
+
+def test_optimizar_sin_accept_encoding(servidor):
+    server, _ = servidor
+    respuesta = server.test_client().post('/_dash-update-component', json={},
+                                          headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in respuesta.headers
+    assert json.loads(respuesta.get_data())['response']['grafico']['figure']['data'][0]['y'][2] == 0.6667